@@ -2,8 +2,21 @@
 Triton Python Backend for ACT Policy Inference.
 
 This model runs inside the Triton container and handles stateful ACT policy inference.
+
+Two outputs can be requested:
+    output__0:       the next action [1, 8], taken from the policy action queue (stateful)
+    action_chunk__0: the whole unnormalized action chunk [1, chunk_size, 8] (stateless), so
+                     a client can execute it and call the model once per chunk
+
+Requests naming no output get output__0 only.
+
+The action queue (or temporal ensembler) is kept per stream, named by the optional stream__0
+input, so environments sharing the model never get each other's actions. A request setting the
+optional reset__0 input starts its stream afresh, as after an environment reset. Requests
+without stream__0 share the default stream.
 """
 
+from collections import OrderedDict, deque
 import json
 import numpy as np
 import torch
@@ -19,6 +32,9 @@ class TritonPythonModel:
     This allows serving the stateful ACT model without ONNX/TorchScript export.
     """
 
+    # Most streams whose policy state is kept, the least recently used are dropped
+    MAX_STREAMS = 256
+
     def initialize(self, args):
         """
         Initialize the model. Called once when Triton loads the model.
@@ -69,6 +85,10 @@ class TritonPythonModel:
         
         self.policy.to(self.device)
         
+        # Policy state of the inactive streams, the active one lives in the policy
+        self._active_stream = None
+        self._streams = OrderedDict()
+        
         # Load normalization stats
         stats_path = Path(checkpoint_dir) / "policy_preprocessor_step_3_normalizer_processor.safetensors"
         self.action_mean = None
@@ -111,11 +131,18 @@ class TritonPythonModel:
                 image_np = image_tensor.as_numpy()  # [batch, 3, 480, 640]
                 
                 # Preprocess and run inference (returns pb_utils.Tensor)
-                output_tensor = self._predict(state_np, image_np)
+                # Requests naming no output get output__0 only, the chunk costs another forward pass
+                requested = set(request.requested_output_names()) or {"output__0"}
+                output_tensors = []
+                if "output__0" in requested:
+                    self._use_stream(self._stream_of(request))
+                    output_tensors.append(self._predict(state_np, image_np))
+                if "action_chunk__0" in requested:
+                    output_tensors.append(self._predict_chunk(state_np, image_np))
                 
                 # Create response
                 inference_response = pb_utils.InferenceResponse(
-                    output_tensors=[output_tensor]
+                    output_tensors=output_tensors
                 )
                 responses.append(inference_response)
                 
@@ -131,6 +158,64 @@ class TritonPythonModel:
         
         return responses
 
+    def _stream_of(self, request):
+        """
+        Return the stream of a request, resetting its policy state if asked.
+        
+        Args:
+            request: pb_utils.InferenceRequest
+            
+        Returns:
+            The stream name, or None for the default stream
+        """
+        stream_tensor = pb_utils.get_input_tensor_by_name(request, "stream__0")
+        stream = None
+        if stream_tensor is not None:
+            stream = stream_tensor.as_numpy().reshape(-1)[0]
+            stream = stream.decode("utf-8") if isinstance(stream, bytes) else str(stream)
+        
+        reset_tensor = pb_utils.get_input_tensor_by_name(request, "reset__0")
+        if reset_tensor is not None and reset_tensor.as_numpy().any():
+            self._streams.pop(stream, None)
+            if stream == self._active_stream:
+                self._set_policy_state(self._new_policy_state())
+        return stream
+
+    def _use_stream(self, stream):
+        """
+        Swap the action queue (or temporal ensembler) of a stream into the policy.
+        
+        Args:
+            stream: The stream name, or None for the default stream
+        """
+        if stream == self._active_stream:
+            return
+        self._streams[self._active_stream] = self._policy_state()
+        state = self._streams.pop(stream, None)
+        self._set_policy_state(state if state is not None else self._new_policy_state())
+        self._active_stream = stream
+        while len(self._streams) > self.MAX_STREAMS:
+            self._streams.popitem(last=False)
+
+    def _policy_state(self):
+        if self.policy.config.temporal_ensemble_coeff is not None:
+            return self.policy.temporal_ensembler
+        return self.policy._action_queue
+
+    def _set_policy_state(self, state):
+        if self.policy.config.temporal_ensemble_coeff is not None:
+            self.policy.temporal_ensembler = state
+        else:
+            self.policy._action_queue = state
+
+    def _new_policy_state(self):
+        from lerobot.policies.act.modeling_act import ACTTemporalEnsembler
+        
+        config = self.policy.config
+        if config.temporal_ensemble_coeff is not None:
+            return ACTTemporalEnsembler(config.temporal_ensemble_coeff, config.chunk_size)
+        return deque([], maxlen=config.n_action_steps)
+
     def _predict(self, state_np, image_np):
         """
         Run inference on preprocessed inputs.
@@ -145,20 +230,7 @@ class TritonPythonModel:
         # print(f"[Triton Python Backend] _predict called with state shape: {state_np.shape}, image shape: {image_np.shape}")
         
         with torch.no_grad():
-            # Convert to torch tensors
-            state = torch.from_numpy(state_np).float().to(self.device)
-            image = torch.from_numpy(image_np).float().to(self.device)
-            
-            # print(f"[Triton Python Backend] Converted to torch - state: {state.shape}, image: {image.shape}")
-            
-            # Apply ImageNet normalization to image
-            image = (image - self.imagenet_mean) / self.imagenet_std
-            
-            # Create batch dictionary
-            batch = {
-                "observation.state": state,
-                "observation.images.top_cam": image,
-            }
+            batch = self._batch(state_np, image_np)
             
             # print(f"[Triton Python Backend] Calling policy.select_action...")
             
@@ -189,6 +261,50 @@ class TritonPythonModel:
             
             return output_tensor
 
+    def _batch(self, state_np, image_np):
+        """
+        Build the policy input batch.
+        
+        Args:
+            state_np: State array [batch, 8]
+            image_np: Image array [batch, 3, 480, 640] (already in CHW, normalized [0-1])
+            
+        Returns:
+            Dictionary of device tensors
+        """
+        # Convert to torch tensors
+        state = torch.from_numpy(state_np).float().to(self.device)
+        image = torch.from_numpy(image_np).float().to(self.device)
+        
+        # Apply ImageNet normalization to image
+        image = (image - self.imagenet_mean) / self.imagenet_std
+        
+        return {
+            "observation.state": state,
+            "observation.images.top_cam": image,
+        }
+
+    def _predict_chunk(self, state_np, image_np):
+        """
+        Predict the whole action chunk, without touching the policy action queue.
+        
+        Args:
+            state_np: State array [batch, 8]
+            image_np: Image array [batch, 3, 480, 640] (already in CHW, normalized [0-1])
+            
+        Returns:
+            pb_utils.Tensor "action_chunk__0" [batch, chunk_size, 8]
+        """
+        with torch.no_grad():
+            actions = self.policy.predict_action_chunk(self._batch(state_np, image_np))
+            
+            # Unnormalize actions if stats available
+            if self.action_mean is not None:
+                actions = actions * self.action_std + self.action_mean
+            
+            actions = actions.detach().cpu().float().contiguous()
+            return pb_utils.Tensor.from_dlpack("action_chunk__0", to_dlpack(actions))
+
     def finalize(self):
         """
         Clean up resources. Called when Triton unloads the model.
@@ -0,0 +1,146 @@
+"""
+Benchmark task reward evaluation: per-contact Python loop vs. the vectorized contact query.
+
+Rolls out the scripted expert in the EE environment and, at every step, times the legacy
+``get_reward`` implementation (name lookups per contact) against the task's current one.
+Both rewards must agree on every step.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trossen_arm_mujoco.ee_sim_env import OneArmPickPlaceEETask, TransferCubeEETask
+from trossen_arm_mujoco.scripted_policy import PickAndPlacePolicy, PickAndTransferPolicy
+from trossen_arm_mujoco.utils import make_sim_env
+
+
+def legacy_transfer_cube_reward(physics) -> int:
+    """Reward of the transfer cube tasks as implemented before the contact query."""
+    all_contact_pairs = []
+    for i_contact in range(physics.data.ncon):
+        id_geom_1 = physics.data.contact[i_contact].geom1
+        id_geom_2 = physics.data.contact[i_contact].geom2
+        name_geom_1 = physics.model.id2name(id_geom_1, "geom")
+        name_geom_2 = physics.model.id2name(id_geom_2, "geom")
+        all_contact_pairs.append((name_geom_1, name_geom_2))
+
+    touch_left_gripper = ("red_box", "left/gripper_follower_left") in all_contact_pairs
+    touch_right_gripper = ("red_box", "right/gripper_follower_left") in all_contact_pairs
+    touch_table = ("red_box", "table") in all_contact_pairs
+
+    reward = 0
+    if touch_right_gripper:
+        reward = 1
+    if touch_right_gripper and not touch_table:
+        reward = 2
+    if touch_left_gripper:
+        reward = 3
+    if touch_left_gripper and not touch_table:
+        reward = 4
+    return reward
+
+
+def legacy_pick_place_reward(physics) -> int:
+    """Reward of the pick and place tasks as implemented before the contact query."""
+    box_start_idx = physics.model.name2id("red_box_joint", "joint")
+    box_pos = physics.data.qpos[box_start_idx : box_start_idx + 3]
+
+    all_contact_pairs = []
+    for i_contact in range(physics.data.ncon):
+        id_geom_1 = physics.data.contact[i_contact].geom1
+        id_geom_2 = physics.data.contact[i_contact].geom2
+        name_geom_1 = physics.model.id2name(id_geom_1, "geom")
+        name_geom_2 = physics.model.id2name(id_geom_2, "geom")
+        all_contact_pairs.append({name_geom_1, name_geom_2})
+
+    touch_right_gripper = any(
+        {"red_box", "right/gripper_follower_left"} <= pair
+        or {"red_box", "right/gripper_follower_right"} <= pair
+        for pair in all_contact_pairs
+    )
+    in_bucket_xy = np.linalg.norm(box_pos[:2] - np.array([-0.2, 0])) < 0.05
+
+    reward = 0
+    if touch_right_gripper:
+        reward = 1
+    if touch_right_gripper and box_pos[2] > 0.05:
+        reward = 2
+    if not touch_right_gripper and in_bucket_xy and box_pos[2] < 0.1:
+        reward = 4
+    return reward
+
+
+def time_call(fn, repeats: int) -> tuple[float, int]:
+    """Return the mean wall time of ``fn()`` over ``repeats`` calls and its last result."""
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - t0) / repeats, result
+
+
+def benchmark(task_name: str, episode_len: int, repeats: int, seed: int):
+    if task_name == "sim_pick_place":
+        task_cls = OneArmPickPlaceEETask
+        policy_cls = PickAndPlacePolicy
+        xml_file = "trossen_one_arm_scene.xml"
+        legacy_reward = legacy_pick_place_reward
+    else:
+        task_cls = TransferCubeEETask
+        policy_cls = PickAndTransferPolicy
+        xml_file = "trossen_ai_scene.xml"
+        legacy_reward = legacy_transfer_cube_reward
+
+    env = make_sim_env(
+        task_class=task_cls,
+        xml_file=xml_file,
+        task_name=task_name,
+        cam_list=["cam_high"],
+        random=True,
+    )
+    np.random.seed(seed)
+    ts = env.reset()
+    policy = policy_cls(False)
+
+    legacy_times, query_times, ncons = [], [], []
+    for _ in range(episode_len):
+        ts = env.step(policy(ts))
+        physics = env.physics
+        legacy_time, legacy_result = time_call(lambda: legacy_reward(physics), repeats)
+        query_time, query_result = time_call(lambda: env.task.get_reward(physics), repeats)
+        if legacy_result != query_result:
+            raise RuntimeError(
+                f"Reward mismatch at step {len(ncons)}: legacy={legacy_result}, "
+                f"query={query_result}"
+            )
+        legacy_times.append(legacy_time)
+        query_times.append(query_time)
+        ncons.append(physics.data.ncon)
+
+    legacy_us = np.mean(legacy_times) * 1e6
+    query_us = np.mean(query_times) * 1e6
+    print(f"Task: {task_name}, steps: {episode_len}, mean contacts/step: {np.mean(ncons):.1f}")
+    print(f"Legacy reward:  {legacy_us:8.1f} us/step")
+    print(f"Contact query:  {query_us:8.1f} us/step")
+    print(f"Speedup:        {legacy_us / query_us:8.1f}x (rewards identical on every step)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark task reward evaluation.")
+    parser.add_argument(
+        "--task_name",
+        type=str,
+        default="sim_pick_place",
+        choices=["sim_pick_place", "sim_transfer_cube"],
+        help="Task to benchmark.",
+    )
+    parser.add_argument("--episode_len", type=int, default=600, help="Steps to roll out.")
+    parser.add_argument("--repeats", type=int, default=20, help="Reward calls timed per step.")
+    parser.add_argument("--seed", type=int, default=0, help="Box pose seed.")
+    args = parser.parse_args()
+
+    benchmark(args.task_name, args.episode_len, args.repeats, args.seed)
@@ -0,0 +1,87 @@
+"""
+Benchmark random frame access: HDF5 episode files vs. the memory-mapped episode store.
+
+Samples random (episode, frame) pairs and reads the joint positions, the action and every
+camera image of each, opening the episode file per sample as a dataloader does, or indexing the
+store. Both must return the same data.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trossen_arm_mujoco.episode_store import EpisodeStore, import_hdf5
+from trossen_arm_mujoco.image_storage import read_images
+from trossen_arm_mujoco.manifest import list_episode_files
+
+
+def read_hdf5_frame(path: str, frame: int) -> dict:
+    """Read one frame of an HDF5 episode."""
+    with h5py.File(path, "r") as f:
+        sample = {
+            "qpos": f["/observations/qpos"][frame],
+            "action": f["/action"][frame],
+        }
+        for cam_name, dataset in f["/observations/images"].items():
+            sample[f"images/{cam_name}"] = read_images(dataset, frame)
+    return sample
+
+
+def read_store_frame(store: EpisodeStore, episode: int, frame: int) -> dict:
+    """Read one frame of the store, copied out of the memory map."""
+    index = store.global_index(episode, frame)
+    return {
+        name: np.array(store.array(name)[index])
+        for name in ["qpos", "action", *(f"images/{cam}" for cam in store.cam_names)]
+    }
+
+
+def benchmark(data_dir: str, store_dir: str | None, num_samples: int, seed: int):
+    paths = list_episode_files(data_dir)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if store_dir is None:
+            t0 = time.perf_counter()
+            store = import_hdf5(paths, tmp_dir)
+            print(f"Imported {len(store)} frames in {time.perf_counter() - t0:.1f} secs")
+        else:
+            store = EpisodeStore(store_dir)
+
+        rng = np.random.default_rng(seed)
+        lengths = np.diff(store.offsets)
+        episodes = rng.integers(0, len(paths), num_samples)
+        frames = (rng.random(num_samples) * lengths[episodes]).astype(int)
+
+        t0 = time.perf_counter()
+        hdf5_samples = [read_hdf5_frame(paths[e], f) for e, f in zip(episodes, frames)]
+        hdf5_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        store_samples = [read_store_frame(store, e, f) for e, f in zip(episodes, frames)]
+        store_time = time.perf_counter() - t0
+
+        for a, b in zip(hdf5_samples, store_samples):
+            for name in b:
+                if not np.array_equal(a[name], b[name]):
+                    raise RuntimeError(f"Mismatch in {name}")
+        del store
+
+    print(f"Random frames: {num_samples}, episodes: {len(paths)}")
+    print(f"HDF5 per-sample open: {num_samples / hdf5_time:10.1f} frames/s")
+    print(f"Episode store:        {num_samples / store_time:10.1f} frames/s")
+    print(f"Speedup:              {hdf5_time / store_time:10.1f}x (identical data)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark random frame access.")
+    parser.add_argument("--data_dir", required=True, help="Directory of HDF5 episodes.")
+    parser.add_argument("--store_dir", help="Existing store of the episodes, imported if omitted.")
+    parser.add_argument("--num_samples", type=int, default=500, help="Random frames read.")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed.")
+    args = parser.parse_args()
+
+    benchmark(args.data_dir, args.store_dir, args.num_samples, args.seed)
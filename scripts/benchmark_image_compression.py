@@ -0,0 +1,101 @@
+"""
+Benchmark the image compressions of recorded episodes.
+
+Reads the frames of one camera from a recorded episode and, for every compression the recorder
+supports, writes them to a fresh HDF5 file frame by frame (as the recorder does) and reads them
+back. Reports write and read throughput, file size relative to raw frames, and the largest pixel
+error (zero for the lossless compressions).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trossen_arm_mujoco.image_storage import (
+    IMAGE_COMPRESSIONS,
+    create_image_dataset,
+    hdf5plugin,
+    image_encoding,
+    read_images,
+    write_image,
+)
+
+
+def benchmark_compression(
+    frames: np.ndarray, compression: str, level: int | None, tmp_dir: str
+) -> dict:
+    """Write and read ``frames`` with one compression and return its measurements."""
+    num_frames, height, width, _ = frames.shape
+    path = os.path.join(tmp_dir, f"{compression}.hdf5")
+
+    t0 = time.perf_counter()
+    with h5py.File(path, "w") as root:
+        dataset = create_image_dataset(
+            root, "cam", num_frames, height, width, compression=compression, level=level
+        )
+        encoding = image_encoding(dataset)
+        for t in range(num_frames):
+            write_image(dataset, t, frames[t], *encoding)
+    write_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with h5py.File(path, "r") as root:
+        decoded = read_images(root["cam"])
+    read_time = time.perf_counter() - t0
+
+    raw_mb = frames.nbytes / 1024**2
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {
+        "write_mb_s": raw_mb / write_time,
+        "read_mb_s": raw_mb / read_time,
+        "ratio": frames.nbytes / size,
+        "size_mb": size / 1024**2,
+        "max_error": int(np.abs(decoded.astype(np.int16) - frames).max()),
+    }
+
+
+def main(args):
+    with h5py.File(args.episode, "r") as root:
+        frames = read_images(root[f"/observations/images/{args.cam_name}"])
+    if args.num_frames:
+        frames = frames[: args.num_frames]
+    print(
+        f"{len(frames)} frames of {args.cam_name} from {args.episode} "
+        f"({frames.nbytes / 1024**2:.1f} MB raw)"
+    )
+    print(
+        f"{'compression':>12} {'write MB/s':>11} {'read MB/s':>10} {'ratio':>7} "
+        f"{'size MB':>8} {'max err':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for compression in args.compressions.split(","):
+            if compression in ("blosc", "lz4") and hdf5plugin is None:
+                print(f"{compression:>12} skipped, hdf5plugin is not installed")
+                continue
+            result = benchmark_compression(frames, compression, args.level, tmp_dir)
+            print(
+                f"{compression:>12} {result['write_mb_s']:11.1f} {result['read_mb_s']:10.1f} "
+                f"{result['ratio']:7.1f} {result['size_mb']:8.1f} {result['max_error']:8d}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark image compressions of episodes.")
+    parser.add_argument("--episode", required=True, help="Recorded episode to take frames from.")
+    parser.add_argument("--cam_name", default="cam_high", help="Camera to take frames from.")
+    parser.add_argument("--num_frames", type=int, help="Limit the number of frames.")
+    parser.add_argument(
+        "--compressions",
+        default=",".join(IMAGE_COMPRESSIONS),
+        help="Comma-separated compressions to benchmark.",
+    )
+    parser.add_argument("--level", type=int, help="Compression level passed to every codec.")
+    args = parser.parse_args()
+    main(args)
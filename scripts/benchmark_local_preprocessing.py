@@ -0,0 +1,115 @@
+"""
+Benchmark the observation preprocessing of the local inference client.
+
+Times the original preprocessing (transpose to HWC and back, two copies, float conversion and
+ImageNet normalization on the CPU, then upload) against ``ObservationPreprocessor`` for CHW and
+HWC images, and counts the memory each call allocates, NumPy arrays and tensors alike. With
+``--ckpt``, also times the policy forward pass for comparison.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trossen_arm_mujoco.inference_client import ObservationPreprocessor
+
+
+def legacy_preprocess(observation: dict, device: torch.device) -> dict:
+    """The preprocessing of the local client before ObservationPreprocessor."""
+    state = torch.from_numpy(observation["observation.state"].copy()).float()
+    state = state.unsqueeze(0).to(device)
+    image_raw = observation["observation.images.top_cam"]
+    if image_raw.shape[0] == 3:
+        image_hwc = np.transpose(image_raw, (1, 2, 0))
+    else:
+        image_hwc = image_raw
+    image = torch.from_numpy(image_hwc.copy()).float()
+    image = image.permute(2, 0, 1)
+    image = image / 255.0
+    imagenet_mean = torch.tensor([0.485, 0.456, 0.406]).view(3, 1, 1)
+    imagenet_std = torch.tensor([0.229, 0.224, 0.225]).view(3, 1, 1)
+    image = (image - imagenet_mean) / imagenet_std
+    image = image.unsqueeze(0).to(device)
+    return {"observation.state": state, "observation.images.top_cam": image}
+
+
+def allocated_mb(fn) -> float:
+    """Return the memory allocated by one call of ``fn()`` in MB, NumPy and PyTorch CPU."""
+    tracemalloc.start()
+    with torch.profiler.profile(
+        activities=[torch.profiler.ProfilerActivity.CPU], profile_memory=True
+    ) as prof:
+        fn()
+    _, numpy_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # allocations are attributed to the innermost op, outer ops report them again
+    torch_bytes = sum(max(event.self_cpu_memory_usage, 0) for event in prof.events())
+    return (numpy_peak + torch_bytes) / 1024**2
+
+
+def timed_ms(fn, repeats: int) -> float:
+    """Return the median wall time of ``fn()`` in milliseconds."""
+    fn()
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        times.append(time.perf_counter() - t0)
+    return 1000 * float(np.median(times))
+
+
+def main(args):
+    if torch.cuda.is_available():
+        device = torch.device("cuda")
+    elif torch.backends.mps.is_available():
+        device = torch.device("mps")
+    else:
+        device = torch.device("cpu")
+    rng = np.random.default_rng(0)
+    chw = rng.integers(0, 256, (3, args.height, args.width), dtype=np.uint8)
+    state = rng.standard_normal(8).astype(np.float32)
+    observations = {
+        "CHW": {"observation.state": state, "observation.images.top_cam": chw},
+        "HWC": {
+            "observation.state": state,
+            "observation.images.top_cam": np.ascontiguousarray(chw.transpose(1, 2, 0)),
+        },
+    }
+    preprocess = ObservationPreprocessor(device)
+
+    print(f"{args.repeats} calls on {device}, {args.height}x{args.width} image")
+    print(f"{'layout':>6} {'pipeline':>12} {'ms/call':>9} {'MB alloc/call':>14}")
+    for layout, observation in observations.items():
+        for name, fn in [
+            ("legacy", lambda: legacy_preprocess(observation, device)),
+            ("preallocated", lambda: preprocess(observation)),
+        ]:
+            ms = timed_ms(fn, args.repeats)
+            print(f"{layout:>6} {name:>12} {ms:9.2f} {allocated_mb(fn):14.2f}")
+
+    if args.ckpt:
+        from lerobot.policies.act.modeling_act import ACTPolicy
+
+        policy = ACTPolicy.from_pretrained(args.ckpt).to(device).eval()
+        batch = preprocess(observations["CHW"])
+        with torch.inference_mode():
+            ms = timed_ms(lambda: policy.predict_action_chunk(batch), args.repeats)
+        print(f"Policy forward: {ms:.2f} ms/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark local inference preprocessing.")
+    parser.add_argument("--repeats", type=int, default=50, help="Calls timed per pipeline.")
+    parser.add_argument("--height", type=int, default=480, help="Image height.")
+    parser.add_argument("--width", type=int, default=640, help="Image width.")
+    parser.add_argument("--ckpt", help="Policy checkpoint, to time its forward pass as well.")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,73 @@
+"""
+Benchmark environment construction with the compiled-model cache.
+
+Times, per scene XML, a cold compile from XML and meshes, a load of the cached MJB binary (what
+a fresh worker process pays), an in-process cache hit, and a full ``make_sim_env`` call on a
+warm cache.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import mujoco
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trossen_arm_mujoco.constants import ASSETS_DIR
+from trossen_arm_mujoco.ee_sim_env import OneArmPickPlaceEETask, TransferCubeEETask
+from trossen_arm_mujoco.model_cache import clear_model_cache, load_model
+from trossen_arm_mujoco.sim_env import OneArmPickPlaceTask, TransferCubeTask
+from trossen_arm_mujoco.utils import make_sim_env
+
+SCENES = {
+    "trossen_one_arm_scene.xml": (OneArmPickPlaceEETask, "sim_pick_place"),
+    "trossen_one_arm_scene_joint.xml": (OneArmPickPlaceTask, "sim_pick_place"),
+    "trossen_ai_scene.xml": (TransferCubeEETask, "sim_transfer_cube"),
+    "trossen_ai_scene_joint.xml": (TransferCubeTask, "sim_transfer_cube"),
+}
+
+
+def timed(fn, repeats: int = 1) -> float:
+    """Return the mean wall time of ``fn()`` in milliseconds."""
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats * 1e3
+
+
+def benchmark(repeats: int):
+    cache_dir = tempfile.mkdtemp(prefix="model_cache_")
+    try:
+        print(f"{'scene':34s} {'xml':>9s} {'mjb':>9s} {'hit':>9s} {'make_env':>9s}  (ms)")
+        for xml_file, (task_cls, task_name) in SCENES.items():
+            xml_path = os.path.join(ASSETS_DIR, xml_file)
+            xml_ms = timed(lambda: mujoco.MjModel.from_xml_path(xml_path), repeats)
+
+            clear_model_cache()
+            load_model(xml_path, cache_dir=cache_dir)  # compile once and write the binary
+
+            def cold_process_load():
+                clear_model_cache()
+                load_model(xml_path, cache_dir=cache_dir)
+
+            mjb_ms = timed(cold_process_load, repeats)
+            hit_ms = timed(lambda: load_model(xml_path, cache_dir=cache_dir), 100)
+            env_ms = timed(
+                lambda: make_sim_env(task_cls, xml_file=xml_file, task_name=task_name),
+                repeats,
+            )
+            print(f"{xml_file:34s} {xml_ms:9.1f} {mjb_ms:9.1f} {hit_ms:9.3f} {env_ms:9.1f}")
+    finally:
+        clear_model_cache()
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the compiled-model cache.")
+    parser.add_argument("--repeats", type=int, default=5, help="Repetitions per measurement.")
+    args = parser.parse_args()
+
+    benchmark(args.repeats)
@@ -0,0 +1,68 @@
+"""
+Benchmark state-only simulation throughput of the dm_control and native MuJoCo backends.
+
+Holds the joint environment at its start pose and reports environment steps per second.
+No camera is read, so nothing is rendered.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trossen_arm_mujoco.sim_env import BOX_POSE, OneArmPickPlaceTask, TransferCubeTask
+from trossen_arm_mujoco.utils import make_sim_env, sample_box_pose
+
+
+def steps_per_second(task_name: str, backend: str, num_steps: int) -> float:
+    if task_name == "sim_pick_place":
+        task_cls = OneArmPickPlaceTask
+        xml_file = "trossen_one_arm_scene_joint.xml"
+    else:
+        task_cls = TransferCubeTask
+        xml_file = "trossen_ai_scene_joint.xml"
+
+    np.random.seed(0)
+    BOX_POSE[0] = sample_box_pose()
+    env = make_sim_env(
+        task_class=task_cls,
+        xml_file=xml_file,
+        task_name=task_name,
+        random=True,
+        backend=backend,
+    )
+    ts = env.reset()
+    action = ts.observation["qpos"].copy()
+
+    t0 = time.perf_counter()
+    for _ in range(num_steps):
+        ts = env.step(action)
+        if ts.last():
+            ts = env.reset()
+    elapsed = time.perf_counter() - t0
+    env.close()
+    return num_steps / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark simulation backends.")
+    parser.add_argument(
+        "--task_name",
+        type=str,
+        default="sim_pick_place",
+        choices=["sim_pick_place", "sim_transfer_cube"],
+        help="Task to benchmark.",
+    )
+    parser.add_argument("--num_steps", type=int, default=3000, help="Environment steps to time.")
+    args = parser.parse_args()
+
+    results = {
+        backend: steps_per_second(args.task_name, backend, args.num_steps)
+        for backend in ("dm_control", "native")
+    }
+    for backend, sps in results.items():
+        print(f"{backend:12s} {sps:8.1f} steps/s")
+    print(f"Speedup: {results['native'] / results['dm_control']:.2f}x")
@@ -0,0 +1,194 @@
+"""
+Benchmark the wire formats of inference requests.
+
+Starts a local HTTP server that decodes ``/predict`` requests by their ``Content-Type`` (as the
+inference service does) and answers with an action, then sends it the same observation through
+``NIMClient`` in every wire format and image encoding. Reports the request size, the client
+encode and server decode times, the round-trip latency, and the largest pixel error of the image
+the server received (zero for the lossless formats).
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import sys
+import threading
+import time
+
+import h5py
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trossen_arm_mujoco.image_storage import read_images
+from trossen_arm_mujoco.inference_client import NIMClient
+from trossen_arm_mujoco.wire_format import (
+    IMAGE_ENCODINGS,
+    WIRE_FORMATS,
+    accepted_wire_format,
+    decode_arrays,
+    encode_arrays,
+)
+
+
+class PredictHandler(BaseHTTPRequestHandler):
+    """Decode requests in any wire format and answer with a fixed action, or action chunk."""
+
+    # keep connections alive between requests, as the inference service does
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    action = np.zeros(8, dtype=np.float32)
+    actions = np.zeros((100, 8), dtype=np.float32)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        t0 = time.perf_counter()
+        try:
+            arrays = decode_arrays(body, self.headers.get("Content-Type"))
+        except ValueError:
+            self.send_error(415)
+            return
+        self.server.decode_times.append(time.perf_counter() - t0)
+        self.server.last_request = arrays
+
+        wire_format = accepted_wire_format(self.headers.get("Accept"))
+        if self.path.endswith("/predict_chunk"):
+            result = {"actions": self.actions}
+        else:
+            result = {"action": self.action}
+        response, content_type = encode_arrays(result, wire_format)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def load_observation(episode: str | None, cam_name: str) -> dict:
+    """Return an observation as the gym env produces it, with a CHW image."""
+    if episode:
+        with h5py.File(episode, "r") as root:
+            image = read_images(root[f"/observations/images/{cam_name}"], 0)
+            state = root["/observations/qpos"][0].astype(np.float32)
+    else:
+        # a smooth synthetic frame with sensor-like noise
+        rng = np.random.default_rng(0)
+        y, x = np.mgrid[0:480, 0:640]
+        image = np.stack([x * 255 // 640, y * 255 // 480, (x + y) * 255 // 1120], axis=-1)
+        image = np.clip(image + rng.integers(-4, 5, image.shape), 0, 255).astype(np.uint8)
+        state = rng.standard_normal(8).astype(np.float32)
+    return {
+        "observation.state": state,
+        "observation.images.top_cam": np.ascontiguousarray(image.transpose(2, 0, 1)),
+    }
+
+
+def benchmark_format(
+    server,
+    url: str,
+    observation: dict,
+    wire_format: str,
+    image_encoding: str,
+    quality: int | None,
+    num_requests: int,
+) -> dict:
+    """Send ``num_requests`` observations in one format and return its measurements."""
+    client = NIMClient(url, wire_format, image_encoding, quality)
+    arrays = {
+        "state": observation["observation.state"],
+        "image": observation["observation.images.top_cam"],
+    }
+    encode_times = []
+    for _ in range(num_requests):
+        t0 = time.perf_counter()
+        body, _ = encode_arrays(arrays, wire_format, image_encoding, quality)
+        encode_times.append(time.perf_counter() - t0)
+
+    client.predict(observation)  # warm up
+    server.decode_times.clear()
+    latencies = []
+    for _ in range(num_requests):
+        t0 = time.perf_counter()
+        client.predict(observation)
+        latencies.append(time.perf_counter() - t0)
+    received = np.asarray(server.last_request["image"]).astype(np.int16)
+    return {
+        "size_kb": len(body) / 1024,
+        "encode_ms": 1000 * np.median(encode_times),
+        "decode_ms": 1000 * np.median(server.decode_times),
+        "p50_ms": 1000 * np.median(latencies),
+        "p95_ms": 1000 * np.percentile(latencies, 95),
+        "max_error": int(np.abs(received - arrays["image"]).max()),
+    }
+
+
+def main(args):
+    observation = load_observation(args.episode, args.cam_name)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PredictHandler)
+    server.decode_times = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    image_shape = observation["observation.images.top_cam"].shape
+    print(f"{args.num_requests} requests of a {image_shape} image to {url}")
+    print(
+        f"{'format':>8} {'images':>7} {'size KB':>9} {'encode ms':>10} {'decode ms':>10} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'max err':>8}"
+    )
+    baseline_name = args.formats.split(",")[0]
+    baseline = None
+    try:
+        for wire_format in args.formats.split(","):
+            for image_encoding in args.image_encodings.split(","):
+                try:
+                    result = benchmark_format(
+                        server,
+                        url,
+                        observation,
+                        wire_format,
+                        image_encoding,
+                        args.quality,
+                        args.num_requests,
+                    )
+                except ImportError as e:
+                    print(f"{wire_format:>8} {image_encoding:>7} skipped, {e}")
+                    continue
+                baseline = baseline or result
+                print(
+                    f"{wire_format:>8} {image_encoding:>7} {result['size_kb']:9.1f} "
+                    f"{result['encode_ms']:10.2f} {result['decode_ms']:10.2f} "
+                    f"{result['p50_ms']:8.2f} {result['p95_ms']:8.2f} {result['max_error']:8d}  "
+                    f"({baseline['p50_ms'] / result['p50_ms']:.1f}x faster, "
+                    f"{baseline['size_kb'] / result['size_kb']:.1f}x smaller than {baseline_name})"
+                )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark wire formats of inference requests.")
+    parser.add_argument(
+        "--episode", help="Recorded episode to take the observation from (default: synthetic)."
+    )
+    parser.add_argument("--cam_name", default="cam_high", help="Camera to take the image from.")
+    parser.add_argument("--num_requests", type=int, default=50, help="Requests sent per format.")
+    parser.add_argument(
+        "--formats",
+        default=",".join(WIRE_FORMATS),
+        help="Comma-separated wire formats, the first is the baseline.",
+    )
+    parser.add_argument(
+        "--image_encodings",
+        default=",".join(IMAGE_ENCODINGS),
+        help="Comma-separated image encodings.",
+    )
+    parser.add_argument("--quality", type=int, help="JPEG quality or PNG compression level.")
+    args = parser.parse_args()
+    main(args)
@@ -1,92 +1,214 @@
 
 import argparse
-import h5py
-import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import os
 import shutil
+import time
 from pathlib import Path
+
+import h5py
+import numpy as np
 from tqdm import tqdm
-import torch
-from lerobot.datasets.lerobot_dataset import LeRobotDataset
 
 # Add project root to sys.path
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from trossen_arm_mujoco.conversion_index import FINGERPRINTS, INDEX_FILENAME, ConversionIndex
+from trossen_arm_mujoco.image_storage import read_images
+from trossen_arm_mujoco.lerobot_writer import LeRobotDatasetWriter
+from trossen_arm_mujoco.manifest import list_episode_files
+
+CAM_NAME = "cam_high"  # stored as observation.images.top_cam
+
+
+def build_part(
+    file_paths,
+    root,
+    repo_id,
+    chunk_size=64,
+    vcodec="libsvtav1",
+    encoder_queue_size=60,
+    progress=True,
+    on_episode_saved=None,
+):
+    """
+    Build a LeRobot dataset from HDF5 episodes, streaming their frames, or append them to it.
+
+    Frames are read ``chunk_size`` at a time, and each episode's video is encoded on encoder
+    threads while its frames are added, so no episode is held in memory whole. Reading waits for
+    the encoder whenever its queue is full, no frame is dropped.
+
+    :param file_paths: Paths of the HDF5 episodes, in dataset order.
+    :param root: Directory of the LeRobot dataset, created if it does not exist.
+    :param repo_id: Repository id of the dataset.
+    :param chunk_size: Number of frames read at a time, defaults to ``64``.
+    :param vcodec: Video codec, defaults to ``'libsvtav1'``.
+    :param encoder_queue_size: Frames buffered per camera for the video encoder, defaults to
+        ``60``.
+    :param progress: Whether to show a progress bar, defaults to ``True``.
+    :param on_episode_saved: Called with the path and dataset episode index of every file
+        (``None`` for a file without frames) once it is saved, defaults to none.
+    :return: Number of frames, seconds spent reading, adding frames and saving episodes, and the
+        dataset episode index of every file, ``None`` for a file without frames.
+    """
+    timings = {"frames": 0, "read": 0.0, "add": 0.0, "save": 0.0, "episodes": []}
+    with h5py.File(file_paths[0], "r") as f:
+        qpos_dim = f["observations/qpos"].shape[1]
+        images = f[f"observations/images/{CAM_NAME}"]
+        # encoded images keep their shape as an attribute
+        height, width = images.attrs["shape"][:2] if "encoding" in images.attrs else images.shape[1:3]
+
+    with LeRobotDatasetWriter(
+        root=str(root),
+        repo_id=repo_id,
+        qpos_dim=qpos_dim,
+        cam_list=[CAM_NAME],
+        height=int(height),
+        width=int(width),
+        vcodec=vcodec,
+        encoder_queue_size=encoder_queue_size,
+    ) as dataset_writer:
+        for file_path in tqdm(file_paths, disable=not progress):
+            with h5py.File(file_path, "r") as f, dataset_writer.episode_writer() as episode:
+                length = f["action"].shape[0]
+                actions = f["action"][:]
+                qpos = f["observations/qpos"][:]
+                images = f[f"observations/images/{CAM_NAME}"]
+
+                for start in range(0, length, chunk_size):
+                    stop = min(start + chunk_size, length)
+                    t0 = time.perf_counter()
+                    # HDF5 is (T, H, W, C), LeRobot takes HWC frames as well
+                    imgs = read_images(images, slice(start, stop))
+                    timings["read"] += time.perf_counter() - t0
+                    for i in range(start, stop):
+                        episode.append(qpos[i], None, None, actions[i], {CAM_NAME: imgs[i - start]})
+                timings["add"] += episode.write_time
+                t0 = time.perf_counter()
+            # the episode is saved when its writer closes
+            timings["save"] += time.perf_counter() - t0
+            timings["frames"] += length
+            episode_index = episode.episode_index if length else None
+            timings["episodes"].append((file_path, episode_index))
+            if on_episode_saved is not None:
+                on_episode_saved(file_path, episode_index)
+    return timings
+
+
+def _build_part_in_worker(args):
+    return build_part(*args, progress=False)
+
+
 def create_dataset(args):
     data_dir = Path(args.data_dir)
     output_dir = Path(args.output_dir)
     repo_id = args.repo_id
 
+    # a dataset built by this script is appended to, it keeps an index of the converted episodes
+    appending = False
     if output_dir.exists():
         if args.overwrite:
             shutil.rmtree(output_dir)
+        elif (output_dir / "meta" / "info.json").exists() and (output_dir / INDEX_FILENAME).exists():
+            appending = True
         else:
             print(f"Output directory {output_dir} already exists. Use --overwrite to overwrite.")
             return
 
-    # Define features
-    features = {
-        "action": {
-            "dtype": "float32",
-            "shape": (8,),
-            "names": ["joint_0", "joint_1", "joint_2", "joint_3", "joint_4", "joint_5", "gripper_l", "gripper_r"]
-        },
-        "observation.state": {
-            "dtype": "float32",
-            "shape": (8,),
-            "names": ["joint_0_pos", "joint_1_pos", "joint_2_pos", "joint_3_pos", "joint_4_pos", "joint_5_pos", "gripper_l_pos", "gripper_r_pos"]
-        },
-        "observation.images.top_cam": {
-            "dtype": "video",
-            "shape": (3, 480, 640),
-            "names": ["channels", "height", "width"],
-        }
-    }
-    
-    dataset = LeRobotDataset.create(
-        repo_id=repo_id,
-        fps=50,
-        features=features,
-        root=output_dir,
-        use_videos=True
-    )
-    
-    # We do NOT add timestamp or task here to avoid validation errors if LeRobot schema logic is strict.
-    # LeRobotDataset usually auto-manages timestamp/index.
-
-    hdf5_files = sorted(list(data_dir.glob("episode_*.hdf5")))
-    print(f"Found {len(hdf5_files)} HDF5 files.")
-
-    for file_path in tqdm(hdf5_files):
-        with h5py.File(file_path, "r") as f:
-            length = f["action"].shape[0]
-            actions = f["action"][:]
-            qpos = f["observations/qpos"][:]
-            
-            has_image = "observations/images/cam_high" in f
-            if has_image:
-                imgs = f["observations/images/cam_high"][:]
-            
-            for i in range(length):
-                frame = {
-                    "action": torch.from_numpy(actions[i]),
-                    "observation.state": torch.from_numpy(qpos[i]),
-                    "task": "Pick up the red cube and place it in the green bucket."
-                }
-                
-                if has_image:
-                    # HDF5 is (T, H, W, C). imgs[i] is (H, W, C).
-                    # LeRobot expects (C, H, W) for add_frame
-                    img_np = imgs[i]
-                    frame["observation.images.top_cam"] = torch.from_numpy(img_np).permute(2, 0, 1)
-                
-                dataset.add_frame(frame)
-            
-            dataset.save_episode()
-
-    # dataset.save_dataset_meta()
+    # episodes are listed by the dataset manifest, without opening each file
+    all_files = list_episode_files(str(data_dir), successful_only=args.successful_only)
+    print(f"Found {len(all_files)} HDF5 files.")
+
+    index = ConversionIndex(str(output_dir), args.fingerprint)
+    sources = {path: index.source_fingerprint(path) for path in all_files}
+    hdf5_files = [path for path in all_files if path not in index]
+    changed = [path for path in all_files if path in index and not index.is_current(path, sources[path])]
+    if appending:
+        print(f"{len(index)} episodes already in the dataset, adding {len(hdf5_files)} new ones.")
+    if changed:
+        # LeRobot datasets can only be appended to, replacing an episode means a rebuild
+        print(f"Warning: {len(changed)} episodes changed since they were added, use --overwrite to rebuild with them.")
+    if not hdf5_files:
+        return
+
+    t_start = time.time()
+    num_workers = max(1, min(args.workers, len(hdf5_files)))
+    if appending or num_workers == 1:
+        # new episodes are appended to the dataset in one process, its stats are updated per
+        # episode, so the time taken only depends on the new episodes
+
+        def record_episode(path, episode_index):
+            # index every episode once saved, so a run that fails part way never leaves
+            # episodes in the dataset that the next run would append again
+            index.update(path, sources[path], episode_index=episode_index)
+            index.save()
+
+        num_workers = 1
+        timings = [
+            build_part(
+                hdf5_files,
+                output_dir,
+                repo_id,
+                args.chunk_size,
+                args.vcodec,
+                args.encoder_queue_size,
+                on_episode_saved=record_episode,
+            )
+        ]
+        merge_time = 0.0
+    else:
+        # each worker builds a dataset from a contiguous block of episodes, the blocks are then
+        # merged in order, which renumbers episodes and frames and merges their stats
+        parts_dir = output_dir.parent / f".{output_dir.name}.parts"
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        blocks = [list(block) for block in np.array_split(hdf5_files, num_workers)]
+        part_roots = [parts_dir / f"part_{k}" for k in range(num_workers)]
+        jobs = [
+            (block, root, repo_id, args.chunk_size, args.vcodec, args.encoder_queue_size)
+            for block, root in zip(blocks, part_roots)
+        ]
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(num_workers, mp_context=context) as executor:
+                timings = list(
+                    tqdm(executor.map(_build_part_in_worker, jobs), total=num_workers, desc="Parts")
+                )
+
+            from lerobot.datasets.aggregate import aggregate_datasets
+
+            t_merge = time.time()
+            aggregate_datasets(
+                repo_ids=[repo_id] * num_workers,
+                aggr_repo_id=repo_id,
+                roots=part_roots,
+                aggr_root=output_dir,
+            )
+            merge_time = time.time() - t_merge
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+        # episodes of a part follow those of the parts before it
+        episodes = []
+        for part in timings:
+            offset = sum(i is not None for _, i in episodes)
+            episodes += [(path, None if i is None else offset + i) for path, i in part["episodes"]]
+        for path, episode_index in episodes:
+            index.update(path, sources[path], episode_index=episode_index)
+        index.save()
+    elapsed = time.time() - t_start
+
+    # stage times are summed over workers, so frames/s are per worker
+    num_frames = sum(t["frames"] for t in timings)
     print(f"Dataset saved to {output_dir}")
+    print(f"Built {len(hdf5_files)} episodes, {num_frames} frames with {num_workers} workers")
+    for stage, label in [("read", "Read HDF5"), ("add", "Add frames"), ("save", "Save episodes")]:
+        stage_time = sum(t[stage] for t in timings)
+        print(f"  {label:14s} {stage_time:8.1f} secs ({num_frames / max(stage_time, 1e-9):8.1f} frames/s per worker)")
+    if num_workers > 1:
+        print(f"  {'Merge':14s} {merge_time:8.1f} secs")
+    print(f"Total {elapsed:.1f} secs ({num_frames / elapsed:.1f} frames/s)")
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -94,6 +216,17 @@ if __name__ == "__main__":
     parser.add_argument("--output_dir", required=True, help="Output directory for LeRobot dataset")
     parser.add_argument("--repo_id", default="local/sim_pick_place_demo", help="Repo ID for the dataset")
     parser.add_argument("--overwrite", action="store_true", help="Overwrite output directory if exists")
-    
+    parser.add_argument("--successful_only", action="store_true", help="Only include episodes marked successful in the manifest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of processes encoding episodes (default: all CPUs)")
+    parser.add_argument("--chunk_size", type=int, default=64, help="Frames read from HDF5 at a time")
+    parser.add_argument("--vcodec", default="libsvtav1", help="Video codec")
+    parser.add_argument("--encoder_queue_size", type=int, default=60, help="Frames buffered per camera for the video encoder")
+    parser.add_argument(
+        "--fingerprint",
+        choices=FINGERPRINTS,
+        default="stat",
+        help="Detect changed episodes by size and modification time (stat) or by content hash (hash), rehashing only episodes whose size or modification time changed, kept from an existing index",
+    )
+
     args = parser.parse_args()
     create_dataset(args)
@@ -1,9 +1,15 @@
 
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import threading
 import gymnasium as gym
 import numpy as np
 import cv2
 import sys
 import os
+import time
 import tqdm
 from pathlib import Path
 
@@ -13,6 +19,61 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 from trossen_arm_mujoco.gym_env import TrossenGymEnv
 from trossen_arm_mujoco.inference_client import InferenceClient
 
+# Environments seed the global numpy RNG on reset, so resets run one at a time. Steps need no
+# lock: every environment simulates its own copy of the model (see model_cache.load_model).
+_reset_lock = threading.Lock()
+
+
+def _reset_env(env, seed):
+    with _reset_lock:
+        return env.reset(seed=seed)
+
+
+async def _run_env(stream, client, seeds, max_steps, results):
+    """
+    Run episodes on one environment until no seeds are left.
+
+    The environment lives on its own thread (rendering contexts are bound to
+    the thread that created them), so its steps run while other environments
+    wait for inference, and its inference runs while they step.
+    """
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(1, thread_name_prefix=f"env{stream}") as env_thread:
+        env = await loop.run_in_executor(env_thread, partial(TrossenGymEnv, render_mode="rgb_array"))
+        try:
+            while seeds:
+                seed = seeds.popleft()
+                obs, _ = await loop.run_in_executor(env_thread, _reset_env, env, seed)
+                client.reset(stream)
+                ep_reward = 0
+                ep_success = False
+                frames = []
+                for step in range(max_steps):
+                    action_np = await client.predict_async(obs, stream)
+                    obs, reward, terminated, truncated, info = await loop.run_in_executor(
+                        env_thread, env.step, action_np
+                    )
+                    if reward == 4:
+                        ep_success = True
+                    ep_reward += reward
+                    frames.append(env.render())
+                    if terminated or truncated:
+                        break
+                print(f"Episode {seed+1}: {'SUCCESS' if ep_success else 'FAILURE'} (env {stream})")
+                results[seed] = (ep_success, ep_reward, frames)
+        finally:
+            await loop.run_in_executor(env_thread, env.close)
+
+
+async def _eval_pipelined(client, num_episodes, num_envs, max_steps):
+    """Run episodes on ``num_envs`` environments sharing one client, by seed."""
+    seeds = deque(range(num_episodes))
+    results = {}
+    await asyncio.gather(
+        *(_run_env(stream, client, seeds, max_steps, results) for stream in range(num_envs))
+    )
+    return [results[seed] for seed in range(num_episodes)]
+
 
 def eval_policy(
     checkpoint_dir: str = "outputs/train/act_pick_place_10k/checkpoints/010000/pretrained_model",
@@ -20,6 +81,7 @@ def eval_policy(
     output_video: str = "visualizations/after_training.mp4",
     inference_mode: str = None,
     max_steps: int = 600,
+    num_envs: int = 1,
 ):
     """
     Evaluate trained policy using inference client.
@@ -29,6 +91,10 @@ def eval_policy(
         num_episodes: Number of episodes to evaluate
         output_video: Path to save output video
         inference_mode: "triton" or "local" (defaults to env var)
+        num_envs: Number of environments sharing the client. With more than
+            one, each steps while the others wait for inference, so the
+            simulator and the inference server are both kept busy. Episode
+            i still uses seed i.
     """
     print(f"Initializing inference client...")
     
@@ -38,55 +104,71 @@ def eval_policy(
         checkpoint_dir=checkpoint_dir,
     )
     
-    env = TrossenGymEnv(render_mode="rgb_array")
-    
     success_count = 0
     total_rewards = []
     frames = []
+    t_start = time.time()
+
+    if num_envs > 1:
+        print(f"Running {num_episodes} episodes on {num_envs} environments...")
+        for ep_success, ep_reward, ep_frames in asyncio.run(
+            _eval_pipelined(client, num_episodes, num_envs, max_steps)
+        ):
+            success_count += ep_success
+            total_rewards.append(ep_reward)
+            frames.extend(ep_frames)
+    else:
+        env = TrossenGymEnv(render_mode="rgb_array")
 
-    for ep in range(num_episodes):
-        print(f"Running Episode {ep+1}/{num_episodes} (Seed {ep})...")
-        obs, _ = env.reset(seed=ep)
-        done = False
-        ep_reward = 0
-        ep_success = False
+        for ep in range(num_episodes):
+            print(f"Running Episode {ep+1}/{num_episodes} (Seed {ep})...")
+            obs, _ = env.reset(seed=ep)
+            client.reset()
+            done = False
+            ep_reward = 0
+            ep_success = False
         
-        # max_steps set by argument
-        step = 0
+            # max_steps set by argument
+            step = 0
         
-        while not done and step < max_steps:
-            # Run inference using client (handles all preprocessing)
-            action_np = client.predict(obs)
+            while not done and step < max_steps:
+                # Run inference using client (handles all preprocessing)
+                action_np = client.predict(obs)
             
-            obs, reward, terminated, truncated, info = env.step(action_np)
+                obs, reward, terminated, truncated, info = env.step(action_np)
             
-            # Check success condition
-            if reward == 4:
-                ep_success = True
+                # Check success condition
+                if reward == 4:
+                    ep_success = True
             
-            ep_reward += reward
-            step += 1
+                ep_reward += reward
+                step += 1
             
-            # Capture frame
-            frame = env.render()
-            frames.append(frame)
+                # Capture frame
+                frame = env.render()
+                frames.append(frame)
             
-            if terminated or truncated:
-                done = True
+                if terminated or truncated:
+                    done = True
         
-        if ep_success:
-            print(f"Episode {ep+1}: SUCCESS")
-            success_count += 1
-        else:
-            print(f"Episode {ep+1}: FAILURE")
+            if ep_success:
+                print(f"Episode {ep+1}: SUCCESS")
+                success_count += 1
+            else:
+                print(f"Episode {ep+1}: FAILURE")
         
-        total_rewards.append(ep_reward)
+            total_rewards.append(ep_reward)
+
+        env.close()
 
-    env.close()
     client.close()
+    elapsed = time.time() - t_start
     
     success_rate = success_count / num_episodes
     print(f"\nEvaluation Complete.")
+    print(f"{len(frames)} steps in {elapsed:.1f} secs ({len(frames) / max(elapsed, 1e-9):.1f} steps/s)")
+    if hasattr(client, "metrics"):
+        print(f"Inference requests: {client.metrics()}")
     print(f"Success Rate: {success_rate * 100:.2f}% ({success_count}/{num_episodes})")
     
     # Save video
@@ -123,6 +205,7 @@ if __name__ == "__main__":
     )
     parser.add_argument("--episodes", type=int, default=10, help="Number of episodes")
     parser.add_argument("--max_steps", type=int, default=600, help="Max steps per episode")
+    parser.add_argument("--num_envs", type=int, default=1, help="Environments sharing the client, stepping while others wait for inference")
     parser.add_argument("--output_video", type=str, default="visualizations/after_training.mp4", help="Output video path")
     
     args = parser.parse_args()
@@ -132,5 +215,6 @@ if __name__ == "__main__":
         num_episodes=args.episodes,
         inference_mode=args.mode,
         max_steps=args.max_steps,
-        output_video=args.output_video
+        output_video=args.output_video,
+        num_envs=args.num_envs,
     )
@@ -1,4 +1,5 @@
 
+import argparse
 import sys
 import os
 import site
@@ -45,6 +46,42 @@ except ImportError:
     print(f"Could not import lerobot_train from {lerobot_scripts_path}")
     sys.exit(1)
 
+# Serve video frames from a decoded-frame cache instead of decoding a frame per sample.
+# The cache is built on the first run and rebuilt when the dataset changes. Pass
+# --no_frame_cache (or set FRAME_CACHE=0) to decode from the videos.
+parser = argparse.ArgumentParser(description="Train the ACT policy on the recorded dataset.")
+parser.add_argument(
+    "--no_frame_cache",
+    action="store_true",
+    default=os.environ.get("FRAME_CACHE", "1") == "0",
+    help="Decode video frames per sample instead of serving them from the decoded-frame cache.",
+)
+parser.add_argument(
+    "--frame_cache_resize",
+    type=int,
+    nargs=2,
+    metavar=("HEIGHT", "WIDTH"),
+    help="Cache frames at this resolution, e.g. the policy input (default: video resolution).",
+)
+args, _ = parser.parse_known_args()
+FRAME_CACHE = not args.no_frame_cache
+FRAME_CACHE_RESIZE = args.frame_cache_resize
+
+if FRAME_CACHE:
+    from lerobot.datasets.lerobot_dataset import LeRobotDataset
+    from trossen_arm_mujoco.frame_cache import FrameCache, install_frame_cache
+
+    _make_dataset = lerobot_train.make_dataset
+
+    def make_cached_dataset(cfg):
+        dataset = _make_dataset(cfg)
+        if isinstance(dataset, LeRobotDataset) and dataset.meta.video_keys:
+            print(f"Using decoded-frame cache of {dataset.root}")
+            install_frame_cache(dataset, FrameCache(dataset.root, resize=FRAME_CACHE_RESIZE))
+        return dataset
+
+    lerobot_train.make_dataset = make_cached_dataset
+
 # Construct sys.argv for draccus/argparse
 sys.argv = [
     "lerobot_train.py",
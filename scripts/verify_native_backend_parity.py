@@ -0,0 +1,128 @@
+"""
+Verify that the native MuJoCo backend reproduces the dm_control backend.
+
+Runs the scripted expert in the EE environment and replays the resulting joint trajectory in the
+joint environment on both backends with the same seed, and compares qpos, qvel, env_state and
+reward on every step. Optionally compares the first rendered frame as well.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from trossen_arm_mujoco.ee_sim_env import OneArmPickPlaceEETask, TransferCubeEETask
+from trossen_arm_mujoco.scripted_policy import PickAndPlacePolicy, PickAndTransferPolicy
+from trossen_arm_mujoco.sim_env import BOX_POSE, OneArmPickPlaceTask, TransferCubeTask
+from trossen_arm_mujoco.utils import make_sim_env
+
+TASKS = {
+    "sim_pick_place": (
+        PickAndPlacePolicy,
+        OneArmPickPlaceEETask,
+        OneArmPickPlaceTask,
+        "trossen_one_arm_scene.xml",
+        "trossen_one_arm_scene_joint.xml",
+    ),
+    "sim_transfer_cube": (
+        PickAndTransferPolicy,
+        TransferCubeEETask,
+        TransferCubeTask,
+        "trossen_ai_scene.xml",
+        "trossen_ai_scene_joint.xml",
+    ),
+}
+
+
+def rollout(
+    task_name: str, backend: str, episode_len: int, seed: int, check_images: bool
+) -> dict:
+    """Run the EE pass and the joint replay, returning the per-step states and rewards."""
+    policy_cls, ee_task_cls, sim_task_cls, scene_xml, scene_joint_xml = TASKS[task_name]
+
+    np.random.seed(seed)
+    env = make_sim_env(
+        task_class=ee_task_cls,
+        xml_file=scene_xml,
+        task_name=task_name,
+        random=True,
+        backend=backend,
+    )
+    ts = env.reset()
+    policy = policy_cls(False)
+    ee_steps = [ts]
+    for _ in range(episode_len):
+        ts = env.step(policy(ts))
+        ee_steps.append(ts)
+    joint_traj = [ts.observation["qpos"] for ts in ee_steps]
+    env.close()
+
+    np.random.seed(seed)
+    env = make_sim_env(
+        task_class=sim_task_cls,
+        xml_file=scene_joint_xml,
+        task_name=task_name,
+        random=True,
+        backend=backend,
+    )
+    BOX_POSE[0] = ee_steps[0].observation["env_state"].copy()
+    ts = env.reset()
+    first_frame = ts.observation["images"].render_all() if check_images else None
+    replay_steps = [ts]
+    for action in joint_traj:
+        ts = env.step(action)
+        replay_steps.append(ts)
+
+    env.close()
+
+    result = {"first_frame": first_frame}
+    for name, steps in (("ee", ee_steps), ("replay", replay_steps)):
+        for key in ("qpos", "qvel", "env_state"):
+            result[f"{name}/{key}"] = np.array([ts.observation[key] for ts in steps])
+        result[f"{name}/reward"] = np.array([ts.reward for ts in steps[1:]])
+    return result
+
+
+def verify(task_name: str, episode_len: int, seed: int, check_images: bool) -> bool:
+    reference = rollout(task_name, "dm_control", episode_len, seed, check_images)
+    native = rollout(task_name, "native", episode_len, seed, check_images)
+
+    ok = True
+    for key in sorted(k for k in reference if "/" in k):
+        max_diff = np.max(np.abs(reference[key] - native[key]))
+        status = "OK" if max_diff == 0 else "MISMATCH"
+        ok &= max_diff == 0
+        print(f"{key:20s} max abs diff: {max_diff:.3e}  {status}")
+
+    if check_images:
+        cam = next(iter(reference["first_frame"]))
+        ref_img = reference["first_frame"][cam].astype(np.int16)
+        native_img = native["first_frame"][cam].astype(np.int16)
+        mean_diff = np.mean(np.abs(ref_img - native_img))
+        print(f"{'image/' + cam:20s} mean abs diff: {mean_diff:.3f}")
+
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify native vs dm_control backend parity.")
+    parser.add_argument(
+        "--task_name",
+        type=str,
+        default="sim_pick_place",
+        choices=list(TASKS),
+        help="Task to verify.",
+    )
+    parser.add_argument("--episode_len", type=int, default=600, help="Steps of the EE pass.")
+    parser.add_argument("--seed", type=int, default=0, help="Box pose seed.")
+    parser.add_argument(
+        "--check_images",
+        action="store_true",
+        help="Also compare the first rendered camera frame.",
+    )
+    args = parser.parse_args()
+
+    sys.exit(0 if verify(args.task_name, args.episode_len, args.seed, args.check_images) else 1)
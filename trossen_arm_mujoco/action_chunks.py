@@ -0,0 +1,117 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Execute the action chunks predicted by a policy one step at a time.
+
+ACT predicts the actions of the next ``chunk_size`` steps at once, so a client only needs to
+query the policy once per chunk. :class:`ActionChunkBuffer` holds the predicted chunks of one
+environment and tells when the next one is needed.
+"""
+
+from collections import deque
+
+import numpy as np
+
+
+class ActionChunkBuffer:
+    """
+    The action chunks predicted for one environment, and the step it is at.
+
+    A new chunk is needed every ``replan_interval`` steps, or once the latest chunk is used up.
+    Without temporal ensembling, the action of a step is taken from the latest chunk. With it, the
+    actions every chunk predicted for the step are averaged with weights ``exp(-coeff * i)``, ``i``
+    counting from the oldest chunk, as in the ACT paper.
+
+    :param replan_interval: Steps between two chunks, defaults to the length of a chunk.
+    :param temporal_ensemble_coeff: Weight decay of the temporal ensembling, ``None`` to disable
+        it, defaults to ``None``.
+    """
+
+    def __init__(
+        self,
+        replan_interval: int | None = None,
+        temporal_ensemble_coeff: float | None = None,
+    ):
+        if replan_interval is not None and replan_interval < 1:
+            raise ValueError(f"The replanning interval must be at least 1, got {replan_interval}")
+        self.replan_interval = replan_interval
+        self.temporal_ensemble_coeff = temporal_ensemble_coeff
+        # (step of the first action, chunk), the oldest first
+        self._chunks = deque()
+        self._step = 0
+
+    @property
+    def step(self) -> int:
+        """Number of actions taken so far."""
+        return self._step
+
+    def needs_chunk(self) -> bool:
+        """Return whether a new chunk must be added before the next action."""
+        if not self._chunks:
+            return True
+        start, chunk = self._chunks[-1]
+        interval = len(chunk)
+        if self.replan_interval is not None:
+            interval = min(self.replan_interval, interval)
+        return self._step - start >= interval
+
+    def add(self, chunk: np.ndarray) -> None:
+        """
+        Add a chunk predicted from the observation of the current step.
+
+        :param chunk: The ``(chunk_size, action_dim)`` actions, the first one for the current step.
+        """
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if chunk.ndim != 2 or len(chunk) == 0:
+            raise ValueError(f"Expected a (chunk_size, action_dim) chunk, got shape {chunk.shape}")
+        if self.temporal_ensemble_coeff is None:
+            self._chunks.clear()
+        self._chunks.append((self._step, chunk))
+
+    def pop(self) -> np.ndarray:
+        """
+        Return the action of the current step and move to the next one.
+
+        :return: The ``(action_dim,)`` action.
+        :raises RuntimeError: If no chunk covers the current step.
+        """
+        # chunks ending before this step no longer contribute
+        while self._chunks and self._step - self._chunks[0][0] >= len(self._chunks[0][1]):
+            self._chunks.popleft()
+        if not self._chunks:
+            raise RuntimeError(f"No action chunk covers step {self._step}, add one first")
+
+        actions = np.stack([chunk[self._step - start] for start, chunk in self._chunks])
+        if len(actions) == 1:
+            action = actions[0]
+        else:
+            weights = np.exp(-self.temporal_ensemble_coeff * np.arange(len(actions)))
+            action = (weights[:, None] * actions).sum(axis=0) / weights.sum()
+        self._step += 1
+        return action.astype(np.float32, copy=False)
@@ -33,6 +33,9 @@ import numpy as np
 
 ROOT_DIR = os.path.expanduser("~/.trossen/mujoco/data/")
 
+# Compiled binary (MJB) models, keyed by a content hash of the scene XML and its assets
+MODEL_CACHE_DIR = os.path.expanduser("~/.trossen/mujoco/model_cache/")
+
 ### Simulated task configurations
 
 SIM_TASK_CONFIGS = {
@@ -0,0 +1,151 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from collections.abc import Iterable
+import weakref
+
+from dm_control.mujoco.engine import Physics
+import mujoco
+import numpy as np
+
+
+class ContactQuery:
+    """
+    Answer geom contact queries for a compiled model without per-contact Python work.
+
+    Geom and joint names are resolved to ids once per model. Each active contact is encoded as the
+    integer ``geom1 * ngeom + geom2``, and every distinct query is compiled once into a boolean
+    lookup table over those codes, so a query costs a single NumPy gather over the raw
+    ``contact.geom1`` / ``contact.geom2`` arrays.
+
+    :param model: The compiled MuJoCo model the ids are resolved against.
+    """
+
+    def __init__(self, model: mujoco.MjModel):
+        self.model = model
+        self._geom_ids: dict[str, int] = {}
+        self._joint_qpos_adr: dict[str, int] = {}
+        self._pair_tables: dict[tuple[str, tuple[str, ...], bool], np.ndarray] = {}
+
+    def geom_id(self, name: str) -> int:
+        """
+        Look up the id of a geom, resolving it against the model on first use.
+
+        :param name: The geom name.
+        :raises ValueError: If the model has no geom with this name.
+        :return: The geom id.
+        """
+        geom_id = self._geom_ids.get(name)
+        if geom_id is None:
+            geom_id = mujoco.mj_name2id(self.model, mujoco.mjtObj.mjOBJ_GEOM, name)
+            if geom_id < 0:
+                raise ValueError(f"Geom {name} does not exist in the model.")
+            self._geom_ids[name] = geom_id
+        return geom_id
+
+    def joint_qpos_adr(self, name: str) -> int:
+        """
+        Look up the start address of a joint in ``qpos``, resolving it on first use.
+
+        :param name: The joint name.
+        :raises ValueError: If the model has no joint with this name.
+        :return: The index of the joint's first coordinate in ``qpos``.
+        """
+        qpos_adr = self._joint_qpos_adr.get(name)
+        if qpos_adr is None:
+            joint_id = mujoco.mj_name2id(self.model, mujoco.mjtObj.mjOBJ_JOINT, name)
+            if joint_id < 0:
+                raise ValueError(f"Joint {name} does not exist in the model.")
+            qpos_adr = int(self.model.jnt_qposadr[joint_id])
+            self._joint_qpos_adr[name] = qpos_adr
+        return qpos_adr
+
+    def contacts(self, data) -> np.ndarray:
+        """
+        Encode the geom pairs of all active contacts.
+
+        :param data: The MuJoCo data, either a raw ``MjData`` or the dm_control wrapper.
+        :return: An ``(ncon,)`` array of ``geom1 * ngeom + geom2`` codes.
+        """
+        contact = getattr(data, "ptr", data).contact
+        return contact.geom1 * self.model.ngeom + contact.geom2
+
+    def touching(
+        self,
+        contacts: np.ndarray,
+        geom: str,
+        others: str | Iterable[str],
+        ordered: bool = False,
+    ) -> bool:
+        """
+        Check whether a geom is in contact with any of the given geoms.
+
+        :param contacts: Encoded contacts as returned by :meth:`contacts`.
+        :param geom: The geom name.
+        :param others: One or more geom names to test against.
+        :param ordered: Only match contacts reported as ``(geom, other)``, defaults to ``False``.
+        :return: ``True`` if any matching contact is active.
+        """
+        others = (others,) if isinstance(others, str) else tuple(others)
+        key = (geom, others, ordered)
+        table = self._pair_tables.get(key)
+        if table is None:
+            table = self._pair_table(geom, others, ordered)
+            self._pair_tables[key] = table
+        return bool(table[contacts].any())
+
+    def _pair_table(self, geom: str, others: tuple[str, ...], ordered: bool) -> np.ndarray:
+        ngeom = self.model.ngeom
+        geom_id = self.geom_id(geom)
+        table = np.zeros(ngeom * ngeom, dtype=bool)
+        for other in others:
+            other_id = self.geom_id(other)
+            table[geom_id * ngeom + other_id] = True
+            if not ordered:
+                table[other_id * ngeom + geom_id] = True
+        return table
+
+
+_CONTACT_QUERIES: "weakref.WeakKeyDictionary[mujoco.MjModel, ContactQuery]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_contact_query(physics: Physics) -> ContactQuery:
+    """
+    Get the shared :class:`ContactQuery` for the model behind a physics instance.
+
+    :param physics: The simulation physics instance.
+    :return: The contact query, created once per compiled model.
+    """
+    model = getattr(physics.model, "ptr", physics.model)
+    query = _CONTACT_QUERIES.get(model)
+    if query is None:
+        query = ContactQuery(model)
+        _CONTACT_QUERIES[model] = query
+    return query
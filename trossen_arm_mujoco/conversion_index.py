@@ -0,0 +1,162 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import json
+import os
+
+# Name of the conversion index in an output directory
+INDEX_FILENAME = "conversion_index.json"
+
+FINGERPRINTS = ("stat", "hash")
+
+
+def source_fingerprint(path: str, fingerprint: str = "stat", previous: dict | None = None) -> dict:
+    """
+    Fingerprint a source episode file.
+
+    :param path: Path of the episode file.
+    :param fingerprint: ``'stat'`` for its size and modification time, which needs no read, or
+        ``'hash'`` for the SHA-256 of its content along with them, defaults to ``'stat'``.
+    :param previous: The fingerprint recorded for the file, its hash is reused without reading
+        the file when the size and modification time still match, defaults to none.
+    :return: The fingerprint, which compares equal for an unchanged file.
+    """
+    if fingerprint not in FINGERPRINTS:
+        raise ValueError(f"Unknown fingerprint: {fingerprint}. Use one of {', '.join(FINGERPRINTS)}.")
+    stat = os.stat(path)
+    source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if fingerprint == "stat":
+        return source
+    if (
+        previous is not None
+        and "sha256" in previous
+        and all(previous.get(key) == value for key, value in source.items())
+    ):
+        return {**source, "sha256": previous["sha256"]}
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {**source, "sha256": digest.hexdigest()}
+
+
+class ConversionIndex:
+    """
+    Sidecar index of the source episodes converted into an output directory.
+
+    Every converted episode is recorded under its file name with the fingerprint of its source
+    and what was produced from it, so a later conversion only processes new or changed episodes.
+
+    :param output_dir: The output directory, holding the index.
+    :param fingerprint: Fingerprint of the source files, see :func:`source_fingerprint`,
+        defaults to ``'stat'``. An existing index keeps the fingerprint it was built with.
+    """
+
+    def __init__(self, output_dir: str, fingerprint: str = "stat"):
+        self.path = os.path.join(output_dir, INDEX_FILENAME)
+        self.fingerprint = fingerprint
+        self.episodes: dict[str, dict] = {}
+        if os.path.isfile(self.path):
+            with open(self.path) as f:
+                index = json.load(f)
+            self.fingerprint = index["fingerprint"]
+            self.episodes = index["episodes"]
+
+    def __contains__(self, source_path: str) -> bool:
+        return os.path.basename(source_path) in self.episodes
+
+    def __len__(self) -> int:
+        return len(self.episodes)
+
+    def get(self, source_path: str) -> dict | None:
+        """Return the index entry of a source episode, or ``None`` if it was never converted."""
+        return self.episodes.get(os.path.basename(source_path))
+
+    def source_fingerprint(self, source_path: str) -> dict:
+        """
+        Fingerprint a source episode with the fingerprint of the index.
+
+        A hash is only computed for a new episode or one whose size or modification time
+        changed since it was indexed. An indexed episode whose content is unchanged gets its new
+        size and modification time recorded, persisted by the next :meth:`save`.
+
+        :param source_path: Path of the source episode.
+        :return: Its current fingerprint, see :func:`source_fingerprint`.
+        """
+        entry = self.get(source_path)
+        if entry is None:
+            return source_fingerprint(source_path, self.fingerprint)
+        source = source_fingerprint(source_path, self.fingerprint, entry["source"])
+        if self.fingerprint == "hash" and entry["source"].get("sha256") == source["sha256"]:
+            entry["source"] = source
+        return source
+
+    def is_current(self, source_path: str, source: dict) -> bool:
+        """
+        Check that a source episode was converted and has not changed since.
+
+        With the ``'hash'`` fingerprint only the content hashes are compared, so an episode
+        that was only touched stays current.
+
+        :param source_path: Path of the source episode.
+        :param source: Its current fingerprint, from :meth:`source_fingerprint`.
+        :return: Whether the recorded fingerprint matches.
+        """
+        entry = self.get(source_path)
+        if entry is None:
+            return False
+        if self.fingerprint == "hash":
+            return entry["source"].get("sha256") == source["sha256"]
+        return entry["source"] == source
+
+    def update(self, source_path: str, source: dict, **outputs) -> None:
+        """
+        Record the conversion of a source episode, call :meth:`save` to persist it.
+
+        :param source_path: Path of the source episode.
+        :param source: Its fingerprint, taken before it was converted.
+        :param outputs: What the episode was converted to, stored with its fingerprint.
+        """
+        self.episodes[os.path.basename(source_path)] = {"source": source, **outputs}
+
+    def remove(self, source_path: str) -> dict | None:
+        """
+        Forget a source episode, call :meth:`save` to persist it.
+
+        :param source_path: Path of the source episode.
+        :return: Its index entry, or ``None`` if it was never converted.
+        """
+        return self.episodes.pop(os.path.basename(source_path), None)
+
+    def save(self) -> None:
+        """Write the index, replacing the previous one atomically."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"fingerprint": self.fingerprint, "episodes": self.episodes}, f, indent=1)
+        os.replace(tmp_path, self.path)
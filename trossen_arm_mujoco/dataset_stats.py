@@ -0,0 +1,220 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from collections.abc import Mapping
+import json
+import os
+
+import numpy as np
+
+# Name of the statistics file in a dataset directory
+STATS_FILENAME = "stats.json"
+
+
+def stats_path(data_dir: str) -> str:
+    """Return the path of the statistics of a dataset directory."""
+    return os.path.join(data_dir, STATS_FILENAME)
+
+
+class RunningStats:
+    """
+    Streaming mean, variance, min and max of vectors.
+
+    Batches are folded in with the parallel form of Welford's algorithm (Chan et al.), so
+    statistics accumulated separately, e.g. by different workers, merge into the ones of the
+    combined data.
+
+    :param dim: Dimension of the vectors.
+    """
+
+    def __init__(self, dim: int):
+        self.count = 0
+        self.mean = np.zeros(dim)
+        self.m2 = np.zeros(dim)  # sum of squared deviations from the mean
+        self.min = np.full(dim, np.inf)
+        self.max = np.full(dim, -np.inf)
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add a batch of vectors.
+
+        :param values: The ``(n, dim)`` batch.
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.mean))
+        if len(values) == 0:
+            return
+        batch = RunningStats(len(self.mean))
+        batch.count = len(values)
+        batch.mean = values.mean(axis=0)
+        batch.m2 = ((values - batch.mean) ** 2).sum(axis=0)
+        batch.min = values.min(axis=0)
+        batch.max = values.max(axis=0)
+        self.merge(batch)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Add the vectors accumulated by ``other``."""
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / count)
+        self.m2 = self.m2 + other.m2 + delta**2 * (self.count * other.count / count)
+        self.count = count
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation."""
+        return np.sqrt(self.m2 / max(self.count, 1))
+
+    def to_dict(self) -> dict:
+        """Return the statistics as JSON-serializable lists."""
+        return {
+            "count": self.count,
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "min": self.min.tolist(),
+            "max": self.max.tolist(),
+            "m2": self.m2.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningStats":
+        """Restore statistics saved by :meth:`to_dict`."""
+        stats = cls(len(data["mean"]))
+        stats.count = data["count"]
+        stats.mean = np.array(data["mean"], dtype=np.float64)
+        stats.m2 = np.array(data["m2"], dtype=np.float64)
+        stats.min = np.array(data["min"], dtype=np.float64)
+        stats.max = np.array(data["max"], dtype=np.float64)
+        return stats
+
+
+class DatasetStats:
+    """
+    Normalization statistics of recorded episodes, accumulated while they are recorded.
+
+    Holds a :class:`RunningStats` per feature: ``qpos``, ``qvel`` and ``action``, and, for every
+    camera, ``images.<camera>`` with the per-channel statistics of pixel values scaled to
+    ``[0, 1]``. Images are only sampled, every ``image_stride``-th frame and every
+    ``pixel_stride``-th pixel along each axis.
+
+    :param image_stride: Frame interval of the sampled images, ``0`` to skip images, defaults to
+        ``10``.
+    :param pixel_stride: Pixel interval of the sampled images, defaults to ``4``.
+    """
+
+    def __init__(self, image_stride: int = 10, pixel_stride: int = 4):
+        self.image_stride = image_stride
+        self.pixel_stride = pixel_stride
+        self.num_episodes = 0
+        # recorded indices of the episodes counted, so an episode is never counted twice
+        self.episode_indices: set[int] = set()
+        self.features: dict[str, RunningStats] = {}
+
+    def update(self, key: str, values: np.ndarray) -> None:
+        """
+        Add a ``(n, dim)`` batch of values of a feature.
+
+        :param key: Name of the feature.
+        :param values: The batch.
+        """
+        values = np.asarray(values)
+        if key not in self.features:
+            self.features[key] = RunningStats(values.shape[-1])
+        self.features[key].update(values)
+
+    def sample_images(self, frame_index: int, images: Mapping[str, np.ndarray]) -> None:
+        """
+        Add the images of a frame if the frame is sampled.
+
+        :param frame_index: Index of the frame in its episode.
+        :param images: The ``(height, width, 3)`` uint8 images by camera name.
+        """
+        if self.image_stride <= 0 or frame_index % self.image_stride:
+            return
+        stride = self.pixel_stride
+        for cam_name, image in images.items():
+            pixels = image[::stride, ::stride].reshape(-1, image.shape[-1])
+            self.update(f"images.{cam_name}", pixels / 255.0)
+
+    def merge(self, other: "DatasetStats") -> None:
+        """Add the episodes accumulated by ``other``, unless they are all counted already."""
+        if other.episode_indices and other.episode_indices <= self.episode_indices:
+            return
+        self.num_episodes += other.num_episodes
+        self.episode_indices |= other.episode_indices
+        for key, stats in other.features.items():
+            if key not in self.features:
+                self.features[key] = RunningStats(len(stats.mean))
+            self.features[key].merge(stats)
+
+    def to_dict(self) -> dict:
+        """Return the statistics as a JSON-serializable dictionary."""
+        return {
+            "num_episodes": self.num_episodes,
+            "episode_indices": sorted(self.episode_indices),
+            "image_stride": self.image_stride,
+            "pixel_stride": self.pixel_stride,
+            "features": {key: stats.to_dict() for key, stats in self.features.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DatasetStats":
+        """Restore statistics saved by :meth:`to_dict`."""
+        stats = cls(data["image_stride"], data["pixel_stride"])
+        stats.num_episodes = data["num_episodes"]
+        stats.episode_indices = set(data["episode_indices"])
+        stats.features = {
+            key: RunningStats.from_dict(feature) for key, feature in data["features"].items()
+        }
+        return stats
+
+    def save(self, data_dir: str) -> None:
+        """Write the statistics next to the dataset, replacing the previous ones atomically."""
+        path = stats_path(data_dir)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, data_dir: str, image_stride: int = 10, pixel_stride: int = 4) -> "DatasetStats":
+        """
+        Read the statistics of a dataset directory.
+
+        :param data_dir: The dataset directory.
+        :param image_stride: Frame interval of new statistics, defaults to ``10``.
+        :param pixel_stride: Pixel interval of new statistics, defaults to ``4``.
+        :return: The saved statistics, or empty ones if the directory has none.
+        """
+        path = stats_path(data_dir)
+        if not os.path.isfile(path):
+            return cls(image_stride, pixel_stride)
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
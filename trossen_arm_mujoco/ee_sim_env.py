@@ -31,16 +31,17 @@ from dm_control.suite import base
 import numpy as np
 
 from trossen_arm_mujoco.constants import START_ARM_POSE
+from trossen_arm_mujoco.contacts import get_contact_query
 from trossen_arm_mujoco.utils import (
+    EpisodeConfigMixin,
     get_observation_base,
     make_sim_env,
     plot_observation_images,
-    sample_box_pose,
     set_observation_images,
 )
 
 
-class TrossenAIStationaryEETask(base.Task):
+class TrossenAIStationaryEETask(EpisodeConfigMixin, base.Task):
     """
     A base task for bimanual Cartesian manipulation with Trossen AI robotic arms in the Trossen AI
     Stationary Kit form factor.
@@ -48,6 +49,7 @@ class TrossenAIStationaryEETask(base.Task):
     :param random: Randomization seed for environment initialization, defaults to ``None``.
     :param onscreen_render: Whether to enable on-screen rendering, defaults to ``False``.
     :param cam_list: List of cameras for observation capture, defaults to ``[]``.
+    :param state_only: Whether to omit camera images from observations, defaults to ``False``.
     """
 
     def __init__(
@@ -55,11 +57,13 @@ class TrossenAIStationaryEETask(base.Task):
         random: int | None = None,
         onscreen_render=False,
         cam_list: list[str] = [],
+        state_only: bool = False,
     ):
         super().__init__(random=random)
         self.cam_list = cam_list
         if self.cam_list == []:
             self.cam_list = ["cam_high", "cam_low", "cam_left_wrist", "cam_right_wrist"]
+        self.state_only = state_only
 
     def before_step(self, action: np.ndarray, physics: Physics) -> None:
         """
@@ -92,7 +96,7 @@ class TrossenAIStationaryEETask(base.Task):
         :param physics: The simulation physics engine.
         """
         # reset joint position
-        physics.named.data.qpos[:12] = START_ARM_POSE[:6] + START_ARM_POSE[8:14]
+        physics.data.qpos[:12] = START_ARM_POSE[:6] + START_ARM_POSE[8:14]
 
         # reset mocap to align with end effector
         np.copyto(physics.data.mocap_pos[0], [-0.19657, -0.019, 0.25021])
@@ -147,7 +151,9 @@ class TrossenAIStationaryEETask(base.Task):
         :param physics: The simulation physics engine.
         :return: The current observation state.
         """
-        obs = get_observation_base(physics, self.cam_list)
+        obs = get_observation_base(
+            physics, self.cam_list, on_screen_render=not self.state_only
+        )
         obs["qpos"] = self.get_position(physics)
         obs["qvel"] = self.get_velocity(physics)
         obs["env_state"] = self.get_env_state(physics)
@@ -177,6 +183,7 @@ class TransferCubeEETask(TrossenAIStationaryEETask):
     :param random: Random seed for environment variability, defaults to ``None``.
     :param onscreen_render: Whether to enable real-time rendering, defaults to ``False``.
     :param cam_list: List of cameras to capture observations, defaults to ``None``.
+    :param state_only: Whether to omit camera images from observations, defaults to ``False``.
     """
 
     def __init__(
@@ -184,11 +191,13 @@ class TransferCubeEETask(TrossenAIStationaryEETask):
         random: int | None = None,
         onscreen_render: bool = False,
         cam_list: list[str] = [],
+        state_only: bool = False,
     ):
         super().__init__(
             random=random,
             onscreen_render=onscreen_render,
             cam_list=cam_list,
+            state_only=state_only,
         )
         self.max_reward = 4
 
@@ -199,9 +208,9 @@ class TransferCubeEETask(TrossenAIStationaryEETask):
         :param physics: The simulation physics engine.
         """
         self.initialize_robots(physics)
-        # randomize box position
-        cube_pose = sample_box_pose()
-        box_start_idx = physics.model.name2id("red_box_joint", "joint")
+        # randomize box position, unless configured
+        cube_pose = self.initial_box_pose()
+        box_start_idx = get_contact_query(physics).joint_qpos_adr("red_box_joint")
         np.copyto(physics.data.qpos[box_start_idx : box_start_idx + 7], cube_pose)
 
         super().initialize_episode(physics)
@@ -224,24 +233,16 @@ class TransferCubeEETask(TrossenAIStationaryEETask):
         :param physics: The simulation physics engine.
         :return: The computed reward.
         """
-        # return whether left gripper is holding the box
-        all_contact_pairs = []
-        for i_contact in range(physics.data.ncon):
-            id_geom_1 = physics.data.contact[i_contact].geom1
-            id_geom_2 = physics.data.contact[i_contact].geom2
-            name_geom_1 = physics.model.id2name(id_geom_1, "geom")
-            name_geom_2 = physics.model.id2name(id_geom_2, "geom")
-            contact_pair = (name_geom_1, name_geom_2)
-            all_contact_pairs.append(contact_pair)
-        touch_left_gripper = (
-            "red_box",
-            "left/gripper_follower_left",
-        ) in all_contact_pairs
-        touch_right_gripper = (
-            "red_box",
-            "right/gripper_follower_left",
-        ) in all_contact_pairs
-        touch_table = ("red_box", "table") in all_contact_pairs
+        # contacts are matched in the (geom1, geom2) order reported by MuJoCo
+        contact_query = get_contact_query(physics)
+        contacts = contact_query.contacts(physics.data)
+        touch_left_gripper = contact_query.touching(
+            contacts, "red_box", "left/gripper_follower_left", ordered=True
+        )
+        touch_right_gripper = contact_query.touching(
+            contacts, "red_box", "right/gripper_follower_left", ordered=True
+        )
+        touch_table = contact_query.touching(contacts, "red_box", "table", ordered=True)
 
         reward = 0
         if touch_right_gripper:
@@ -266,6 +267,7 @@ class OneArmPickPlaceEETask(TrossenAIStationaryEETask):
         random: int | None = None,
         onscreen_render: bool = False,
         cam_list: list[str] = [],
+        state_only: bool = False,
     ):
         if not cam_list:
             cam_list = ["cam_high", "cam_low", "cam_right_wrist"]
@@ -273,6 +275,7 @@ class OneArmPickPlaceEETask(TrossenAIStationaryEETask):
             random=random,
             onscreen_render=onscreen_render,
             cam_list=cam_list,
+            state_only=state_only,
         )
         self.max_reward = 4
 
@@ -280,7 +283,7 @@ class OneArmPickPlaceEETask(TrossenAIStationaryEETask):
         # Initialize right arm (which is now the only arm, indices 0-7)
         # We use the right arm configuration from START_ARM_POSE (indices 8-16 of the bimanual config)
         right_arm_pose = START_ARM_POSE[8:16]
-        physics.named.data.qpos[:8] = right_arm_pose
+        physics.data.qpos[:8] = right_arm_pose
 
         # Reset mocap (only one mocap body for right arm)
         np.copyto(physics.data.mocap_pos[0], [0.19657, -0.019, 0.25021])
@@ -288,11 +291,11 @@ class OneArmPickPlaceEETask(TrossenAIStationaryEETask):
 
     def initialize_episode(self, physics: Physics) -> None:
         self.initialize_robots(physics)
-        # randomize box position
-        cube_pose = sample_box_pose()
+        # randomize box position, unless configured
+        cube_pose = self.initial_box_pose()
         # In single arm setup, box joint starts after 8 arm joints
         # But safer to look it up
-        box_start_idx = physics.model.name2id("red_box_joint", "joint")
+        box_start_idx = get_contact_query(physics).joint_qpos_adr("red_box_joint")
         np.copyto(physics.data.qpos[box_start_idx : box_start_idx + 7], cube_pose)
 
         # Call grandparent initialize_episode (skipping TrossenAIStationaryEETask's empty one if needed, but calling super is fine)
@@ -315,7 +318,9 @@ class OneArmPickPlaceEETask(TrossenAIStationaryEETask):
         return velocities[:8]
 
     def get_observation(self, physics: Physics) -> dict:
-        obs = get_observation_base(physics, self.cam_list)
+        obs = get_observation_base(
+            physics, self.cam_list, on_screen_render=not self.state_only
+        )
         obs["qpos"] = self.get_position(physics)
         obs["qvel"] = self.get_velocity(physics)
         obs["env_state"] = self.get_env_state(physics)
@@ -332,19 +337,17 @@ class OneArmPickPlaceEETask(TrossenAIStationaryEETask):
 
     def get_reward(self, physics: Physics) -> int:
         # Box pose
-        box_start_idx = physics.model.name2id("red_box_joint", "joint")
+        contact_query = get_contact_query(physics)
+        box_start_idx = contact_query.joint_qpos_adr("red_box_joint")
         box_pos = physics.data.qpos[box_start_idx : box_start_idx + 3]
 
         # Check contact
-        all_contact_pairs = []
-        for i_contact in range(physics.data.ncon):
-            id_geom_1 = physics.data.contact[i_contact].geom1
-            id_geom_2 = physics.data.contact[i_contact].geom2
-            name_geom_1 = physics.model.id2name(id_geom_1, "geom")
-            name_geom_2 = physics.model.id2name(id_geom_2, "geom")
-            all_contact_pairs.append({name_geom_1, name_geom_2})
-
-        touch_right_gripper = any({"red_box", "right/gripper_follower_left"} <= pair or {"red_box", "right/gripper_follower_right"} <= pair for pair in all_contact_pairs)
+        contacts = contact_query.contacts(physics.data)
+        touch_right_gripper = contact_query.touching(
+            contacts,
+            "red_box",
+            ["right/gripper_follower_left", "right/gripper_follower_right"],
+        )
 
         # Bucket location: [-0.2, 0, 0]
         # Check if box is within bounds of bucket
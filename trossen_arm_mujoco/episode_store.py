@@ -0,0 +1,249 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+
+import h5py
+import numpy as np
+
+from trossen_arm_mujoco.image_storage import read_images
+
+# Name of the metadata file of an episode store, written last by the importer
+STORE_FILENAME = "store.json"
+
+# Low-dimensional arrays of an episode, by their HDF5 dataset path
+LOWDIM_FIELDS = {
+    "qpos": "/observations/qpos",
+    "qvel": "/observations/qvel",
+    "env_state": "/observations/env_state",
+    "action": "/action",
+}
+
+
+class EpisodeStore:
+    """
+    Read-only store of recorded episodes in flat memory-mapped arrays.
+
+    All episodes are concatenated along the frame axis, in ``.npy`` files that are opened with
+    ``mmap_mode='r'``: the low-dimensional arrays are ``(num_frames, dim)`` float32 and every
+    camera is a ``(num_frames, height, width, 3)`` uint8 array. Frame ``f`` of the episode at
+    position ``e`` is at the global index ``offsets[e] + f``, so any frame is read in O(1)
+    without copies, and pages are shared by every process reading the store. The layout is::
+
+        store.json               episodes, frame counts and array shapes
+        offsets.npy              (num_episodes + 1,) int64 first global index of each episode
+        episode_index.npy        (num_episodes,) int64 recorded index of each episode
+        qpos.npy, qvel.npy, env_state.npy, action.npy
+        images/{cam_name}.npy
+
+    A store is only opened lazily and pickles as its path, so it can be handed to
+    dataloader worker processes, which map it again. Build one with :func:`import_hdf5`.
+
+    :param root: Directory of the store.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        with open(os.path.join(root, STORE_FILENAME)) as f:
+            self.meta = json.load(f)
+        self.cam_names: list[str] = list(self.meta["cameras"])
+        self._arrays: dict[str, np.ndarray] | None = None
+        self._fields: dict[str, np.ndarray] = {}
+
+    def __getstate__(self) -> dict:
+        return {"root": self.root}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["root"])
+
+    def _open(self) -> dict[str, np.ndarray]:
+        if self._arrays is None:
+            arrays = {}
+            for name in ["offsets", "episode_index", *LOWDIM_FIELDS]:
+                arrays[name] = np.load(os.path.join(self.root, f"{name}.npy"), mmap_mode="r")
+            for cam_name in self.cam_names:
+                path = os.path.join(self.root, "images", f"{cam_name}.npy")
+                arrays[f"images/{cam_name}"] = np.load(path, mmap_mode="r")
+            self._arrays = arrays
+            self._fields = {
+                name: array
+                for name, array in arrays.items()
+                if name not in ("offsets", "episode_index")
+            }
+        return self._arrays
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """First global frame index of every episode, followed by the number of frames."""
+        return self._open()["offsets"]
+
+    @property
+    def episode_indices(self) -> np.ndarray:
+        """Recorded index of every episode, in store order."""
+        return self._open()["episode_index"]
+
+    @property
+    def num_episodes(self) -> int:
+        return self.meta["num_episodes"]
+
+    def __len__(self) -> int:
+        return self.meta["num_frames"]
+
+    def array(self, name: str) -> np.ndarray:
+        """
+        Return the memory-mapped array of a field over all frames.
+
+        :param name: ``'qpos'``, ``'qvel'``, ``'env_state'``, ``'action'`` or
+            ``'images/<cam_name>'``.
+        :return: The read-only array.
+        """
+        return self._open()[name]
+
+    def global_index(self, episode: int, frame: int) -> int:
+        """
+        Return the global index of a frame.
+
+        :param episode: Position of the episode in the store.
+        :param frame: Index of the frame in the episode.
+        :raises IndexError: If the frame is outside the episode.
+        """
+        start, stop = self.offsets[episode], self.offsets[episode + 1]
+        if not 0 <= frame < stop - start:
+            raise IndexError(f"Frame {frame} out of range for episode {episode}.")
+        return int(start + frame)
+
+    def locate(self, index: int) -> tuple[int, int]:
+        """Return the episode position and frame index of a global frame index."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Frame {index} out of range for {len(self)} frames.")
+        episode = int(np.searchsorted(self.offsets, index, side="right")) - 1
+        return episode, int(index - self.offsets[episode])
+
+    def episode(self, episode: int) -> dict[str, np.ndarray]:
+        """
+        Return all fields of an episode as views of the store.
+
+        :param episode: Position of the episode in the store.
+        :return: Arrays by field name, see :meth:`array`.
+        """
+        start, stop = self.offsets[episode], self.offsets[episode + 1]
+        return {name: array[start:stop] for name, array in self._fields.items()}
+
+    def __getitem__(self, index: int) -> dict[str, np.ndarray]:
+        """Return all fields of the frame at a global index as views of the store."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Frame {index} out of range for {len(self)} frames.")
+        self._open()
+        return {name: array[index] for name, array in self._fields.items()}
+
+
+def import_hdf5(
+    paths: list[str],
+    root: str,
+    chunk_size: int = 64,
+) -> EpisodeStore:
+    """
+    Build an episode store from HDF5 episodes in the layout written by the recorder.
+
+    Array sizes are taken from the file metadata first, then each episode is copied into the
+    preallocated arrays ``chunk_size`` frames at a time, decoding compressed images. The
+    metadata file is written last, so an interrupted import is not mistaken for a store.
+
+    :param paths: Paths of the HDF5 episodes, in store order, e.g. from
+        :func:`~trossen_arm_mujoco.manifest.list_episode_files`.
+    :param root: Directory of the store to create.
+    :param chunk_size: Number of frames copied at a time, defaults to ``64``.
+    :raises ValueError: If the episodes do not share cameras and array shapes.
+    :return: The new store.
+    """
+    lengths = []
+    shapes = None
+    for path in paths:
+        with h5py.File(path, "r") as f:
+            episode_shapes = {name: f[key].shape[1:] for name, key in LOWDIM_FIELDS.items()}
+            for cam_name, dataset in f["/observations/images"].items():
+                episode_shapes[f"images/{cam_name}"] = (
+                    tuple(dataset.attrs["shape"]) if "encoding" in dataset.attrs
+                    else dataset.shape[1:]
+                )
+            if shapes is None:
+                shapes = episode_shapes
+            elif episode_shapes != shapes:
+                raise ValueError(f"{path} does not have the arrays of {paths[0]}.")
+            lengths.append(f["/action"].shape[0])
+    if shapes is None:
+        raise ValueError("No episodes to import.")
+
+    offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(lengths)
+    num_frames = int(offsets[-1])
+    os.makedirs(os.path.join(root, "images"), exist_ok=True)
+    # a rerun replaces a previous or partial store
+    if os.path.exists(os.path.join(root, STORE_FILENAME)):
+        os.remove(os.path.join(root, STORE_FILENAME))
+
+    arrays = {}
+    for name, shape in shapes.items():
+        dtype = np.uint8 if name.startswith("images/") else np.float32
+        arrays[name] = np.lib.format.open_memmap(
+            os.path.join(root, f"{name}.npy"), mode="w+", dtype=dtype, shape=(num_frames, *shape)
+        )
+
+    episode_indices = []
+    for path, start, length in zip(paths, offsets[:-1], lengths):
+        with h5py.File(path, "r") as f:
+            for name, key in LOWDIM_FIELDS.items():
+                arrays[name][start : start + length] = f[key][:length]
+            for cam_name, dataset in f["/observations/images"].items():
+                target = arrays[f"images/{cam_name}"]
+                for chunk in range(0, length, chunk_size):
+                    stop = min(chunk + chunk_size, length)
+                    target[start + chunk : start + stop] = read_images(dataset, slice(chunk, stop))
+        name = os.path.basename(path)
+        episode_indices.append(int(name.removeprefix("episode_").removesuffix(".hdf5")))
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    np.save(os.path.join(root, "offsets.npy"), offsets)
+    np.save(os.path.join(root, "episode_index.npy"), np.array(episode_indices, dtype=np.int64))
+    meta = {
+        "num_episodes": len(paths),
+        "num_frames": num_frames,
+        "cameras": {
+            name.removeprefix("images/"): list(shape)
+            for name, shape in shapes.items()
+            if name.startswith("images/")
+        },
+        "fields": {name: list(shape) for name, shape in shapes.items()},
+        "sources": [os.path.basename(path) for path in paths],
+    }
+    with open(os.path.join(root, STORE_FILENAME), "w") as f:
+        json.dump(meta, f, indent=1)
+    return EpisodeStore(root)
@@ -0,0 +1,341 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from collections.abc import Callable, Mapping
+import functools
+import os
+import queue
+import threading
+import time
+
+import h5py
+import numpy as np
+
+from trossen_arm_mujoco.image_storage import create_image_dataset, image_encoding, write_image
+
+
+class EpisodeWriter:
+    """
+    Stream one recorded episode into an HDF5 file, frame by frame.
+
+    Camera datasets are created up front with one chunk (or one encoded image) per frame, and each
+    frame is written as soon as it is appended, so image memory is bounded by a single frame regardless
+    of the episode length. The low-dimensional arrays are small and are kept in preallocated
+    buffers until :meth:`close`. If fewer frames than ``num_frames`` are appended, the datasets
+    are shrunk to the frames actually written.
+
+    The file layout is the one expected by the dataset tools::
+
+        /action                          (num_frames, qpos_dim)
+        /observations/qpos               (num_frames, qpos_dim)
+        /observations/qvel               (num_frames, qpos_dim)
+        /observations/env_state          (num_frames, env_state_dim)
+        /observations/images/{cam_name}  (num_frames, height, width, 3)
+
+    Images are optionally compressed, see :func:`~trossen_arm_mujoco.image_storage.create_image_dataset`.
+    If the writer is used as a context manager and the block raises, the partial file is removed.
+
+    :param path: Path of the HDF5 file to create.
+    :param num_frames: Maximum number of frames in the episode.
+    :param qpos_dim: Dimension of the joint positions, velocities and actions.
+    :param env_state_dim: Dimension of the environment state.
+    :param cam_list: List of camera names to record.
+    :param height: Image height, defaults to ``480``.
+    :param width: Image width, defaults to ``640``.
+    :param compression: Image compression, one of
+        :data:`~trossen_arm_mujoco.image_storage.IMAGE_COMPRESSIONS`, defaults to ``'none'``.
+    :param compression_level: Level of the image compression, defaults to the codec default.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_frames: int,
+        qpos_dim: int,
+        env_state_dim: int,
+        cam_list: list[str],
+        height: int = 480,
+        width: int = 640,
+        compression: str = "none",
+        compression_level: int | None = None,
+    ):
+        t0 = time.perf_counter()
+        self.path = path
+        self.num_frames = num_frames
+        self.cam_list = list(cam_list)
+        self._num_written = 0
+        self._buffers = {
+            "/observations/qpos": np.empty((num_frames, qpos_dim), dtype=np.float32),
+            "/observations/qvel": np.empty((num_frames, qpos_dim), dtype=np.float32),
+            "/observations/env_state": np.empty((num_frames, env_state_dim), dtype=np.float32),
+            "/action": np.empty((num_frames, qpos_dim), dtype=np.float32),
+        }
+
+        self._root = h5py.File(path, "w", rdcc_nbytes=1024**2 * 2)
+        self._root.attrs["sim"] = True
+        image = self._root.create_group("observations").create_group("images")
+        self._images = {
+            cam_name: create_image_dataset(
+                image,
+                cam_name,
+                num_frames,
+                height=height,
+                width=width,
+                compression=compression,
+                level=compression_level,
+            )
+            for cam_name in self.cam_list
+        }
+        # encoding and level of every camera, read once rather than per frame
+        self._encodings = {
+            cam_name: image_encoding(dataset) for cam_name, dataset in self._images.items()
+        }
+        # time spent in this writer, i.e. in HDF5 and image compression
+        self.write_time = time.perf_counter() - t0
+
+    def __len__(self) -> int:
+        return self._num_written
+
+    def __enter__(self) -> "EpisodeWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def append(
+        self,
+        qpos: np.ndarray,
+        qvel: np.ndarray,
+        env_state: np.ndarray,
+        action: np.ndarray,
+        images: Mapping[str, np.ndarray],
+    ) -> None:
+        """
+        Write one frame of the episode.
+
+        :param qpos: Joint positions of the frame.
+        :param qvel: Joint velocities of the frame.
+        :param env_state: Environment state of the frame.
+        :param action: Action taken at the frame.
+        :param images: Mapping from camera name to the ``(height, width, 3)`` image of the frame.
+        :raises IndexError: If the episode already holds ``num_frames`` frames.
+        """
+        t0 = time.perf_counter()
+        t = self._num_written
+        if t >= self.num_frames:
+            raise IndexError(f"Episode {self.path} is limited to {self.num_frames} frames.")
+        self._buffers["/observations/qpos"][t] = qpos
+        self._buffers["/observations/qvel"][t] = qvel
+        self._buffers["/observations/env_state"][t] = env_state
+        self._buffers["/action"][t] = action
+        for cam_name, dataset in self._images.items():
+            write_image(dataset, t, images[cam_name], *self._encodings[cam_name])
+        self._num_written += 1
+        self.write_time += time.perf_counter() - t0
+
+    def close(self) -> None:
+        """Write the low-dimensional arrays and close the file."""
+        if self._root is None:
+            return
+        t0 = time.perf_counter()
+        num_frames = self._num_written
+        if num_frames < self.num_frames:
+            for dataset in self._images.values():
+                dataset.resize(num_frames, axis=0)
+        for name, buffer in self._buffers.items():
+            self._root.create_dataset(name, data=buffer[:num_frames])
+        self._root.close()
+        self._root = None
+        self.write_time += time.perf_counter() - t0
+
+    def abort(self) -> None:
+        """Close the file without finishing it and remove it."""
+        if self._root is None:
+            return
+        self._root.close()
+        self._root = None
+        os.remove(self.path)
+
+
+class BackgroundWriter:
+    """
+    Run writing tasks in order on a background thread, fed through a bounded queue.
+
+    :meth:`submit` blocks while ``max_pending`` tasks are waiting, which bounds the memory held
+    by queued frames and slows the producer down to the speed of the storage. The first task that
+    raises stops the writer: later tasks are dropped, and the error is raised as a
+    :class:`RuntimeError` from the next :meth:`submit`, :meth:`flush` or :meth:`close`.
+
+    :param max_pending: Maximum number of queued tasks, defaults to ``32``.
+    """
+
+    def __init__(self, max_pending: int = 32):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="episode-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                if self._error is None:
+                    task()
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Background episode writer failed.") from self._error
+
+    def submit(self, fn: Callable, *args, **kwargs) -> None:
+        """
+        Queue ``fn(*args, **kwargs)`` to run on the writer thread.
+
+        :raises RuntimeError: If an earlier task failed or the writer is closed.
+        """
+        self._raise_error()
+        if not self._thread.is_alive():
+            raise RuntimeError("Background episode writer is closed.")
+        self._queue.put(functools.partial(fn, *args, **kwargs))
+
+    def flush(self) -> None:
+        """
+        Wait until all queued tasks have run.
+
+        :raises RuntimeError: If a task failed.
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """
+        Run the queued tasks and stop the writer thread.
+
+        :raises RuntimeError: If a task failed.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+
+class AsyncEpisodeWriter:
+    """
+    :class:`EpisodeWriter` running on a :class:`BackgroundWriter`.
+
+    Has the interface of :class:`EpisodeWriter`, but every call only queues the work and returns.
+    Frames must be passed as arrays that are not modified afterwards; in particular images have to
+    be rendered by the caller, as rendering contexts belong to the simulation thread. If a queued
+    call fails, the partial file is removed and the error is raised from a later call to the
+    background writer.
+
+    :param background: The background writer to run on.
+    :param on_close: Called on the writer thread with the :class:`EpisodeWriter` once the episode
+        is complete, defaults to ``None``.
+    :param kwargs: Arguments of :class:`EpisodeWriter`.
+    """
+
+    def __init__(
+        self,
+        background: BackgroundWriter,
+        on_close: Callable[[EpisodeWriter], None] | None = None,
+        **kwargs,
+    ):
+        self.path = kwargs["path"]
+        self._background = background
+        self._on_close = on_close
+        self._writer: EpisodeWriter | None = None
+        self._num_appended = 0
+        background.submit(self._open, kwargs)
+
+    def __len__(self) -> int:
+        return self._num_appended
+
+    def __enter__(self) -> "AsyncEpisodeWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _open(self, kwargs: dict) -> None:
+        self._writer = EpisodeWriter(**kwargs)
+
+    def _call(self, method: str, *args) -> None:
+        try:
+            getattr(self._writer, method)(*args)
+        except BaseException:
+            if self._writer is not None:
+                self._writer.abort()
+            raise
+
+    def _close(self) -> None:
+        self._call("close")
+        if self._on_close is not None:
+            self._on_close(self._writer)
+
+    def append(
+        self,
+        qpos: np.ndarray,
+        qvel: np.ndarray,
+        env_state: np.ndarray,
+        action: np.ndarray,
+        images: Mapping[str, np.ndarray],
+    ) -> None:
+        """Queue one frame of the episode, see :meth:`EpisodeWriter.append`."""
+        self._background.submit(self._call, "append", qpos, qvel, env_state, action, images)
+        self._num_appended += 1
+
+    def close(self) -> None:
+        """Queue writing the low-dimensional arrays and closing the file."""
+        self._background.submit(self._close)
+
+    def abort(self) -> None:
+        """Queue closing the file without finishing it and removing it."""
+        try:
+            self._background.submit(self._call, "abort")
+        except RuntimeError:
+            # the background writer already failed and drops the remaining tasks, the error
+            # that led to this abort is the one to report
+            pass
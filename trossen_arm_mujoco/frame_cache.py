@@ -0,0 +1,298 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Name of the metadata file of a frame cache, written once the cache is complete. Processes
+# using a cache hold a shared lock on it, so builders never remove a cache still in use.
+CACHE_FILENAME = "cache.json"
+# Lock file in the cache directory, held by the one process building a cache
+BUILD_LOCK_FILENAME = ".build.lock"
+
+
+def dataset_fingerprint(root: str, resize: tuple[int, int] | None = None) -> str:
+    """
+    Fingerprint the metadata and videos of a LeRobot dataset.
+
+    Covers the path, size and modification time of every file under ``meta/`` and ``videos/``,
+    so re-encoding, appending or rebuilding the dataset changes it.
+
+    :param root: Directory of the LeRobot dataset.
+    :param resize: ``(height, width)`` the frames are resized to, part of the fingerprint.
+    :return: A hex digest.
+    """
+    digest = hashlib.sha256(json.dumps({"resize": resize}).encode())
+    for subdir in ("meta", "videos"):
+        for dirpath, dirnames, filenames in sorted(os.walk(os.path.join(root, subdir))):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                digest.update(
+                    f"{os.path.relpath(path, root)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode()
+                )
+    return digest.hexdigest()[:16]
+
+
+def _decode_episode(
+    video_path: str,
+    from_timestamp: float,
+    length: int,
+    fps: float,
+    out: np.ndarray,
+    resize: tuple[int, int] | None,
+) -> None:
+    """Decode ``length`` frames from ``from_timestamp`` into ``out``, as CHW uint8."""
+    import av
+
+    tolerance = 0.5 / fps
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        # seek to the keyframe at or before the episode and decode forward
+        container.seek(int(from_timestamp / stream.time_base), stream=stream, backward=True)
+        num_decoded = 0
+        for frame in container.decode(stream):
+            if frame.time < from_timestamp - tolerance:
+                continue
+            index = round((frame.time - from_timestamp) * fps)
+            if index >= length:
+                break
+            image = frame.to_ndarray(format="rgb24")
+            if resize is not None:
+                import cv2
+
+                image = cv2.resize(image, (resize[1], resize[0]), interpolation=cv2.INTER_AREA)
+            out[index] = image.transpose(2, 0, 1)
+            num_decoded += 1
+    if num_decoded != length:
+        raise RuntimeError(
+            f"Decoded {num_decoded} of {length} frames from {video_path} at {from_timestamp}s."
+        )
+
+
+class FrameCache:
+    """
+    Decoded video frames of a LeRobot dataset, in memory-mapped arrays.
+
+    Every video key gets a ``(num_frames, 3, height, width)`` uint8 ``.npy`` array indexed like the
+    dataset frames, decoded once per episode and optionally resized. A cache lives in a
+    directory named after :func:`dataset_fingerprint`, under ``<root>/.frame_cache`` by default,
+    so a changed dataset gets a new cache and stale ones no process uses are removed when it is
+    built. Arrays are mapped read-only on first use and the cache pickles as its path, so
+    dataloader workers share the pages of one cache across epochs.
+
+    Processes building at once, such as DDP ranks or nodes sharing a filesystem, take turns on a
+    file lock: the first builds the cache and the others use it.
+
+    :param root: Directory of the LeRobot dataset.
+    :param cache_dir: Directory of the caches, defaults to ``<root>/.frame_cache``.
+    :param resize: ``(height, width)`` to resize frames to, e.g. the policy input resolution,
+        defaults to ``None`` to keep the video resolution.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        cache_dir: str | None = None,
+        resize: tuple[int, int] | None = None,
+    ):
+        self.root = str(root)
+        self.cache_dir = cache_dir or os.path.join(self.root, ".frame_cache")
+        self.resize = tuple(resize) if resize is not None else None
+        self.path = os.path.join(self.cache_dir, dataset_fingerprint(self.root, self.resize))
+        self._arrays: dict[str, np.ndarray] = {}
+        # Metadata file of the cache, open and share-locked while this process uses the cache
+        self._in_use = None
+
+    def __getstate__(self) -> dict:
+        return {"root": self.root, "cache_dir": self.cache_dir, "resize": self.resize, "path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._arrays = {}
+        self._in_use = None
+
+    def is_built(self) -> bool:
+        """Check that the cache of the current dataset is complete."""
+        return os.path.isfile(os.path.join(self.path, CACHE_FILENAME))
+
+    def _hold(self) -> bool:
+        """Share-lock the cache if it is built, so no builder removes it, and return whether it
+        is."""
+        if self._in_use is not None:
+            return True
+        try:
+            in_use = open(os.path.join(self.path, CACHE_FILENAME))
+        except FileNotFoundError:
+            return False
+        fcntl.flock(in_use, fcntl.LOCK_SH)
+        # a builder may have removed the cache before it was locked
+        if not self.is_built():
+            in_use.close()
+            return False
+        self._in_use = in_use
+        return True
+
+    def build(self, dataset) -> None:
+        """
+        Decode every episode of a dataset into the cache, unless it is already built.
+
+        Only one process builds at a time, the others wait and use its cache. The cache is
+        written to a temporary directory of the process that is renamed once complete, then
+        stale caches no process holds are removed. The cache stays held by this process until
+        :meth:`close`.
+
+        :param dataset: The ``LeRobotDataset`` at ``root``.
+        """
+        if self._hold():
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, BUILD_LOCK_FILENAME), "a") as build_lock:
+            fcntl.flock(build_lock, fcntl.LOCK_EX)
+            if self._hold():
+                return
+            tmp_path = tempfile.mkdtemp(
+                prefix=f"{os.path.basename(self.path)}.", suffix=".tmp", dir=self.cache_dir
+            )
+            try:
+                self._write(dataset, tmp_path)
+                os.rename(tmp_path, self.path)
+            except BaseException:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                raise
+            self._hold()
+            self._remove_stale()
+
+    def _write(self, dataset, tmp_path: str) -> None:
+        """Decode every episode of a dataset into the arrays of a cache directory."""
+        meta = dataset.meta
+        num_frames = meta.total_frames
+        for video_key in meta.video_keys:
+            _, height, width = meta.features[video_key]["shape"]
+            if self.resize is not None:
+                height, width = self.resize
+            out = np.lib.format.open_memmap(
+                os.path.join(tmp_path, f"{video_key}.npy"),
+                mode="w+",
+                dtype=np.uint8,
+                shape=(num_frames, 3, height, width),
+            )
+            for ep_idx in range(meta.total_episodes):
+                episode = meta.episodes[ep_idx]
+                start = episode["dataset_from_index"]
+                _decode_episode(
+                    str(dataset.root / meta.get_video_file_path(ep_idx, video_key)),
+                    episode[f"videos/{video_key}/from_timestamp"],
+                    episode["length"],
+                    meta.fps,
+                    out[start : start + episode["length"]],
+                    self.resize,
+                )
+            out.flush()
+            del out
+        with open(os.path.join(tmp_path, CACHE_FILENAME), "w") as f:
+            json.dump({"num_frames": num_frames, "resize": self.resize}, f)
+
+    def _remove_stale(self) -> None:
+        """Remove the other caches of the dataset no process holds, called by the builder."""
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if path == self.path or not os.path.isdir(path):
+                continue
+            try:
+                stale = open(os.path.join(path, CACHE_FILENAME))
+            except FileNotFoundError:
+                # left behind by a builder that failed, builders take turns
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            with stale:
+                try:
+                    fcntl.flock(stale, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+
+    def close(self) -> None:
+        """Release the cache, builders of a newer dataset may then remove it."""
+        if self._in_use is not None:
+            self._in_use.close()
+            self._in_use = None
+        self._arrays = {}
+
+    def frames(self, video_key: str) -> np.ndarray:
+        """Return the memory-mapped frames of a video key."""
+        if video_key not in self._arrays:
+            path = os.path.join(self.path, f"{video_key}.npy")
+            self._arrays[video_key] = np.load(path, mmap_mode="r")
+        return self._arrays[video_key]
+
+
+def install_frame_cache(dataset, cache: FrameCache) -> None:
+    """
+    Serve the video frames of a ``LeRobotDataset`` from a frame cache instead of decoding them.
+
+    Builds the cache if needed and replaces the video query of ``dataset``, returning the same
+    float ``[0, 1]`` CHW tensors. Call it in the main process before creating the dataloader, on
+    every rank: one builds the cache, the others wait for it. The cache stays held, so no builder
+    removes it, until the process exits or :meth:`FrameCache.close` is called.
+
+    :param dataset: The ``LeRobotDataset``.
+    :param cache: The frame cache of its root.
+    """
+    cache.build(dataset)
+    episodes_from = [
+        dataset.meta.episodes[ep_idx]["dataset_from_index"]
+        for ep_idx in range(dataset.meta.total_episodes)
+    ]
+    dataset._query_videos = _CachedVideoQuery(cache, dataset.meta.fps, episodes_from)
+
+
+class _CachedVideoQuery:
+    """Video query of a ``LeRobotDataset`` served by a frame cache, picklable for workers."""
+
+    def __init__(self, cache: FrameCache, fps: float, episodes_from: list[int]):
+        self.cache = cache
+        self.fps = fps
+        self.episodes_from = episodes_from
+
+    def __call__(self, query_timestamps: dict[str, list[float]], ep_idx: int) -> dict:
+        import torch
+
+        item = {}
+        for video_key, query_ts in query_timestamps.items():
+            offsets = np.round(np.asarray(query_ts) * self.fps).astype(np.int64)
+            frames = self.cache.frames(video_key)[self.episodes_from[ep_idx] + offsets]
+            item[video_key] = (torch.from_numpy(frames).float() / 255.0).squeeze(0)
+        return item
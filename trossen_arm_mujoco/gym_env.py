@@ -49,6 +49,9 @@ class TrossenGymEnv(gym.Env):
         self.task = "Pick up the red cube and place it in the green bucket."
         self.task_description = self.task
 
+        # Images of the latest observation; cameras are rendered lazily and cached per step
+        self._last_images = None
+
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
         if seed is not None:
@@ -58,10 +61,12 @@ class TrossenGymEnv(gym.Env):
              np.random.seed(seed)
              
         ts = self.env.reset()
+        self._last_images = ts.observation["images"]
         return self._format_obs(ts), {}
 
     def step(self, action):
         ts = self.env.step(action)
+        self._last_images = ts.observation["images"]
         
         # LeRobot expects (obs, reward, terminated, truncated, info)
         terminated = ts.last() # Success or fail?
@@ -92,6 +97,9 @@ class TrossenGymEnv(gym.Env):
         # dm_control handles onscreen rendering if enabled.
         # If rgb_array requested:
         if self.render_mode == "rgb_array":
+             # Reuse the frame already rendered for the observation of this step
+             if self._last_images is not None:
+                 return self._last_images["cam_high"]
              return self.env.physics.render(height=480, width=640, camera_id="cam_high")
     
     def close(self):
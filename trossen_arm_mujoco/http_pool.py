@@ -0,0 +1,227 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A pool of persistent HTTP/1.1 connections to one server.
+
+Requests reuse idle keep-alive connections instead of opening one each, any thread can take a
+connection from the pool, and every request has a deadline covering connecting, sending and
+reading the response.
+"""
+
+from collections import namedtuple
+import http.client
+import queue
+import random
+import select
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+Response = namedtuple("Response", ["status", "reason", "headers", "body"])
+
+# Errors of a keep-alive connection the server closed while it was idle
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+# Methods a server may receive twice without changing the outcome (RFC 9110)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"})
+
+
+def _is_dropped(connection) -> bool:
+    """Return whether the server closed an idle connection, its socket is readable at EOF."""
+    if connection.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    # an idle connection has nothing to read, unless the server closed it
+    return bool(readable)
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP connections to the server of ``url``, shared by threads.
+
+    :param url: URL of the server, its path prefixes the path of every request.
+    :param max_connections: Most connections open at once, requests wait for a free one,
+        defaults to ``4``.
+    :param timeout: Default deadline of a request in seconds, defaults to ``5.0``.
+    """
+
+    def __init__(self, url: str, max_connections: int = 4, timeout: float = 5.0):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        # idle connections, the most recently used first as it is the least likely to be closed
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.metrics = {"requests": 0, "opened": 0, "reused": 0, "retries": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.metrics[name] += 1
+
+    def _connection(self, timeout: float):
+        """Return an idle connection the server did not close, or a new one, and whether it was
+        reused."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connection_class(self.host, self.port, timeout=timeout), False
+            if not _is_dropped(connection):
+                return connection, True
+            connection.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None = None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+    ) -> Response:
+        """
+        Send a request on a pooled connection and read its response.
+
+        Idle connections the server already closed are not reused. If a reused connection still
+        turns out to be closed, the request is sent again on a new connection when it failed
+        before being written, or when ``method`` is idempotent: once written, the server may have
+        received and processed it even though no response came back.
+
+        :param method: HTTP method.
+        :param path: Path of the request, after the path of the pool URL.
+        :param body: Request body, defaults to none.
+        :param headers: Request headers, defaults to none.
+        :param timeout: Deadline of the request in seconds, including waiting for a connection,
+            defaults to the pool timeout.
+        :return: The response, read whole.
+        :raises TimeoutError: If the deadline passes.
+        :raises OSError: If the connection fails.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        if not self._slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            raise TimeoutError(f"No free connection to {self.host} before the deadline")
+        self._count("requests")
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Request to {self.host} exceeded its deadline")
+                connection, reused = self._connection(remaining)
+                self._count("reused" if reused else "opened")
+                try:
+                    # the socket timeout is the time left, for connecting and every read
+                    connection.timeout = remaining
+                    if connection.sock is None:
+                        connection.connect()
+                        # requests are small and sent whole, do not wait to coalesce them
+                        connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    else:
+                        connection.sock.settimeout(remaining)
+                    sent = False
+                    connection.request(method, self.base_path + path, body, headers or {})
+                    sent = True
+                    response = connection.getresponse()
+                    if connection.sock is not None:
+                        connection.sock.settimeout(max(deadline - time.monotonic(), 1e-3))
+                    data = response.read()
+                except _STALE_CONNECTION_ERRORS:
+                    connection.close()
+                    if not reused or (sent and method.upper() not in IDEMPOTENT_METHODS):
+                        raise
+                    self._count("retries")
+                    continue
+                except BaseException:
+                    connection.close()
+                    raise
+                if response.will_close or self._closed:
+                    connection.close()
+                else:
+                    self._idle.put(connection)
+                return Response(response.status, response.reason, response.headers, data)
+        finally:
+            self._slots.release()
+
+    def request_with_retries(
+        self,
+        method: str,
+        path: str,
+        retries: int = 3,
+        backoff: float = 0.1,
+        **kwargs,
+    ) -> Response:
+        """
+        Send an idempotent request, retrying failed attempts after a jittered backoff.
+
+        Attempts that fail to connect, time out or get a 5xx response are retried after
+        ``backoff * 2**attempt`` seconds scaled by a random factor in ``[0.5, 1.5)``, so clients
+        retrying together do not hit the server at the same time.
+
+        :param method: HTTP method, the request must be safe to repeat.
+        :param path: Path of the request.
+        :param retries: Number of retries after the first attempt, defaults to ``3``.
+        :param backoff: Base delay in seconds, defaults to ``0.1``.
+        :param kwargs: Passed to :meth:`request`.
+        :return: The response of the last attempt.
+        :raises OSError: If the last attempt fails to connect or times out.
+        """
+        for attempt in range(retries + 1):
+            try:
+                response = self.request(method, path, **kwargs)
+                if response.status < 500 or attempt == retries:
+                    return response
+            except OSError:
+                if attempt == retries:
+                    raise
+            self._count("retries")
+            time.sleep(backoff * 2**attempt * random.uniform(0.5, 1.5))
+
+    def close(self) -> None:
+        """Close the idle connections, connections in use are closed when returned."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
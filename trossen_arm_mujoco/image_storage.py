@@ -0,0 +1,213 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import h5py
+import numpy as np
+
+try:
+    # Registers the Blosc and LZ4 HDF5 filters, needed to read and write such datasets
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
+
+# Image compressions applied as HDF5 chunk filters, the frames stay (T, H, W, 3) uint8 arrays
+FILTER_COMPRESSIONS = ("none", "gzip", "lzf", "blosc", "lz4")
+# Image compressions stored as one encoded image per frame in a variable-length dataset
+ENCODED_COMPRESSIONS = ("jpeg", "png")
+IMAGE_COMPRESSIONS = FILTER_COMPRESSIONS + ENCODED_COMPRESSIONS
+
+
+def _filter_kwargs(compression: str, level: int | None) -> dict:
+    """Return the ``create_dataset`` keyword arguments of an HDF5 filter compression."""
+    if compression == "none":
+        return {}
+    if compression == "gzip":
+        return {"compression": "gzip", "compression_opts": 4 if level is None else level}
+    if compression == "lzf":
+        return {"compression": "lzf"}
+    if hdf5plugin is None:
+        raise ImportError(
+            f"Image compression '{compression}' needs hdf5plugin. "
+            "Install with: pip install 'trossen-arm-mujoco[compression]'"
+        )
+    if compression == "blosc":
+        return dict(
+            hdf5plugin.Blosc(
+                cname="lz4",
+                clevel=5 if level is None else level,
+                shuffle=hdf5plugin.Blosc.SHUFFLE,
+            )
+        )
+    return dict(hdf5plugin.LZ4())
+
+
+def create_image_dataset(
+    group: h5py.Group,
+    name: str,
+    num_frames: int,
+    height: int = 480,
+    width: int = 640,
+    compression: str = "none",
+    level: int | None = None,
+) -> h5py.Dataset:
+    """
+    Create the dataset of one camera in a recorded episode.
+
+    Filter compressions keep a ``(num_frames, height, width, 3)`` uint8 dataset chunked per frame,
+    which any HDF5 reader with the filter available reads like a raw one. Encoded compressions
+    store each frame as a JPEG or PNG byte string in a ``(num_frames,)`` variable-length dataset,
+    tagged with ``encoding`` and ``shape`` attributes; read those with :func:`read_images`.
+    The dataset can be resized along its first axis.
+
+    :param group: The HDF5 group to create the dataset in.
+    :param name: Name of the dataset, usually the camera name.
+    :param num_frames: Number of frames to allocate.
+    :param height: Image height, defaults to ``480``.
+    :param width: Image width, defaults to ``640``.
+    :param compression: One of :data:`IMAGE_COMPRESSIONS`, defaults to ``'none'``.
+    :param level: Compression level for ``gzip`` and ``blosc``, or JPEG quality and PNG
+        compression level for encoded images, defaults to the codec default.
+    :raises ValueError: If the compression is unknown.
+    :return: The created dataset.
+    """
+    if compression in ENCODED_COMPRESSIONS:
+        dataset = group.create_dataset(
+            name,
+            (num_frames,),
+            maxshape=(None,),
+            dtype=h5py.vlen_dtype(np.uint8),
+        )
+        dataset.attrs["encoding"] = compression
+        dataset.attrs["shape"] = (height, width, 3)
+        if level is not None:
+            dataset.attrs["level"] = level
+        return dataset
+    if compression not in FILTER_COMPRESSIONS:
+        raise ValueError(
+            f"Unknown image compression: {compression}. Use one of {', '.join(IMAGE_COMPRESSIONS)}."
+        )
+    return group.create_dataset(
+        name,
+        (num_frames, height, width, 3),
+        maxshape=(None, height, width, 3),
+        dtype="uint8",
+        chunks=(1, height, width, 3),
+        **_filter_kwargs(compression, level),
+    )
+
+
+def encode_image(image: np.ndarray, encoding: str, level: int | None = None) -> np.ndarray:
+    """
+    Encode an RGB image as JPEG or PNG.
+
+    :param image: The ``(height, width, 3)`` uint8 RGB image.
+    :param encoding: ``'jpeg'`` or ``'png'``.
+    :param level: JPEG quality or PNG compression level, defaults to the codec default.
+    :return: The encoded bytes as a 1-D uint8 array.
+    """
+    import cv2
+
+    if encoding == "jpeg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, 95 if level is None else level]
+        ext = ".jpg"
+    else:
+        params = [cv2.IMWRITE_PNG_COMPRESSION, 1 if level is None else level]
+        ext = ".png"
+    ok, buffer = cv2.imencode(ext, image[:, :, ::-1], params)
+    if not ok:
+        raise ValueError(f"Failed to encode image as {encoding}.")
+    return buffer.reshape(-1)
+
+
+def decode_image(buffer: np.ndarray) -> np.ndarray:
+    """
+    Decode a JPEG or PNG image encoded by :func:`encode_image`.
+
+    :param buffer: The encoded bytes as a 1-D uint8 array.
+    :return: The ``(height, width, 3)`` uint8 RGB image.
+    """
+    import cv2
+
+    return np.ascontiguousarray(cv2.imdecode(buffer, cv2.IMREAD_COLOR)[:, :, ::-1])
+
+
+def image_encoding(dataset: h5py.Dataset) -> tuple[str | None, int | None]:
+    """
+    Return the image encoding of a camera dataset, to pass to :func:`write_image`.
+
+    :param dataset: A dataset created by :func:`create_image_dataset`.
+    :return: The ``encoding`` and ``level`` attributes, ``None`` when not set.
+    """
+    return dataset.attrs.get("encoding"), dataset.attrs.get("level")
+
+
+def write_image(
+    dataset: h5py.Dataset,
+    index: int,
+    image: np.ndarray,
+    encoding: str | None = None,
+    level: int | None = None,
+) -> None:
+    """
+    Write one frame into a dataset created by :func:`create_image_dataset`.
+
+    The encoding is passed in rather than read from the dataset attributes, which would cost an
+    attribute lookup per frame; read it once per dataset with :func:`image_encoding`.
+
+    :param dataset: The camera dataset.
+    :param index: Index of the frame.
+    :param image: The ``(height, width, 3)`` uint8 RGB image.
+    :param encoding: ``'jpeg'`` or ``'png'`` for an encoded dataset, defaults to ``None`` for a
+        raw or filter-compressed one.
+    :param level: JPEG quality or PNG compression level, defaults to the codec default.
+    """
+    if encoding is None:
+        dataset[index] = image
+    else:
+        dataset[index] = encode_image(image, encoding, level)
+
+
+def read_images(dataset: h5py.Dataset, index=slice(None)) -> np.ndarray:
+    """
+    Read frames of a camera dataset as uint8 RGB images, whatever its compression.
+
+    :param dataset: The camera dataset, raw, filter compressed or encoded.
+    :param index: Frame index or slice to read, defaults to all frames.
+    :return: A ``(height, width, 3)`` image for an integer index, otherwise a
+        ``(frames, height, width, 3)`` array.
+    """
+    if "encoding" not in dataset.attrs:
+        return dataset[index]
+    buffers = dataset[index]
+    if isinstance(index, (int, np.integer)):
+        return decode_image(buffers)
+    height, width, channels = dataset.attrs["shape"]
+    images = np.empty((len(buffers), height, width, channels), dtype=np.uint8)
+    for i, buffer in enumerate(buffers):
+        images[i] = decode_image(buffer)
+    return images
@@ -1,26 +1,100 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import os
-import json
-import urllib.request
-import urllib.error
+import uuid
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, Hashable, Optional
 import numpy as np
 import torch
 from pathlib import Path
 
+from trossen_arm_mujoco.action_chunks import ActionChunkBuffer
+from trossen_arm_mujoco.http_pool import ConnectionPool
+from trossen_arm_mujoco.wire_format import (
+    CONTENT_TYPES,
+    IMAGE_ENCODINGS,
+    WIRE_FORMATS,
+    decode_arrays,
+    encode_arrays,
+)
+
 
 class InferenceClient(ABC):
-    """Abstract base class for inference clients."""
+    """
+    Abstract base class for inference clients.
+
+    One client can serve many environments at once: each passes its own
+    stream key, so a client keeping per-episode state (such as the queue of
+    the current action chunk) keeps it per stream, and awaits
+    predict_async() so inference overlaps the other environments' steps.
+
+    Clients that get whole action chunks from the policy (predict_chunk())
+    buffer them per stream and only query the policy for a new chunk every
+    replan_interval steps, or once the chunk is used up, optionally
+    averaging the overlapping chunks (temporal ensembling).
+    """
+
+    # Most predictions run at once by predict_async()
+    max_concurrency = 1
+    _executor = None
+    # Steps between two chunks (None: the chunk length) and temporal ensembling weight decay
+    replan_interval: Optional[int] = None
+    temporal_ensemble_coeff: Optional[float] = None
+    _chunk_buffers = None
     
     @abstractmethod
-    def predict(self, observation: Dict[str, np.ndarray]) -> np.ndarray:
+    def predict(self, observation: Dict[str, np.ndarray], stream: Hashable = None) -> np.ndarray:
         """Run inference on observation and return action."""
         pass
+
+    def predict_chunk(self, observation: Dict[str, np.ndarray]) -> np.ndarray:
+        """Run inference on observation and return the action chunk [chunk_size, 8]."""
+        raise NotImplementedError(f"{type(self).__name__} does not predict action chunks")
+
+    def _chunked_action(self, observation: Dict[str, np.ndarray], stream: Hashable) -> np.ndarray:
+        """Return the next action of a stream, predicting a chunk when one is needed."""
+        if self._chunk_buffers is None:
+            self._chunk_buffers = {}
+        buffer = self._chunk_buffers.get(stream)
+        if buffer is None:
+            buffer = self._chunk_buffers[stream] = ActionChunkBuffer(
+                self.replan_interval, self.temporal_ensemble_coeff
+            )
+        if buffer.needs_chunk():
+            buffer.add(self.predict_chunk(observation))
+        return buffer.pop()
+
+    async def predict_async(
+        self, observation: Dict[str, np.ndarray], stream: Hashable = None
+    ) -> np.ndarray:
+        """
+        Run predict() without blocking the event loop.
+
+        Up to max_concurrency predictions run at once on the client threads,
+        others wait for a free thread.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_concurrency, thread_name_prefix=type(self).__name__
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self.predict, observation, stream))
+
+    def reset(self, stream: Hashable = None):
+        """Forget the state of a stream, call it when its environment is reset."""
+        if self._chunk_buffers is not None:
+            self._chunk_buffers.pop(stream, None)
     
     @abstractmethod
     def close(self):
         """Clean up resources."""
         pass
+
+    def _close_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
     
     @staticmethod
     def create(
@@ -30,6 +104,11 @@ class InferenceClient(ABC):
         # Legacy params ignored in NIM mode but kept for compat
         model_name: Optional[str] = None,
         model_version: Optional[str] = None,
+        wire_format: Optional[str] = None,
+        image_encoding: Optional[str] = None,
+        chunk_mode: Optional[bool] = None,
+        replan_interval: Optional[int] = None,
+        temporal_ensemble_coeff: Optional[float] = None,
     ) -> "InferenceClient":
         """
         Factory method to create appropriate inference client.
@@ -37,13 +116,44 @@ class InferenceClient(ABC):
         Args:
             mode: "nim" or "local". Defaults to INFERENCE_MODE env var or "local"
             api_url: URL of the NIM wrapper (e.g. "http://nim-wrapper:8000")
+            wire_format: Format of NIM requests, see NIMClient. Defaults to
+                INFERENCE_WIRE_FORMAT env var or "raw"
+            image_encoding: Encoding of the images of NIM requests. Defaults to
+                INFERENCE_IMAGE_ENCODING env var or "none"
+            chunk_mode: Request whole action chunks from the NIM wrapper.
+                Defaults to INFERENCE_CHUNK_MODE env var ("1") or False
+            replan_interval: Steps between two action chunks. Defaults to
+                INFERENCE_REPLAN_INTERVAL env var or the chunk length
+            temporal_ensemble_coeff: Temporal ensembling weight decay (0.01 in
+                the ACT paper). Defaults to INFERENCE_TEMPORAL_ENSEMBLE_COEFF
+                env var or no ensembling
+
+        The deadline of NIM requests is the INFERENCE_TIMEOUT env var in
+        seconds, or 5.
         """
         mode = mode or os.getenv("INFERENCE_MODE", "local")
+        if replan_interval is None and os.getenv("INFERENCE_REPLAN_INTERVAL"):
+            replan_interval = int(os.getenv("INFERENCE_REPLAN_INTERVAL"))
+        if temporal_ensemble_coeff is None and os.getenv("INFERENCE_TEMPORAL_ENSEMBLE_COEFF"):
+            temporal_ensemble_coeff = float(os.getenv("INFERENCE_TEMPORAL_ENSEMBLE_COEFF"))
         
         if mode == "nim":
             api_url = api_url or os.getenv("INFERENCE_API_URL", "http://localhost:8090")
-            print(f"Initializing NIM Client connecting to {api_url}")
-            return NIMClient(url=api_url)
+            wire_format = wire_format or os.getenv("INFERENCE_WIRE_FORMAT", "raw")
+            image_encoding = image_encoding or os.getenv("INFERENCE_IMAGE_ENCODING", "none")
+            timeout = float(os.getenv("INFERENCE_TIMEOUT", "5.0"))
+            if chunk_mode is None:
+                chunk_mode = os.getenv("INFERENCE_CHUNK_MODE", "0") == "1"
+            print(f"Initializing NIM Client connecting to {api_url} ({wire_format}, images: {image_encoding})")
+            return NIMClient(
+                url=api_url,
+                wire_format=wire_format,
+                image_encoding=image_encoding,
+                timeout=timeout,
+                chunk_mode=chunk_mode,
+                replan_interval=replan_interval,
+                temporal_ensemble_coeff=temporal_ensemble_coeff,
+            )
             
         elif mode == "local":
             if checkpoint_dir is None:
@@ -51,7 +161,11 @@ class InferenceClient(ABC):
                     "CHECKPOINT_DIR",
                     "outputs/train/act_pick_place_30k/checkpoints/030000/pretrained_model"
                 )
-            return LocalInferenceClient(checkpoint_dir=checkpoint_dir)
+            return LocalInferenceClient(
+                checkpoint_dir=checkpoint_dir,
+                replan_interval=replan_interval,
+                temporal_ensemble_coeff=temporal_ensemble_coeff,
+            )
             
         else:
             raise ValueError(f"Unknown inference mode: {mode}. Use 'nim' or 'local'")
@@ -60,74 +174,280 @@ class InferenceClient(ABC):
 class NIMClient(InferenceClient):
     """
     NIM Microservice Client.
-    Communicates via JSON/REST with the decoupled wrapper service.
+    Communicates via REST with the decoupled wrapper service.
     Zero knowledge of Triton/gRPC/Tensors.
+
+    Observations are sent in a binary wire format named by the Content-Type
+    of the request (see trossen_arm_mujoco.wire_format), a 480x640 image as
+    JSON lists is about 3 MB and takes longer to serialize than a control
+    step. The action is decoded from whatever format the server answers in.
+    A server that rejects the format (415 or 422) is sent JSON from then on.
+
+    Requests go over a pool of keep-alive connections shared by the threads
+    using the client, each with a deadline. The pool counts the connections
+    it opened and reused (see metrics()). predict_async() sends up to
+    max_connections requests at once.
+
+    In chunk mode, the client posts to /predict_chunk, which answers with
+    the whole unnormalized action chunk ("actions", the action_chunk__0
+    output of the Triton model), and buffers it per stream, so it makes one
+    request per chunk instead of one per control step.
+
+    Otherwise the server keeps the action queue of the policy, so every
+    /predict request names its stream in the X-Inference-Stream header
+    (unique to this client, the stream__0 input of the Triton model) and
+    the first request after reset() sets X-Inference-Reset (reset__0), so
+    environments sharing the server never get each other's actions.
     """
     
-    def __init__(self, url: str):
+    # Statuses of a server that does not read the request format
+    UNSUPPORTED_FORMAT_STATUSES = (415, 422)
+    # Headers naming the stream of a /predict request and resetting its action queue
+    STREAM_HEADER = "X-Inference-Stream"
+    RESET_HEADER = "X-Inference-Reset"
+
+    def __init__(
+        self,
+        url: str,
+        wire_format: str = "raw",
+        image_encoding: str = "none",
+        image_quality: Optional[int] = None,
+        timeout: float = 5.0,
+        max_connections: int = 4,
+        chunk_mode: bool = False,
+        replan_interval: Optional[int] = None,
+        temporal_ensemble_coeff: Optional[float] = None,
+    ):
+        """
+        Args:
+            url: URL of the NIM wrapper
+            wire_format: "json", "raw" (little-endian tensors with a small
+                header), "npz" or "msgpack"
+            image_encoding: "none", "png" (lossless) or "jpeg"
+            image_quality: JPEG quality or PNG compression level
+            timeout: Deadline of a request in seconds
+            max_connections: Most connections open at once
+            chunk_mode: Request whole action chunks, see InferenceClient
+            replan_interval: Steps between two chunks in chunk mode
+            temporal_ensemble_coeff: Temporal ensembling weight decay in
+                chunk mode
+        """
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"Unknown wire format: {wire_format}. Use one of {WIRE_FORMATS}")
+        if image_encoding not in IMAGE_ENCODINGS:
+            raise ValueError(f"Unknown image encoding: {image_encoding}. Use one of {IMAGE_ENCODINGS}")
         self.url = url.rstrip("/")
         self.predict_endpoint = f"{self.url}/predict"
+        self.predict_chunk_endpoint = f"{self.url}/predict_chunk"
         self.health_endpoint = f"{self.url}/health"
+        self.pool = ConnectionPool(self.url, max_connections=max_connections, timeout=timeout)
+        self.max_concurrency = max_connections
+        self.wire_format = wire_format
+        self.image_encoding = image_encoding
+        self.image_quality = image_quality
+        self.chunk_mode = chunk_mode
+        self.replan_interval = replan_interval
+        self.temporal_ensemble_coeff = temporal_ensemble_coeff
+        # Prefix of the stream names, so clients sharing the server keep apart
+        self.session_id = uuid.uuid4().hex[:12]
+        # Streams whose next /predict request resets their server action queue
+        self._pending_resets = set()
         
-        # Verify connection
+        # Verify connection, retrying while the service starts
         try:
-            with urllib.request.urlopen(self.health_endpoint) as response:
-                if response.status != 200:
-                    raise ConnectionError(f"NIM Health check failed: {response.status}")
-                print(f"✓ Connected to NIM Wrapper at {self.url}")
-        except urllib.error.URLError as e:
+            response = self.pool.request_with_retries("GET", "/health")
+            if response.status != 200:
+                raise ConnectionError(f"NIM Health check failed: {response.status}")
+            print(f"✓ Connected to NIM Wrapper at {self.url}")
+        except OSError as e:
             print(f"WARNING: Could not connect to NIM Wrapper at {self.url}: {e}")
             print("Ensure the 'nim-wrapper' service is running.")
 
-    def predict(self, observation: Dict[str, np.ndarray]) -> np.ndarray:
+    def predict(self, observation: Dict[str, np.ndarray], stream: Hashable = None) -> np.ndarray:
         """
-        Send specific observation to NIM wrapper via generic JSON API.
+        Send specific observation to NIM wrapper in the client wire format.
+        Without chunk mode the wrapper keeps the policy state per stream, so
+        the stream is sent along.
         """
-        # Prepare payload
-        # 1. State: numpy -> list
-        state = observation["observation.state"].tolist()
+        if self.chunk_mode:
+            return self._chunked_action(observation, stream)
+        headers = {self.STREAM_HEADER: f"{self.session_id}/{stream}"}
+        reset = stream in self._pending_resets
+        if reset:
+            headers[self.RESET_HEADER] = "1"
+        action = np.array(self._post("/predict", observation, headers)["action"], dtype=np.float32)
+        if reset:
+            self._pending_resets.discard(stream)
+        return action
+
+    def reset(self, stream: Hashable = None):
+        """Forget the state of a stream, on the server too without chunk mode."""
+        super().reset(stream)
+        if not self.chunk_mode:
+            self._pending_resets.add(stream)
+
+    def predict_chunk(self, observation: Dict[str, np.ndarray]) -> np.ndarray:
+        """Request the whole unnormalized action chunk of an observation."""
+        return np.array(self._post("/predict_chunk", observation)["actions"], dtype=np.float32)
+
+    def _post(
+        self,
+        path: str,
+        observation: Dict[str, np.ndarray],
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Post an observation to an endpoint and return the decoded response arrays."""
+        # Prepare payload, the image keeps its layout (CHW from the gym env)
+        arrays = {
+            "state": np.asarray(observation["observation.state"], dtype=np.float32),
+            "image": np.asarray(observation["observation.images.top_cam"]),
+        }
+        body, content_type = encode_arrays(
+            arrays, self.wire_format, self.image_encoding, self.image_quality
+        )
         
-        # 2. Image: numpy -> list
-        # Check format. Wrapper expects standard nested list.
-        image = observation["observation.images.top_cam"]
-        if hasattr(image, 'tolist'):
-            image = image.tolist()
-            
-        payload = {
-            "state": state,
-            "image": image
+        # Send Request, the response may come back in the same format or JSON
+        headers = {
+            'Content-Type': content_type,
+            'Accept': f"{content_type}, {CONTENT_TYPES['json']};q=0.5",
+            **(extra_headers or {}),
         }
         
-        # Send Request
-        req = urllib.request.Request(
-            self.predict_endpoint,
-            data=json.dumps(payload).encode('utf-8'),
-            headers={'Content-Type': 'application/json'}
-        )
+        try:
+            response = self.pool.request("POST", path, body, headers)
+        except Exception as e:
+            raise RuntimeError(f"NIM Request failed: {str(e)}")
+        
+        if response.status != 200:
+            if self.wire_format != "json" and response.status in self.UNSUPPORTED_FORMAT_STATUSES:
+                print(f"WARNING: NIM Wrapper does not accept {content_type} ({response.status}), falling back to JSON")
+                self.wire_format = "json"
+                self.image_encoding = "none"
+                return self._post(path, observation, extra_headers)
+            raise RuntimeError(f"NIM Inference failed: {response.status} {response.reason}")
         
         try:
-            with urllib.request.urlopen(req) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                action = np.array(result["action"], dtype=np.float32)
-                return action
-        except urllib.error.HTTPError as e:
-            raise RuntimeError(f"NIM Inference failed: {e.code} {e.reason}")
+            return decode_arrays(response.body, response.headers.get("Content-Type"))
         except Exception as e:
             raise RuntimeError(f"NIM Request failed: {str(e)}")
 
+    def metrics(self) -> Dict[str, int]:
+        """Return the number of requests, connections opened and reused, and retries."""
+        return dict(self.pool.metrics)
+
     def close(self):
-        pass
+        self._close_executor()
+        self.pool.close()
+
+
+class ObservationPreprocessor:
+    """
+    Turns raw observations into the policy input batch on the device.
+
+    The uint8 image is copied once, into a preallocated CHW buffer (pinned
+    for asynchronous upload to a GPU), and converted to float and ImageNet
+    normalized on the device with cached constants, in a preallocated
+    output. CHW and HWC images, numpy or torch, are read without an
+    intermediate copy. Buffers are reused by every call, so a batch is only
+    valid until the next one is built.
+    """
+
+    IMAGENET_MEAN = (0.485, 0.456, 0.406)
+    IMAGENET_STD = (0.229, 0.224, 0.225)
+
+    def __init__(self, device: torch.device, pin_memory: Optional[bool] = None):
+        """
+        Args:
+            device: Device of the policy
+            pin_memory: Stage inputs in pinned memory, defaults to True on CUDA
+        """
+        self.device = torch.device(device)
+        if pin_memory is None:
+            pin_memory = self.device.type == "cuda"
+        self.pin_memory = pin_memory
+        # (x / 255 - mean) / std == x * scale - offset
+        mean = torch.tensor(self.IMAGENET_MEAN).view(3, 1, 1)
+        std = torch.tensor(self.IMAGENET_STD).view(3, 1, 1)
+        self._scale = (1.0 / (255.0 * std)).to(self.device)
+        self._offset = (mean / std).to(self.device)
+        self._shape = None
+
+    def _allocate(self, height: int, width: int, state_dim: int):
+        """Allocate the staging and device buffers of an image size."""
+        def host(shape, dtype):
+            return torch.empty(shape, dtype=dtype, pin_memory=self.pin_memory)
+
+        self._image_host = host((1, 3, height, width), torch.uint8)
+        self._state_host = host((1, state_dim), torch.float32)
+        if self.device.type == "cpu":
+            self._image_device, self._state_device = self._image_host, self._state_host
+        else:
+            self._image_device = torch.empty_like(self._image_host, device=self.device)
+            self._state_device = torch.empty_like(self._state_host, device=self.device)
+        self._image_float = torch.empty((1, 3, height, width), dtype=torch.float32, device=self.device)
+        self._shape = (height, width, state_dim)
+
+    def __call__(self, observation: Dict[str, np.ndarray]) -> Dict[str, torch.Tensor]:
+        """
+        Build the batch of one observation.
+
+        Args:
+            observation: Raw observation, image uint8 [3, H, W] or [H, W, 3]
+
+        Returns:
+            Batch with the state [1, 8] and normalized image [1, 3, H, W]
+        """
+        image = torch.as_tensor(observation["observation.images.top_cam"])
+        state = torch.as_tensor(observation["observation.state"])
+        if image.ndim != 3 or 3 not in (image.shape[0], image.shape[-1]):
+            raise ValueError(f"Unexpected image shape: {tuple(image.shape)}")
+        if image.shape[0] != 3:
+            # HWC, read through a CHW view
+            image = image.permute(2, 0, 1)
+        if self._shape != (image.shape[1], image.shape[2], state.numel()):
+            self._allocate(image.shape[1], image.shape[2], state.numel())
+
+        with torch.inference_mode():
+            self._image_host[0].copy_(image)
+            self._state_host[0].copy_(state)
+            if self._image_device is not self._image_host:
+                self._image_device.copy_(self._image_host, non_blocking=True)
+                self._state_device.copy_(self._state_host, non_blocking=True)
+            # converted in place, uint8 arithmetic would allocate a float copy
+            self._image_float.copy_(self._image_device).mul_(self._scale).sub_(self._offset)
+        return {
+            "observation.state": self._state_device,
+            "observation.images.top_cam": self._image_float,
+        }
 
 
 class LocalInferenceClient(InferenceClient):
-    """Local PyTorch inference client (fallback for development)."""
+    """
+    Local PyTorch inference client (fallback for development).
+
+    The policy predicts a chunk of actions, by default the first
+    n_action_steps of it are returned one per call before the next
+    prediction, as select_action() does. The chunk is buffered per stream so
+    environments sharing the client do not consume each other's actions.
+    Predictions run one at a time.
+    """
     
-    def __init__(self, checkpoint_dir: str):
+    def __init__(
+        self,
+        checkpoint_dir: str,
+        replan_interval: Optional[int] = None,
+        temporal_ensemble_coeff: Optional[float] = None,
+        pin_memory: Optional[bool] = None,
+    ):
         """
         Initialize local inference client.
         
         Args:
             checkpoint_dir: Path to pretrained model directory
+            replan_interval: Steps between two chunks, defaults to the
+                policy n_action_steps
+            temporal_ensemble_coeff: Temporal ensembling weight decay
+            pin_memory: Stage inputs in pinned memory, defaults to True on CUDA
         """
         try:
             from lerobot.policies.act.modeling_act import ACTPolicy
@@ -145,9 +465,15 @@ class LocalInferenceClient(InferenceClient):
         self.policy.eval()
         
         # Determine device
-        self.device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")
+        if torch.cuda.is_available():
+            self.device = torch.device("cuda")
+        elif torch.backends.mps.is_available():
+            self.device = torch.device("mps")
+        else:
+            self.device = torch.device("cpu")
         print(f"Using device: {self.device}")
         self.policy.to(self.device)
+        self.preprocess = ObservationPreprocessor(self.device, pin_memory)
         
         # Load normalization stats
         stats_path = Path(checkpoint_dir) / "policy_preprocessor_step_3_normalizer_processor.safetensors"
@@ -161,76 +487,41 @@ class LocalInferenceClient(InferenceClient):
             self.action_std = stats["action.std"].to(self.device)
         else:
             print("WARNING: Stats file not found. Assuming unnormalized output.")
+
+        self.replan_interval = replan_interval or self.policy.config.n_action_steps
+        self.temporal_ensemble_coeff = temporal_ensemble_coeff
         
         print("✓ Local inference client initialized")
     
-    def predict(self, observation: Dict[str, np.ndarray]) -> np.ndarray:
+    def predict(self, observation: Dict[str, np.ndarray], stream: Hashable = None) -> np.ndarray:
         """
         Run local PyTorch inference.
         
         Args:
             observation: Raw observation from environment
+            stream: Key of the environment the observation comes from
         
         Returns:
             Unnormalized action array [14]
         """
-        # Prepare state
-        state = torch.from_numpy(observation["observation.state"].copy()).float()
-        state = state.unsqueeze(0).to(self.device)  # [1, 8]
-        
-        # Prepare image
-        image_raw = observation["observation.images.top_cam"]
-        
-        # Handle both numpy and torch tensors
-        if hasattr(image_raw, 'numpy'):
-            image_raw = image_raw.numpy()
-        
-        # Check format and convert if needed
-        # Gym env returns CHW [3, H, W], we need to handle that
-        if image_raw.shape[0] == 3:
-            # Already in CHW format, convert to HWC for processing
-            image_hwc = np.transpose(image_raw, (1, 2, 0))  # [3, H, W] -> [H, W, 3]
-        elif image_raw.shape[-1] == 3:
-            # Already in HWC format
-            image_hwc = image_raw
-        else:
-            raise ValueError(f"Unexpected image shape: {image_raw.shape}")
-        
-        # Convert to torch and to CHW for model
-        image = torch.from_numpy(image_hwc.copy()).float()
-        image = image.permute(2, 0, 1)  # [H, W, 3] -> [3, H, W]
-        
-        # Normalize to [0, 1]
-        image = image / 255.0
-        
-        # Apply ImageNet normalization
-        imagenet_mean = torch.tensor([0.485, 0.456, 0.406]).view(3, 1, 1)
-        imagenet_std = torch.tensor([0.229, 0.224, 0.225]).view(3, 1, 1)
-        image = (image - imagenet_mean) / imagenet_std
-        
-        # Add batch dimension
-        image = image.unsqueeze(0).to(self.device)  # [1, 3, H, W]
-        
-        # Create batch
-        batch = {
-            "observation.state": state,
-            "observation.images.top_cam": image,
-        }
+        return self._chunked_action(observation, stream)
+
+    def predict_chunk(self, observation: Dict[str, np.ndarray]) -> np.ndarray:
+        """Return the unnormalized action chunk [chunk_size, 8] of an observation."""
+        batch = self.preprocess(observation)
         
         # Run inference
-        with torch.no_grad():
-            action = self.policy.select_action(batch)
-        
-        # Unnormalize if stats available
-        if self.action_mean is not None:
-            action = action * self.action_std + self.action_mean
-        
-        # Convert to numpy: [1, 8] -> [8]
-        action_np = action.squeeze(0).cpu().numpy()
+        with torch.inference_mode():
+            actions = self.policy.predict_action_chunk(batch)
+            
+            # Unnormalize if stats available
+            if self.action_mean is not None:
+                actions = torch.addcmul(self.action_mean, actions, self.action_std)
         
-        return action_np
+        # Convert to numpy: [1, chunk_size, 8] -> [chunk_size, 8]
+        return actions.squeeze(0).cpu().numpy()
     
     def close(self):
         """Clean up resources."""
         # PyTorch models don't need explicit cleanup
-        pass
+        self._close_executor()
@@ -0,0 +1,268 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from collections.abc import Mapping
+import os
+import time
+
+import numpy as np
+
+from trossen_arm_mujoco.constants import DT
+
+# LeRobot names of the recorded cameras, as used for training. Other cameras keep their name.
+LEROBOT_CAMERA_NAMES = {"cam_high": "top_cam"}
+
+DEFAULT_TASK = "Pick up the red cube and place it in the green bucket."
+
+
+def _blocking_video_encoder(encoder):
+    """
+    Return a copy of a LeRobot ``StreamingVideoEncoder`` whose ``feed_frame`` waits for room.
+
+    LeRobot drops a frame when the queue of its encoder thread stays full for 0.1 s, which suits
+    live cameras but not simulation or offline conversion, whose frames can always wait.
+
+    :param encoder: The streaming encoder of a ``LeRobotDataset``.
+    :return: An encoder with the same settings that never drops frames.
+    """
+    from lerobot.datasets.video_utils import StreamingVideoEncoder
+
+    class BlockingVideoEncoder(StreamingVideoEncoder):
+        def feed_frame(self, video_key: str, image: np.ndarray) -> None:
+            frame_queue = self._frame_queues.get(video_key)
+            thread = self._threads.get(video_key)
+            if frame_queue is not None and thread is not None:
+                # a single thread feeds the queue, so it still has room when the frame is put;
+                # not_full holds the queue mutex, so the length is read from the deque directly
+                with frame_queue.not_full:
+                    while len(frame_queue.queue) >= frame_queue.maxsize and thread.is_alive():
+                        frame_queue.not_full.wait(timeout=1.0)
+            super().feed_frame(video_key, image)
+
+    return BlockingVideoEncoder(
+        fps=encoder.fps,
+        vcodec=encoder.vcodec,
+        pix_fmt=encoder.pix_fmt,
+        g=encoder.g,
+        crf=encoder.crf,
+        preset=encoder.preset,
+        queue_maxsize=encoder.queue_maxsize,
+        encoder_threads=encoder.encoder_threads,
+    )
+
+
+def lerobot_image_key(cam_name: str) -> str:
+    """Return the LeRobot feature key of a camera."""
+    return f"observation.images.{LEROBOT_CAMERA_NAMES.get(cam_name, cam_name)}"
+
+
+def lerobot_features(
+    qpos_dim: int,
+    cam_list: list[str],
+    height: int = 480,
+    width: int = 640,
+) -> dict:
+    """
+    Return the LeRobot features of recorded episodes.
+
+    :param qpos_dim: Dimension of the joint positions and actions.
+    :param cam_list: List of recorded camera names.
+    :param height: Image height, defaults to ``480``.
+    :param width: Image width, defaults to ``640``.
+    :return: The feature specification passed to ``LeRobotDataset.create``.
+    """
+    if qpos_dim == 8:
+        joint_names = [f"joint_{i}" for i in range(6)] + ["gripper_l", "gripper_r"]
+    else:
+        joint_names = [f"joint_{i}" for i in range(qpos_dim)]
+    features = {
+        "action": {"dtype": "float32", "shape": (qpos_dim,), "names": joint_names},
+        "observation.state": {
+            "dtype": "float32",
+            "shape": (qpos_dim,),
+            "names": [f"{name}_pos" for name in joint_names],
+        },
+    }
+    for cam_name in cam_list:
+        features[lerobot_image_key(cam_name)] = {
+            "dtype": "video",
+            "shape": (3, height, width),
+            "names": ["channels", "height", "width"],
+        }
+    return features
+
+
+class LeRobotDatasetWriter:
+    """
+    Record episodes straight into a LeRobot dataset.
+
+    Frames go to a ``LeRobotDataset`` with streaming video encoding, so each camera is encoded
+    to video on encoder threads while the episode is simulated, and saving an episode only writes
+    its parquet rows, video and statistics to the ``data/``, ``videos/`` and ``meta/`` layout of
+    LeRobot. Adding a frame waits while the encoder queue is full, so frames are never dropped.
+    An existing dataset at ``root`` is appended to. :meth:`close` must be called once all
+    episodes are recorded, it finalizes the parquet files.
+
+    :param root: Directory of the LeRobot dataset.
+    :param repo_id: Repository id of the dataset.
+    :param qpos_dim: Dimension of the joint positions and actions.
+    :param cam_list: List of camera names to record.
+    :param task: Task description stored with every frame, defaults to :data:`DEFAULT_TASK`.
+    :param height: Image height, defaults to ``480``.
+    :param width: Image width, defaults to ``640``.
+    :param vcodec: Video codec, defaults to ``'libsvtav1'``.
+    :param encoder_queue_size: Frames buffered per camera for the video encoder, adding frames
+        waits beyond it, defaults to ``60``.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        repo_id: str,
+        qpos_dim: int,
+        cam_list: list[str],
+        task: str = DEFAULT_TASK,
+        height: int = 480,
+        width: int = 640,
+        vcodec: str = "libsvtav1",
+        encoder_queue_size: int = 60,
+    ):
+        try:
+            from lerobot.datasets.lerobot_dataset import LeRobotDataset
+        except ImportError:
+            raise ImportError("lerobot not installed. Install with: pip install lerobot")
+
+        self.root = root
+        self.cam_list = list(cam_list)
+        self.task = task
+        if os.path.isfile(os.path.join(root, "meta", "info.json")):
+            self.dataset = LeRobotDataset(
+                repo_id,
+                root=root,
+                vcodec=vcodec,
+                streaming_encoding=True,
+                encoder_queue_maxsize=encoder_queue_size,
+            )
+        else:
+            self.dataset = LeRobotDataset.create(
+                repo_id=repo_id,
+                fps=int(round(1 / DT)),
+                features=lerobot_features(qpos_dim, cam_list, height, width),
+                root=root,
+                use_videos=True,
+                vcodec=vcodec,
+                streaming_encoding=True,
+                encoder_queue_maxsize=encoder_queue_size,
+            )
+        self.dataset._streaming_encoder = _blocking_video_encoder(self.dataset._streaming_encoder)
+
+    def __enter__(self) -> "LeRobotDatasetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def episode_writer(self) -> "LeRobotEpisodeWriter":
+        """Return a writer for the next episode of the dataset."""
+        return LeRobotEpisodeWriter(self)
+
+    def close(self) -> None:
+        """Finalize the dataset files."""
+        self.dataset.finalize()
+
+
+class LeRobotEpisodeWriter:
+    """
+    Stream one episode into a :class:`LeRobotDatasetWriter`.
+
+    Has the interface of :class:`~trossen_arm_mujoco.episode_writer.EpisodeWriter`. Only the
+    joint positions, actions and images are part of the LeRobot features.
+
+    :param dataset_writer: The dataset to add the episode to.
+    """
+
+    def __init__(self, dataset_writer: LeRobotDatasetWriter):
+        self._dataset_writer = dataset_writer
+        self._dataset = dataset_writer.dataset
+        self._num_written = 0
+        self._closed = False
+        # episodes are saved in order, so this is the index the episode gets in the dataset
+        self.episode_index = self._dataset.meta.total_episodes
+        self.write_time = 0.0
+
+    def __len__(self) -> int:
+        return self._num_written
+
+    def __enter__(self) -> "LeRobotEpisodeWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def append(
+        self,
+        qpos: np.ndarray,
+        qvel: np.ndarray,
+        env_state: np.ndarray,
+        action: np.ndarray,
+        images: Mapping[str, np.ndarray],
+    ) -> None:
+        """Add one frame of the episode, see :meth:`EpisodeWriter.append`."""
+        t0 = time.perf_counter()
+        frame = {
+            "action": np.asarray(action, dtype=np.float32),
+            "observation.state": np.asarray(qpos, dtype=np.float32),
+            "task": self._dataset_writer.task,
+        }
+        for cam_name in self._dataset_writer.cam_list:
+            frame[lerobot_image_key(cam_name)] = images[cam_name]
+        self._dataset.add_frame(frame)
+        self._num_written += 1
+        self.write_time += time.perf_counter() - t0
+
+    def close(self) -> None:
+        """Save the episode to the dataset, an empty episode is dropped."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._num_written == 0:
+            return
+        t0 = time.perf_counter()
+        self._dataset.save_episode()
+        self.write_time += time.perf_counter() - t0
+
+    def abort(self) -> None:
+        """Drop the frames of the episode."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._num_written > 0:
+            self._dataset.clear_episode_buffer()
@@ -0,0 +1,127 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import glob
+import json
+import os
+import re
+
+# Name of the manifest file in a dataset directory
+MANIFEST_FILENAME = "manifest.jsonl"
+
+_EPISODE_PATTERN = re.compile(r"episode_(\d+)\.hdf5$")
+
+
+def manifest_path(data_dir: str) -> str:
+    """Return the path of the manifest of a dataset directory."""
+    return os.path.join(data_dir, MANIFEST_FILENAME)
+
+
+def read_manifest(data_dir: str) -> dict[int, dict]:
+    """
+    Read the manifest of a dataset directory.
+
+    The manifest is a JSON-lines file with one entry per recorded episode, appended once the
+    episode file is complete. If an episode was recorded more than once, its last entry wins. A
+    line cut short by an interrupted job is ignored.
+
+    :param data_dir: The dataset directory.
+    :return: Manifest entries by episode index, sorted by index, or an empty dictionary if the
+        directory has no manifest.
+    """
+    entries = {}
+    path = manifest_path(data_dir)
+    if not os.path.isfile(path):
+        return entries
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["episode_index"]] = entry
+    return dict(sorted(entries.items()))
+
+
+def append_manifest(data_dir: str, entry: dict) -> None:
+    """
+    Append the entry of a recorded episode to the manifest of a dataset directory.
+
+    Only one process should append to a manifest, the recorder does so from its main process.
+
+    :param data_dir: The dataset directory.
+    :param entry: The episode entry, with at least ``episode_index`` and ``file``, which is
+        ``None`` for an episode that was discarded without being saved.
+    """
+    with open(manifest_path(data_dir), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def is_complete(data_dir: str, entry: dict) -> bool:
+    """
+    Check that the file of a manifest entry exists and has the recorded size.
+
+    Discarded episodes have no file and are always complete.
+
+    :param data_dir: The dataset directory.
+    :param entry: The manifest entry of the episode.
+    :return: Whether the episode file is complete.
+    """
+    if entry["file"] is None:
+        return True
+    path = os.path.join(data_dir, entry["file"])
+    return os.path.isfile(path) and os.path.getsize(path) == entry["file_size"]
+
+
+def list_episode_files(data_dir: str, successful_only: bool = False) -> list[str]:
+    """
+    List the episode files of a dataset directory in episode order.
+
+    Episodes are taken from the manifest, without opening any episode file, and episodes that were
+    discarded without being saved are left out. Directories recorded
+    before the manifest existed are listed by file name instead, in which case every episode is
+    considered successful.
+
+    :param data_dir: The dataset directory.
+    :param successful_only: Whether to only list successful episodes, defaults to ``False``.
+    :return: Paths of the episode files.
+    """
+    entries = read_manifest(data_dir)
+    if entries:
+        return [
+            os.path.join(data_dir, entry["file"])
+            for entry in entries.values()
+            if entry["file"] is not None and (entry["success"] or not successful_only)
+        ]
+    paths = glob.glob(os.path.join(data_dir, "episode_*.hdf5"))
+    return sorted(
+        (path for path in paths if _EPISODE_PATTERN.search(path)),
+        key=lambda path: int(_EPISODE_PATTERN.search(path).group(1)),
+    )
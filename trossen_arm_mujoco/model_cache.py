@@ -0,0 +1,153 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import copy
+import hashlib
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+
+import mujoco
+
+from trossen_arm_mujoco.constants import MODEL_CACHE_DIR
+
+# Asset elements whose ``file`` attribute is resolved against a compiler directory
+_ASSET_DIRS = {
+    "mesh": "meshdir",
+    "skin": "meshdir",
+    "hfield": "assetdir",
+    "texture": "texturedir",
+}
+
+_MODELS: dict[str, mujoco.MjModel] = {}
+
+
+def collect_model_files(xml_path: str) -> list[str]:
+    """
+    List the files a scene XML depends on: the XML itself, included XMLs and asset files.
+
+    Included files are resolved relative to the directory of ``xml_path``, and asset files
+    against the ``meshdir`` / ``texturedir`` / ``assetdir`` set by any ``<compiler>`` element.
+
+    :param xml_path: Path to the scene XML file.
+    :return: Absolute paths of all files the compiled model depends on, in a stable order.
+    """
+    model_dir = os.path.dirname(os.path.abspath(xml_path))
+    xml_files: list[str] = []
+    assets: list[tuple[str, str]] = []
+    compiler_dirs: dict[str, str] = {}
+
+    pending = [os.path.abspath(xml_path)]
+    while pending:
+        path = pending.pop(0)
+        if path in xml_files:
+            continue
+        xml_files.append(path)
+        for element in ET.parse(path).iter():
+            if element.tag == "compiler":
+                for attr in ("assetdir", "meshdir", "texturedir"):
+                    if attr in element.attrib:
+                        compiler_dirs[attr] = element.attrib[attr]
+            elif element.tag == "include":
+                pending.append(os.path.join(model_dir, element.attrib["file"]))
+            elif element.tag in _ASSET_DIRS and "file" in element.attrib:
+                assets.append((_ASSET_DIRS[element.tag], element.attrib["file"]))
+
+    asset_files = []
+    for dir_attr, file in assets:
+        asset_dir = compiler_dirs.get(dir_attr, compiler_dirs.get("assetdir", ""))
+        asset_files.append(os.path.normpath(os.path.join(model_dir, asset_dir, file)))
+    return xml_files + sorted(set(asset_files))
+
+
+def model_hash(xml_path: str) -> str:
+    """
+    Compute a content hash of a scene XML, everything it references and the MuJoCo version.
+
+    :param xml_path: Path to the scene XML file.
+    :return: The hex digest identifying the compiled model.
+    """
+    model_dir = os.path.dirname(os.path.abspath(xml_path))
+    digest = hashlib.sha256(mujoco.__version__.encode())
+    for path in collect_model_files(xml_path):
+        digest.update(os.path.relpath(path, model_dir).encode())
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def load_model(xml_path: str, cache_dir: str | None = MODEL_CACHE_DIR) -> mujoco.MjModel:
+    """
+    Load a compiled model, reusing previously compiled models where possible.
+
+    Models are cached in-process by XML path. On a miss, a compiled binary (MJB) keyed by
+    :func:`model_hash` is loaded from ``cache_dir``; if there is none, the XML is compiled and the
+    binary is written for later processes. Since the hash covers every referenced asset, editing
+    any of them invalidates the binary.
+
+    Every call returns its own copy of the cached model, since the simulation backends modify
+    their model (``Physics.reset`` and ``NativePhysics.forward`` toggle ``opt.disableflags``).
+    Copying a compiled model is still far cheaper than compiling the XML.
+
+    :param xml_path: Path to the scene XML file.
+    :param cache_dir: Directory for compiled binaries, or ``None`` to skip the on-disk cache,
+        defaults to ``MODEL_CACHE_DIR``.
+    :return: A copy of the compiled model, owned by the caller.
+    """
+    key = os.path.abspath(xml_path)
+    model = _MODELS.get(key)
+    if model is not None:
+        return copy.copy(model)
+
+    if cache_dir is None:
+        model = mujoco.MjModel.from_xml_path(key)
+    else:
+        name = os.path.splitext(os.path.basename(key))[0]
+        mjb_path = os.path.join(cache_dir, f"{name}-{model_hash(key)[:16]}.mjb")
+        if os.path.exists(mjb_path):
+            model = mujoco.MjModel.from_binary_path(mjb_path)
+        else:
+            model = mujoco.MjModel.from_xml_path(key)
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first so concurrent workers never read a partial binary
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".mjb.tmp")
+            os.close(fd)
+            try:
+                mujoco.mj_saveModel(model, tmp_path, None)
+                os.replace(tmp_path, mjb_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+    _MODELS[key] = model
+    return copy.copy(model)
+
+
+def clear_model_cache() -> None:
+    """Drop all models cached in this process."""
+    _MODELS.clear()
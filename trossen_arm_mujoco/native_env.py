@@ -0,0 +1,232 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from collections.abc import Iterator
+import contextlib
+
+from dm_control.suite import base
+import dm_env
+import mujoco
+import numpy as np
+
+
+class NativePhysics:
+    """
+    Lightweight physics built directly on the ``mujoco`` bindings.
+
+    Exposes the subset of the dm_control ``Physics`` API used by the tasks (``model``, ``data``,
+    ``reset_context``, ``set_control``, ``step`` and ``render``) on top of a raw ``MjModel`` and
+    ``MjData``, without named indexing or per-step invalid state checks. Stepping and resetting
+    follow dm_control exactly, so both backends produce the same trajectories.
+
+    :param model: The compiled MuJoCo model.
+    """
+
+    def __init__(self, model: mujoco.MjModel):
+        self.model = model
+        self.data = mujoco.MjData(model)
+        self._renderers: dict[tuple[int, int], mujoco.Renderer] = {}
+
+    @classmethod
+    def from_xml_path(cls, xml_path: str) -> "NativePhysics":
+        """
+        Compile a model from an MJCF file.
+
+        :param xml_path: Path to the MJCF file.
+        :return: The physics instance.
+        """
+        return cls(mujoco.MjModel.from_xml_path(xml_path))
+
+    def timestep(self) -> float:
+        """
+        Get the simulation timestep.
+
+        :return: The timestep in seconds.
+        """
+        return self.model.opt.timestep
+
+    def set_control(self, control: np.ndarray) -> None:
+        """
+        Set the control signal for the actuators.
+
+        :param control: Actuation values, one per actuator.
+        """
+        np.copyto(self.data.ctrl, control)
+
+    def step(self, nstep: int = 1) -> None:
+        """
+        Advance the simulation by ``nstep`` substeps.
+
+        Like dm_control's legacy stepping, the position and velocity dependent quantities
+        (including contacts) are up to date with the new state when this returns.
+
+        :param nstep: Number of substeps to take, defaults to ``1``.
+        """
+        if self.model.opt.integrator != mujoco.mjtIntegrator.mjINT_RK4.value:
+            mujoco.mj_step2(self.model, self.data)
+            if nstep > 1:
+                mujoco.mj_step(self.model, self.data, nstep - 1)
+        else:
+            mujoco.mj_step(self.model, self.data, nstep)
+        mujoco.mj_step1(self.model, self.data)
+
+    def forward(self) -> None:
+        """Recompute the forward dynamics with actuation disabled, as dm_control does on reset."""
+        disableflags = self.model.opt.disableflags
+        self.model.opt.disableflags = disableflags | mujoco.mjtDisableBit.mjDSBL_ACTUATION.value
+        try:
+            mujoco.mj_forward(self.model, self.data)
+        finally:
+            self.model.opt.disableflags = disableflags
+
+    def reset(self) -> None:
+        """Reset the simulation state to the model defaults."""
+        mujoco.mj_resetData(self.model, self.data)
+        self.forward()
+
+    @contextlib.contextmanager
+    def reset_context(self) -> Iterator["NativePhysics"]:
+        """
+        Context manager resetting the simulation on entry and recomputing it on exit.
+
+        :return: The physics instance.
+        """
+        self.reset()
+        yield self
+        self.forward()
+
+    def render(self, height: int = 240, width: int = 320, camera_id: int | str = -1) -> np.ndarray:
+        """
+        Render a camera view of the current state.
+
+        :param height: Image height in pixels, defaults to ``240``.
+        :param width: Image width in pixels, defaults to ``320``.
+        :param camera_id: Camera name or id, defaults to ``-1`` (the free camera).
+        :return: An RGB image of shape ``(height, width, 3)``.
+        """
+        renderer = self._renderers.get((height, width))
+        if renderer is None:
+            renderer = mujoco.Renderer(self.model, height=height, width=width)
+            self._renderers[(height, width)] = renderer
+        renderer.update_scene(self.data, camera=camera_id)
+        return renderer.render()
+
+    def free(self) -> None:
+        """Release the rendering contexts."""
+        for renderer in self._renderers.values():
+            renderer.close()
+        self._renderers.clear()
+
+
+class NativeEnvironment:
+    """
+    Environment driving a task on :class:`NativePhysics`.
+
+    Mirrors ``dm_control.rl.control.Environment`` with ``flat_observation=False``: it calls the
+    same task hooks in the same order and returns ``dm_env.TimeStep`` instances.
+
+    :param physics: The physics instance.
+    :param task: The task defining episode initialization, observations and rewards.
+    :param time_limit: Episode duration in seconds, defaults to ``float('inf')``.
+    :param control_timestep: Duration of one environment step in seconds, defaults to the
+        physics timestep.
+    """
+
+    def __init__(
+        self,
+        physics: NativePhysics,
+        task: base.Task,
+        time_limit: float = float("inf"),
+        control_timestep: float | None = None,
+    ):
+        self._physics = physics
+        self._task = task
+        if control_timestep is None:
+            self._n_sub_steps = 1
+        else:
+            self._n_sub_steps = int(round(control_timestep / physics.timestep()))
+        control_timestep = self._n_sub_steps * physics.timestep()
+        if time_limit == float("inf"):
+            self._step_limit = float("inf")
+        else:
+            self._step_limit = time_limit / control_timestep
+        self._step_count = 0
+        self._reset_next_step = True
+
+    @property
+    def physics(self) -> NativePhysics:
+        return self._physics
+
+    @property
+    def task(self) -> base.Task:
+        return self._task
+
+    def reset(self) -> dm_env.TimeStep:
+        """
+        Start a new episode.
+
+        :return: The first timestep of the episode.
+        """
+        self._reset_next_step = False
+        self._step_count = 0
+        with self._physics.reset_context():
+            self._task.initialize_episode(self._physics)
+        observation = self._task.get_observation(self._physics)
+        return dm_env.TimeStep(dm_env.StepType.FIRST, None, None, observation)
+
+    def step(self, action: np.ndarray) -> dm_env.TimeStep:
+        """
+        Apply an action and advance the simulation by one control step.
+
+        :param action: The action passed to the task.
+        :return: The resulting timestep.
+        """
+        if self._reset_next_step:
+            return self.reset()
+
+        self._task.before_step(action, self._physics)
+        self._physics.step(self._n_sub_steps)
+        self._task.after_step(self._physics)
+
+        reward = self._task.get_reward(self._physics)
+        observation = self._task.get_observation(self._physics)
+
+        self._step_count += 1
+        if self._step_count >= self._step_limit:
+            discount = 1.0
+        else:
+            discount = self._task.get_termination(self._physics)
+
+        if discount is not None:
+            self._reset_next_step = True
+            return dm_env.TimeStep(dm_env.StepType.LAST, reward, discount, observation)
+        return dm_env.TimeStep(dm_env.StepType.MID, reward, 1.0, observation)
+
+    def close(self) -> None:
+        """Release the rendering contexts of the physics."""
+        self._physics.free()
@@ -47,10 +47,21 @@ class BasePolicy:
     Base class for trajectory-based robot policies.
 
     :param inject_noise: Whether to inject noise into actions for robustness testing, defaults to ``False``.
+    :param random: Random state to draw the noise from, defaults to ``None`` (the global NumPy
+        random state).
     """
 
-    def __init__(self, inject_noise: bool = False):
+    # (step, reward) pairs: a rollout whose task reward has not reached ``reward`` by ``step``
+    # can no longer succeed, so it can be stopped there
+    milestones: list[tuple[int, int]] = []
+
+    def __init__(
+        self,
+        inject_noise: bool = False,
+        random: np.random.RandomState | None = None,
+    ):
         self.inject_noise = inject_noise
+        self.random = np.random if random is None else random
         self.step_count = 0
         self.left_trajectory: list[dict] = []
         self.right_trajectory: list[dict] = []
@@ -121,8 +132,8 @@ class BasePolicy:
         # Inject noise
         if self.inject_noise:
             scale = 0.01
-            left_xyz = left_xyz + np.random.uniform(-scale, scale, left_xyz.shape)
-            right_xyz = right_xyz + np.random.uniform(-scale, scale, right_xyz.shape)
+            left_xyz = left_xyz + self.random.uniform(-scale, scale, left_xyz.shape)
+            right_xyz = right_xyz + self.random.uniform(-scale, scale, right_xyz.shape)
 
         action_left = np.concatenate([left_xyz, left_quat, [left_gripper]])
         action_right = np.concatenate([right_xyz, right_quat, [right_gripper]])
@@ -134,6 +145,9 @@ class BasePolicy:
 class PickAndTransferPolicy(BasePolicy):
     """Policy for picking up and transferring a cube between two robotic arms."""
 
+    # the right gripper holds the cube by the end of the lift towards the meet position
+    milestones = [(340, 2)]
+
     def generate_trajectory(self, ts_first: TimeStep):
         """
         Generates a predefined trajectory for the pick-and-transfer task.
@@ -310,6 +324,9 @@ class PickAndTransferPolicy(BasePolicy):
 class PickAndPlacePolicy(BasePolicy):
     """Policy for picking up a cube and placing it into a bucket using the right arm."""
 
+    # the cube is lifted by the end of the lift waypoint
+    milestones = [(320, 2)]
+
     def generate_trajectory(self, ts_first: TimeStep):
         """
         Generates a predefined trajectory for the pick-and-place task.
@@ -449,7 +466,7 @@ class PickAndPlacePolicy(BasePolicy):
 
         if self.inject_noise:
             scale = 0.01
-            right_xyz = right_xyz + np.random.uniform(-scale, scale, right_xyz.shape)
+            right_xyz = right_xyz + self.random.uniform(-scale, scale, right_xyz.shape)
 
         action_right = np.concatenate([right_xyz, right_quat, [right_gripper]])
         self.step_count += 1
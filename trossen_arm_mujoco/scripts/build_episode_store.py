@@ -0,0 +1,93 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import os
+import sys
+import time
+
+# Add project root to sys.path to ensure local imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from trossen_arm_mujoco.constants import ROOT_DIR
+from trossen_arm_mujoco.episode_store import import_hdf5
+from trossen_arm_mujoco.manifest import list_episode_files
+
+
+def main(args):
+    """
+    Import the HDF5 episodes of a dataset directory into a memory-mapped episode store.
+    """
+    root_dir = args.root_dir if args.root_dir else ROOT_DIR
+    data_dir = os.path.join(root_dir, args.data_dir)
+    output_dir = args.output_dir if args.output_dir else os.path.join(data_dir, "store")
+
+    paths = list_episode_files(data_dir, successful_only=args.successful_only)
+    print(f"Importing {len(paths)} episodes into {output_dir}")
+    t_start = time.time()
+    store = import_hdf5(paths, output_dir, chunk_size=args.chunk_size)
+    elapsed = time.time() - t_start
+    print(
+        f"Imported {store.num_episodes} episodes, {len(store)} frames in {elapsed:.1f} secs "
+        f"({len(store) / max(elapsed, 1e-9):.1f} frames/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import HDF5 episodes into a memory-mapped episode store."
+    )
+    parser.add_argument(
+        "--root_dir",
+        type=str,
+        help="Root directory of the data.",
+    )
+    parser.add_argument(
+        "--data_dir",
+        type=str,
+        required=True,
+        help="Directory of the HDF5 episodes.",
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        help="Directory of the store, defaults to <data_dir>/store.",
+    )
+    parser.add_argument(
+        "--successful_only",
+        action="store_true",
+        help="Only import episodes marked successful in the manifest.",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=64,
+        help="Frames copied at a time.",
+    )
+    args = parser.parse_args()
+    main(args)
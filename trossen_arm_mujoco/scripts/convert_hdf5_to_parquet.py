@@ -1,85 +1,231 @@
 
 import argparse
-import glob
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import os
+import shutil
+import sys
+import time
 
 import h5py
 import numpy as np
-import pandas as pd
-from PIL import Image
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add project root to sys.path to ensure local imports work
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from trossen_arm_mujoco.conversion_index import FINGERPRINTS, ConversionIndex
+from trossen_arm_mujoco.image_storage import encode_image, read_images
+from trossen_arm_mujoco.manifest import list_episode_files
 
 # Constants
 DT = 0.02  # Simulation timestep (check if this matches your recording)
 
+# How the images of an episode are stored:
+#   files:    one image file per frame under images/episode_<id>/, the column holds its path
+#   embedded: the encoded image bytes are a column of the episode parquet file
+#   shard:    one images/episode_<id>.parquet file per episode holding the encoded frames,
+#             the column holds its path and frame_index selects the row
+IMAGE_OUTPUTS = ("files", "embedded", "shard")
+IMAGE_EXTENSIONS = {"png": "png", "jpeg": "jpg"}
+
+
+def image_output_path(episode_id, image_output):
+    """
+    Return where the images of an episode are written, relative to the output directory.
+
+    :param episode_id: The episode id, as in ``episode_<id>.hdf5``.
+    :param image_output: One of :data:`IMAGE_OUTPUTS`.
+    :return: The image directory (``files``) or image parquet file (``shard``), or ``None`` for
+        embedded images.
+    """
+    if image_output == "files":
+        return os.path.join("images", f"episode_{episode_id}")
+    if image_output == "shard":
+        return os.path.join("images", f"episode_{episode_id}.parquet")
+    return None
+
+
+def remove_outputs(output_dir_base, entry):
+    """
+    Remove the files an episode was converted to, as recorded by its conversion index entry.
+
+    :param output_dir_base: Directory of the parquet files.
+    :param entry: The index entry of the episode.
+    """
+    paths = [entry["output"]]
+    if entry["images"] is not None:
+        paths.append(entry["images"])
+    for path in paths:
+        path = os.path.join(output_dir_base, path)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.isfile(path):
+            os.remove(path)
+
+
+def fixed_size_list(values, num_rows=None):
+    """
+    Build a fixed-size-list Arrow column from a 2-D array, without going through Python lists.
+
+    :param values: The ``(frames, dim)`` array.
+    :param num_rows: Number of rows, rows past ``len(values)`` are null, defaults to
+        ``len(values)``.
+    :return: The ``fixed_size_list<float32>[dim]`` array.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    num_values, dim = values.shape
+    num_rows = num_values if num_rows is None else num_rows
+    mask = None
+    if num_rows > num_values:
+        values = np.concatenate([values, np.zeros((num_rows - num_values, dim), np.float32)])
+        mask = pa.array(np.arange(num_rows) >= num_values)
+    flat = pa.array(np.ascontiguousarray(values[:num_rows]).reshape(-1))
+    return pa.FixedSizeListArray.from_arrays(flat, dim, mask=mask)
+
+
+def encoded_frames(dataset, start, stop, image_encoding, quality=None):
+    """
+    Read frames ``start:stop`` of a camera dataset as encoded image bytes.
+
+    Frames already stored with ``image_encoding`` are copied as is, others are decoded if needed
+    and encoded.
+
+    :param dataset: The camera dataset, raw, filter compressed or encoded.
+    :param start: Index of the first frame.
+    :param stop: Index past the last frame.
+    :param image_encoding: ``'png'`` or ``'jpeg'``.
+    :param quality: JPEG quality or PNG compression level, defaults to the codec default.
+    :return: The list of encoded frames.
+    """
+    if dataset.attrs.get("encoding") == image_encoding:
+        return [buffer.tobytes() for buffer in dataset[start:stop]]
+    images = read_images(dataset, slice(start, stop))
+    return [encode_image(image, image_encoding, quality).tobytes() for image in images]
+
+
+def convert_episode(
+    hdf5_path,
+    output_dir_base,
+    image_output="files",
+    image_encoding="png",
+    quality=None,
+    chunk_size=64,
+):
+    """
+    Convert one HDF5 episode to ``episode_<id>.parquet``.
 
-def convert_episode(hdf5_path, output_dir_base):
+    Frames are streamed ``chunk_size`` at a time, each chunk is one row group of the parquet
+    file, so an episode is never loaded whole. State and action are fixed-size-list columns.
+
+    :param hdf5_path: Path of the HDF5 episode.
+    :param output_dir_base: Directory of the parquet files.
+    :param image_output: One of :data:`IMAGE_OUTPUTS`, defaults to ``'files'``.
+    :param image_encoding: ``'png'`` or ``'jpeg'``, defaults to ``'png'``.
+    :param quality: JPEG quality or PNG compression level, defaults to the codec default.
+    :param chunk_size: Number of frames converted at a time, defaults to ``64``.
+    :return: The path of the parquet file and its number of frames, or ``None`` if the
+        episode has no suitable camera.
+    """
     filename = os.path.basename(hdf5_path)
     episode_id = filename.replace(".hdf5", "").replace("episode_", "")
-    
-    # Create image directory for this episode
-    img_dir = os.path.join(output_dir_base, "images", f"episode_{episode_id}")
-    os.makedirs(img_dir, exist_ok=True)
-    
+    episode_index = int(episode_id)
+    output_path = os.path.join(output_dir_base, filename.replace(".hdf5", ".parquet"))
+
     with h5py.File(hdf5_path, "r") as root:
-        # Check available keys
-        # Assuming structure:
-        # /observations/qpos
-        # /observations/images/cam_high (or similar)
-        # /action
-        
-        qpos = root["/observations/qpos"][()]
-        actions = root["/action"][()]  # Action taken *at* this step (or resulting in next?)
-        # Usually: state[t], action[t] -> state[t+1]
-        
         # Images: User asked for 'top_cam'. We'll map 'cam_high' to it.
-        # Check which cameras exist
         cam_key = None
         if "cam_high" in root["/observations/images"]:
             cam_key = "cam_high"
         elif "cam_low" in root["/observations/images"]:
-            cam_key = "cam_low" # Fallback
-        
+            cam_key = "cam_low"  # Fallback
+
         if not cam_key:
             print(f"Warning: No suitable camera found in {hdf5_path}. Skipping.")
             return None
 
-        images_np = root[f"/observations/images/{cam_key}"][()]
-        
+        qpos = root["/observations/qpos"][()]
+        actions = root["/action"][()]
+        images = root[f"/observations/images/{cam_key}"]
         num_steps = qpos.shape[0]
-        # Actions might be 1 less or same length depending on recording.
-        # Usually actions match steps if we record (s, a) pairs.
-        # record_sim_episodes.py typically records same length.
-        
-        data_rows = []
-        for i in range(num_steps):
-            timestamp = i * DT
-            
-            # Save Image
-            # Shape is (H, W, 3) usually? Or (3, H, W)? MuJoCo usually (H, W, 3)
-            # visualize_eps.py used: image_dict[cam_name][frame_idx][:, :, [2, 1, 0]] converting to BGR for cv2
-            # So stored is likely RGB.
-            img_array = images_np[i]
-            img = Image.fromarray(img_array)
-            img_filename = f"frame_{i:06d}.png"
-            img_path_abs = os.path.join(img_dir, img_filename)
-            img.save(img_path_abs)
-            
-            # Relative path for portability (optional, but requested "path")
-            # We'll store relative to dataset root
-            img_path_rel = os.path.join("images", f"episode_{episode_id}", img_filename)
-
-            row = {
-                "observation.state": qpos[i].tolist(),
-                "observation.images.top_cam": img_path_rel,
-                "action": actions[i].tolist() if i < len(actions) else None,
-                "timestamp": timestamp,
-                "episode_index": int(episode_id),
-                "frame_index": i
-            }
-            data_rows.append(row)
-
-    df = pd.DataFrame(data_rows)
-    return df
+
+        image_type = pa.binary() if image_output == "embedded" else pa.string()
+        schema = pa.schema(
+            [
+                ("observation.state", pa.list_(pa.float32(), qpos.shape[1])),
+                ("observation.images.top_cam", image_type),
+                ("action", pa.list_(pa.float32(), actions.shape[1])),
+                ("timestamp", pa.float64()),
+                ("episode_index", pa.int64()),
+                ("frame_index", pa.int64()),
+            ]
+        )
+        extension = IMAGE_EXTENSIONS[image_encoding]
+        img_dir_rel = image_output_path(episode_id, "files")
+        shard_rel = image_output_path(episode_id, "shard")
+        if image_output == "files":
+            os.makedirs(os.path.join(output_dir_base, img_dir_rel), exist_ok=True)
+        elif image_output == "shard":
+            os.makedirs(os.path.join(output_dir_base, "images"), exist_ok=True)
+
+        writer = pq.ParquetWriter(output_path, schema)
+        shard_writer = None
+        if image_output == "shard":
+            shard_schema = pa.schema([("frame_index", pa.int64()), ("image", pa.binary())])
+            shard_writer = pq.ParquetWriter(
+                os.path.join(output_dir_base, shard_rel), shard_schema
+            )
+        try:
+            for start in range(0, num_steps, chunk_size):
+                stop = min(start + chunk_size, num_steps)
+                frame_index = np.arange(start, stop, dtype=np.int64)
+                frames = encoded_frames(images, start, stop, image_encoding, quality)
+                if image_output == "files":
+                    image_column = []
+                    for i, frame in zip(frame_index, frames):
+                        img_path_rel = os.path.join(img_dir_rel, f"frame_{i:06d}.{extension}")
+                        with open(os.path.join(output_dir_base, img_path_rel), "wb") as f:
+                            f.write(frame)
+                        image_column.append(img_path_rel)
+                    image_column = pa.array(image_column, pa.string())
+                elif image_output == "embedded":
+                    image_column = pa.array(frames, pa.binary())
+                else:
+                    shard_writer.write_batch(
+                        pa.record_batch(
+                            [pa.array(frame_index), pa.array(frames, pa.binary())],
+                            schema=shard_schema,
+                        )
+                    )
+                    image_column = pa.array([shard_rel] * (stop - start), pa.string())
+
+                # actions might be shorter than the states, missing ones are null
+                writer.write_batch(
+                    pa.record_batch(
+                        [
+                            fixed_size_list(qpos[start:stop]),
+                            image_column,
+                            fixed_size_list(actions[start:stop], stop - start),
+                            pa.array(frame_index * DT),
+                            pa.array(np.full(stop - start, episode_index, dtype=np.int64)),
+                            pa.array(frame_index),
+                        ],
+                        schema=schema,
+                    )
+                )
+        except BaseException:
+            # do not leave a partial episode behind
+            writer.close()
+            os.remove(output_path)
+            if shard_writer is not None:
+                shard_writer.close()
+                os.remove(os.path.join(output_dir_base, shard_rel))
+            raise
+        writer.close()
+        if shard_writer is not None:
+            shard_writer.close()
+    return output_path, num_steps
+
 
 def main(args):
     data_dir = args.data_dir
@@ -90,27 +236,106 @@ def main(args):
     output_parquet_dir = args.output_dir if args.output_dir else data_dir
     os.makedirs(output_parquet_dir, exist_ok=True)
 
-    hdf5_files = glob.glob(os.path.join(data_dir, "episode_*.hdf5"))
-    hdf5_files.sort()
-    
+    # episodes are listed by the dataset manifest, without opening each file
+    hdf5_files = list_episode_files(data_dir, successful_only=args.successful_only)
+
     print(f"Found {len(hdf5_files)} HDF5 files to convert.")
 
-    for h5_file in hdf5_files:
-        print(f"Converting {h5_file}...")
-        try:
-            df = convert_episode(h5_file, output_parquet_dir)
-            if df is not None:
-                # Save as parquet
-                filename = os.path.basename(h5_file).replace(".hdf5", ".parquet")
-                output_path = os.path.join(output_parquet_dir, filename)
-                df.to_parquet(output_path, index=False)
+    # episodes converted by an earlier run with the same image options are skipped, unless their
+    # source changed since
+    index = ConversionIndex(output_parquet_dir, args.fingerprint)
+    sources = {h5_file: index.source_fingerprint(h5_file) for h5_file in hdf5_files}
+
+    def is_converted(h5_file):
+        entry = index.get(h5_file)
+        return (
+            not args.force
+            and index.is_current(h5_file, sources[h5_file])
+            and entry["image_output"] == args.image_output
+            and entry["image_encoding"] == args.image_encoding
+            and os.path.isfile(os.path.join(output_parquet_dir, entry["output"]))
+        )
+
+    pending = [h5_file for h5_file in hdf5_files if not is_converted(h5_file)]
+    if len(pending) < len(hdf5_files):
+        print(f"Skipping {len(hdf5_files) - len(pending)} episodes already converted.")
+
+    # episodes converted again drop their previous outputs first, which another image output or
+    # encoding would otherwise leave behind
+    stale = [index.remove(h5_file) for h5_file in pending if h5_file in index]
+    for entry in stale:
+        remove_outputs(output_parquet_dir, entry)
+    if stale:
+        index.save()
+
+    convert_kwargs = dict(
+        output_dir_base=output_parquet_dir,
+        image_output=args.image_output,
+        image_encoding=args.image_encoding,
+        quality=args.quality,
+        chunk_size=args.chunk_size,
+    )
+    t_start = time.time()
+    num_frames = 0
+    with ProcessPoolExecutor(args.workers) as executor:
+        futures = {
+            executor.submit(convert_episode, h5_file, **convert_kwargs): h5_file
+            for h5_file in pending
+        }
+        for future in as_completed(futures):
+            h5_file = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Failed to convert {h5_file}: {e}")
+                continue
+            if result is not None:
+                output_path, episode_frames = result
+                num_frames += episode_frames
+                output = os.path.basename(output_path)
+                episode_id = output.replace(".parquet", "").replace("episode_", "")
+                index.update(
+                    h5_file,
+                    sources[h5_file],
+                    output=output,
+                    images=image_output_path(episode_id, args.image_output),
+                    num_frames=episode_frames,
+                    image_output=args.image_output,
+                    image_encoding=args.image_encoding,
+                )
+                index.save()
                 print(f"Saved {output_path}")
-        except Exception as e:
-            print(f"Failed to convert {h5_file}: {e}")
+    elapsed = time.time() - t_start
+    print(
+        f"Converted {num_frames} frames in {elapsed:.1f} secs "
+        f"({num_frames / max(elapsed, 1e-9):.1f} frames/s)"
+    )
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Convert HDF5 episodes to Parquet + Images")
     parser.add_argument("--data_dir", required=True, help="Directory containing HDF5 files")
     parser.add_argument("--output_dir", help="Directory to save Parquet files (default: same as data_dir)")
+    parser.add_argument("--successful_only", action="store_true", help="Only convert episodes marked successful in the manifest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of processes converting episodes (default: all CPUs)")
+    parser.add_argument(
+        "--image_output",
+        choices=IMAGE_OUTPUTS,
+        default="files",
+        help=(
+            "files: one image file per frame, embedded: image bytes in the episode parquet file, "
+            "shard: one image parquet file per episode"
+        ),
+    )
+    parser.add_argument("--image_encoding", choices=sorted(IMAGE_EXTENSIONS), default="png", help="Encoding of the converted images")
+    parser.add_argument("--quality", type=int, help="JPEG quality or PNG compression level")
+    parser.add_argument("--chunk_size", type=int, default=64, help="Frames converted at a time, one parquet row group each")
+    parser.add_argument(
+        "--fingerprint",
+        choices=FINGERPRINTS,
+        default="stat",
+        help="Detect changed episodes by size and modification time (stat) or by content hash (hash), rehashing only episodes whose size or modification time changed, kept from an existing index",
+    )
+    parser.add_argument("--force", action="store_true", help="Convert every episode, even those already converted")
     args = parser.parse_args()
     main(args)
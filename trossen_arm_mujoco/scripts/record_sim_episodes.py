@@ -27,6 +27,11 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 import argparse
+from collections.abc import Callable
+from contextlib import ExitStack
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+import multiprocessing
 import os
 import sys
 import time
@@ -34,15 +39,29 @@ import time
 # Add project root to sys.path to ensure local imports work
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-import h5py
 import matplotlib.pyplot as plt
 import numpy as np
+from dm_control.rl import control
 from tqdm import tqdm
 
 from trossen_arm_mujoco.constants import ROOT_DIR, SIM_TASK_CONFIGS
+from trossen_arm_mujoco.dataset_stats import DatasetStats, stats_path
 from trossen_arm_mujoco.ee_sim_env import OneArmPickPlaceEETask, TransferCubeEETask
+from trossen_arm_mujoco.episode_writer import (
+    AsyncEpisodeWriter,
+    BackgroundWriter,
+    EpisodeWriter,
+)
+from trossen_arm_mujoco.image_storage import IMAGE_COMPRESSIONS
+from trossen_arm_mujoco.lerobot_writer import LeRobotDatasetWriter
+from trossen_arm_mujoco.manifest import (
+    append_manifest,
+    is_complete,
+    manifest_path,
+    read_manifest,
+)
 from trossen_arm_mujoco.scripted_policy import PickAndPlacePolicy, PickAndTransferPolicy
-from trossen_arm_mujoco.sim_env import BOX_POSE, OneArmPickPlaceTask, TransferCubeTask
+from trossen_arm_mujoco.sim_env import OneArmPickPlaceTask, TransferCubeTask
 from trossen_arm_mujoco.utils import (
     make_sim_env,
     plot_observation_images,
@@ -50,6 +69,366 @@ from trossen_arm_mujoco.utils import (
 )
 
 
+def make_recording_envs(
+    task_name: str,
+    cam_list: list[str],
+    onscreen_render: bool,
+    backend: str,
+) -> tuple[type, control.Environment, control.Environment]:
+    """
+    Create the scripted policy class and the EE and joint environments of a recording task.
+
+    The environments are reset in place for every episode. The EE pass only provides the joint
+    trajectory and the initial box pose, so it skips the cameras unless they are shown on screen.
+
+    :param task_name: Name of the task.
+    :param cam_list: List of camera names to record.
+    :param onscreen_render: Whether episodes are rendered on screen.
+    :param backend: Simulation backend passed to :func:`make_sim_env`.
+    :return: The policy class, the EE environment and the joint environment.
+    """
+    if task_name == "sim_pick_place":
+        policy_cls = PickAndPlacePolicy
+        ee_task_cls = OneArmPickPlaceEETask
+        sim_task_cls = OneArmPickPlaceTask
+        scene_xml = "trossen_one_arm_scene.xml"
+        scene_joint_xml = "trossen_one_arm_scene_joint.xml"
+    else:
+        policy_cls = PickAndTransferPolicy
+        ee_task_cls = TransferCubeEETask
+        sim_task_cls = TransferCubeTask
+        scene_xml = "trossen_ai_scene.xml"
+        scene_joint_xml = "trossen_ai_scene_joint.xml"
+
+    ee_env = make_sim_env(
+        task_class=ee_task_cls,
+        xml_file=scene_xml,
+        task_name=task_name,
+        onscreen_render=onscreen_render,
+        cam_list=cam_list,
+        random=True,
+        backend=backend,
+        state_only=not onscreen_render,
+    )
+    env = make_sim_env(
+        task_class=sim_task_cls,
+        xml_file=scene_joint_xml,
+        task_name=task_name,
+        onscreen_render=onscreen_render,
+        cam_list=cam_list,
+        random=True,
+        backend=backend,
+    )
+    return policy_cls, ee_env, env
+
+
+def record_episode(
+    episode_idx: int,
+    policy_cls: type,
+    ee_env: control.Environment,
+    env: control.Environment,
+    episode_len: int,
+    cam_list: list[str],
+    inject_noise: bool,
+    onscreen_render: bool,
+    hdf5_save_dir: str,
+    progress: bool = True,
+    image_compression: str = "none",
+    compression_level: int | None = None,
+    background: BackgroundWriter | None = None,
+    on_saved: Callable[[dict], None] | None = None,
+    discard_failures: bool = False,
+    save_hdf5: bool = True,
+    lerobot_writer: LeRobotDatasetWriter | None = None,
+    stats: DatasetStats | None = None,
+) -> dict:
+    """
+    Record one episode and save it to ``episode_{episode_idx}.hdf5`` and/or a LeRobot dataset.
+
+    The box pose and the policy noise are seeded with ``episode_idx`` only, so an episode is the
+    same whichever process records it and whatever was recorded before it.
+
+    :param episode_idx: Index of the episode, used as its seed and file name.
+    :param policy_cls: Scripted policy class of the task.
+    :param ee_env: The EE environment of the task.
+    :param env: The joint environment of the task.
+    :param episode_len: Number of EE steps to roll out.
+    :param cam_list: List of camera names to record.
+    :param inject_noise: Whether to inject noise into the scripted policy.
+    :param onscreen_render: Whether to render the episode on screen.
+    :param hdf5_save_dir: Directory to save the episode in.
+    :param progress: Whether to show progress bars, defaults to ``True``.
+    :param image_compression: Compression of the image datasets, defaults to ``'none'``.
+    :param compression_level: Level of the image compression, defaults to the codec default.
+    :param background: Background writer to save the episode on while the simulation goes on,
+        defaults to ``None`` to save it synchronously.
+    :param on_saved: Called with the manifest entry of the episode once its file is complete,
+        on the writer thread when writing in the background, defaults to ``None``.
+    :param discard_failures: Whether to only keep successful episodes. The EE pass then stops at
+        the first milestone of the policy it misses, the replay is skipped if the EE pass failed,
+        and the file of a failed replay is removed. Discarded episodes still get a manifest entry,
+        without a file, defaults to ``False``.
+    :param save_hdf5: Whether to save the episode to an HDF5 file, defaults to ``True``.
+    :param lerobot_writer: LeRobot dataset to also add the episode to, defaults to ``None``.
+        Frames are added on the calling thread, their video is encoded while the episode runs.
+    :param stats: Statistics to add the frames of the episode to, before ``on_saved`` is called,
+        defaults to ``None``. Pass fresh ones and merge them into those of the dataset unless the
+        episode is discarded.
+    :return: The manifest entry of the episode. With a background writer, its ``file_size`` is
+        only set once the file is complete.
+    """
+    t_sim_start = time.perf_counter()
+    # Seed the box pose and the policy noise of this episode explicitly
+    random = np.random.RandomState(episode_idx)
+    ee_env.task.configure_episode(random=random)
+
+    ts = ee_env.reset()
+    subtask_info = ts.observation["env_state"].copy()  # box pose at step 0
+    # keep only the joint positions and rewards of the EE pass
+    joint_traj = np.empty((episode_len + 1, len(ts.observation["qpos"])))
+    joint_traj[0] = ts.observation["qpos"]
+    rewards = np.empty(episode_len)
+    policy = policy_cls(inject_noise, random=random)
+    # setup plotting
+    if onscreen_render:
+        plt_imgs = plot_observation_images(ts.observation, cam_list)
+    milestones = dict(policy_cls.milestones) if discard_failures else {}
+    num_steps = episode_len
+    for step in tqdm(range(episode_len), disable=not progress):
+        action = policy(ts)
+        ts = ee_env.step(action)
+        joint_traj[step + 1] = ts.observation["qpos"]
+        rewards[step] = ts.reward
+        if onscreen_render:
+            plt_imgs = set_observation_images(ts.observation, plt_imgs, cam_list)
+        if step in milestones and rewards[: step + 1].max() < milestones[step]:
+            # the rollout can no longer succeed
+            num_steps = step + 1
+            print(f"{episode_idx=} Missed the milestone of step {step}, stopping")
+            break
+    if onscreen_render:
+        plt.close()
+
+    rewards = rewards[:num_steps]
+    episode_return = np.sum(rewards)
+    episode_max_reward = np.max(rewards)
+    ee_success = episode_max_reward == ee_env.task.max_reward
+    if ee_success:
+        print(f"{episode_idx=} Successful, {episode_return=}")
+    else:
+        print(f"{episode_idx=} Failed")
+
+    # clear unused variables
+    del policy
+
+    # because the replaying, there will be eps_len + 1 actions and eps_len + 2 timesteps
+    # truncate here to be consistent: the last joint position is only used as the action
+    # of the step before it, i.e. action[t] = qpos[t+1] (target position to reach)
+    max_timesteps = len(joint_traj) - 2
+    dataset_file = f"episode_{episode_idx}.hdf5" if save_hdf5 else None
+    entry = {
+        "episode_index": episode_idx,
+        "file": dataset_file,
+        "seed": episode_idx,
+        "num_frames": max(max_timesteps, 0),
+        "box_pose": subtask_info.tolist(),
+        "cameras": list(cam_list),
+        "image_compression": image_compression,
+    }
+    if discard_failures and not ee_success:
+        entry.update(
+            file=None,
+            num_frames=0,
+            success=False,
+            max_reward=float(episode_max_reward),
+            episode_return=float(episode_return),
+            file_size=0,
+            discarded="ee_pass",
+        )
+        # keep the manifest in episode order with episodes still queued for writing
+        if on_saved is not None:
+            if background is None:
+                on_saved(entry)
+            else:
+                background.submit(on_saved, entry)
+        sim_time = time.perf_counter() - t_sim_start
+        print(f"{episode_idx=} Discarded, sim: {sim_time:.1f} secs\n")
+        return entry
+
+    print(f"{episode_idx=} Replaying joint commands")
+    # make sure the sim_env has the same object configurations as ee_sim_env
+    env.task.configure_episode(box_pose=subtask_info)
+    ts = env.reset()
+    dataset_path = os.path.join(hdf5_save_dir, dataset_file) if save_hdf5 else None
+
+    def save_entry() -> None:
+        entry["file_size"] = 0 if entry["file"] is None else os.path.getsize(dataset_path)
+        if on_saved is not None:
+            on_saved(entry)
+
+    writers = []
+    if lerobot_writer is not None:
+        lerobot_episode = lerobot_writer.episode_writer()
+        entry["lerobot_episode_index"] = lerobot_episode.episode_index
+        writers.append(lerobot_episode)
+    writer = None
+    if save_hdf5:
+        writer_kwargs = dict(
+            path=dataset_path,
+            num_frames=max(max_timesteps, 0),
+            qpos_dim=joint_traj.shape[1],
+            env_state_dim=len(ts.observation["env_state"]),
+            cam_list=cam_list,
+            compression=image_compression,
+            compression_level=compression_level,
+        )
+        if background is None:
+            writer = EpisodeWriter(**writer_kwargs)
+        else:
+
+            def finish_episode(episode_writer: EpisodeWriter) -> None:
+                print(f"{episode_idx=} Written: {episode_writer.write_time:.1f} secs")
+                save_entry()
+
+            writer = AsyncEpisodeWriter(background, on_close=finish_episode, **writer_kwargs)
+        writers.append(writer)
+    # the manifest entry is reported by the background writer, if it writes the episode
+    report_in_background = isinstance(writer, AsyncEpisodeWriter)
+
+    if stats is not None:
+        qpos_traj = np.empty((max(max_timesteps, 0), joint_traj.shape[1]))
+        qvel_traj = np.empty((max(max_timesteps, 0), len(ts.observation["qvel"])))
+
+    render_time = 0.0
+    with ExitStack() as stack:
+        for episode_writer in writers:
+            stack.enter_context(episode_writer)
+        # setup plotting
+        if onscreen_render:
+            plt_imgs = plot_observation_images(ts.observation, cam_list)
+
+        rewards = np.empty(len(joint_traj))
+        for t in tqdm(
+            range(len(joint_traj)), disable=not progress
+        ):  # note: this will increase episode length by 1
+            # frames are written as soon as they are observed, images are rendered lazily
+            # so render them while the physics is still at this step
+            if t < max_timesteps:
+                t_render = time.perf_counter()
+                images = ts.observation["images"].render_all()
+                render_time += time.perf_counter() - t_render
+                for episode_writer in writers:
+                    episode_writer.append(
+                        ts.observation["qpos"],
+                        ts.observation["qvel"],
+                        ts.observation["env_state"],
+                        joint_traj[t + 1],
+                        images,
+                    )
+                if stats is not None:
+                    qpos_traj[t] = ts.observation["qpos"]
+                    qvel_traj[t] = ts.observation["qvel"]
+                    stats.sample_images(t, images)
+            action = joint_traj[t]
+            ts = env.step(action)
+            rewards[t] = ts.reward
+            if onscreen_render:
+                plt_imgs = set_observation_images(ts.observation, plt_imgs, cam_list)
+        if stats is not None:
+            stats.update("qpos", qpos_traj)
+            stats.update("qvel", qvel_traj)
+            stats.update("action", joint_traj[1 : max_timesteps + 1])
+            stats.num_episodes += 1
+            stats.episode_indices.add(episode_idx)
+        # complete the entry before the writer is closed, a background writer reports it then
+        episode_return = np.sum(rewards)
+        episode_max_reward = np.max(rewards)
+        episode_success = bool(episode_max_reward == env.task.max_reward)
+        entry.update(
+            success=episode_success,
+            max_reward=float(episode_max_reward),
+            episode_return=float(episode_return),
+        )
+        if discard_failures and not episode_success:
+            entry.update(file=None, num_frames=0, discarded="replay")
+            entry.pop("lerobot_episode_index", None)
+            for episode_writer in writers:
+                episode_writer.abort()
+    if not report_in_background:
+        save_entry()
+    if episode_success:
+        print(f"{episode_idx=} Successful, {episode_return=}")
+    else:
+        print(f"{episode_idx=} Failed")
+
+    if onscreen_render:
+        plt.close()
+
+    # with a synchronous writer, the write time is part of the episode wall time
+    if not report_in_background:
+        write_time = sum(episode_writer.write_time for episode_writer in writers)
+        sim_time = time.perf_counter() - t_sim_start - render_time - write_time
+        print(
+            f"{episode_idx=} Sim: {sim_time:.1f} secs, render: {render_time:.1f} secs, "
+            f"write: {write_time:.1f} secs\n"
+        )
+    else:
+        # frames of a LeRobot dataset are still added on this thread
+        write_time = sum(w.write_time for w in writers if w is not writer)
+        sim_time = time.perf_counter() - t_sim_start - render_time - write_time
+        timings = f"{episode_idx=} Sim: {sim_time:.1f} secs, render: {render_time:.1f} secs"
+        if lerobot_writer is not None:
+            timings += f", LeRobot write: {write_time:.1f} secs"
+        print(timings + "\n")
+    return entry
+
+
+# Environments of a pool worker, created once by _init_worker and reused for all its episodes
+_WORKER_STATE: dict = {}
+
+
+def _init_worker(settings: dict) -> None:
+    """Create the environments of a pool worker."""
+    policy_cls, ee_env, env = make_recording_envs(
+        settings["task_name"],
+        settings["cam_list"],
+        onscreen_render=False,
+        backend=settings["backend"],
+    )
+    background = BackgroundWriter(settings["write_queue_size"]) if settings["async_write"] else None
+    _WORKER_STATE.update(
+        settings, policy_cls=policy_cls, ee_env=ee_env, env=env, background=background
+    )
+
+
+def _record_in_worker(episode_idx: int) -> tuple[dict, DatasetStats]:
+    """Record one episode with the environments of the current pool worker."""
+    state = _WORKER_STATE
+    episode_stats = DatasetStats(state["stats_image_stride"])
+    result = record_episode(
+        episode_idx,
+        state["policy_cls"],
+        state["ee_env"],
+        state["env"],
+        episode_len=state["episode_len"],
+        cam_list=state["cam_list"],
+        inject_noise=state["inject_noise"],
+        onscreen_render=False,
+        hdf5_save_dir=state["hdf5_save_dir"],
+        progress=False,
+        image_compression=state["image_compression"],
+        compression_level=state["compression_level"],
+        background=state["background"],
+        discard_failures=state["discard_failures"],
+        stats=episode_stats,
+    )
+    # the episode is only reported once its file is complete, the parent adds it to the manifest
+    # and merges its statistics
+    if state["background"] is not None:
+        state["background"].flush()
+    return result, episode_stats
+
+
 def main(args):
     """
     Generate demonstration data in simulation.
@@ -90,182 +469,154 @@ def main(args):
     if not os.path.exists(hdf5_save_dir):
         os.makedirs(hdf5_save_dir)
 
-    if args.task_name == "sim_pick_place":
-        policy_cls = PickAndPlacePolicy
-        ee_task_cls = OneArmPickPlaceEETask
-        sim_task_cls = OneArmPickPlaceTask
-        scene_xml = "trossen_one_arm_scene.xml"
-        scene_joint_xml = "trossen_one_arm_scene_joint.xml"
-    else:
-        policy_cls = PickAndTransferPolicy
-        ee_task_cls = TransferCubeEETask
-        sim_task_cls = TransferCubeTask
-        scene_xml = "trossen_ai_scene.xml"
-        scene_joint_xml = "trossen_ai_scene_joint.xml"
+    if args.workers > 1 and onscreen_render:
+        raise ValueError("On-screen rendering is only supported with --workers 1.")
+    save_hdf5 = args.output_format in ("hdf5", "both")
+    save_lerobot = args.output_format in ("lerobot", "both")
+    if args.workers > 1 and save_lerobot:
+        raise ValueError("LeRobot output is only supported with --workers 1.")
 
-    success = []
-    start_idx = args.start_episode_idx
-    success = []
-    for i in range(num_episodes):
-        episode_idx = start_idx + i
-        print(f"Episode {episode_idx} (Sequence {i+1}/{num_episodes})")
-        # Sync seed for generation environment
-        np.random.seed(episode_idx)
-        
-        # setup the environment
-        env = make_sim_env(
-            task_class=ee_task_cls,
-            xml_file=scene_xml,
-            task_name=args.task_name,
-            onscreen_render=onscreen_render,
-            cam_list=cam_list,
-            random=True,
+    # with --num_successes, new seeds are drawn until enough episodes succeeded, at most
+    # --max_attempts of them
+    if args.num_successes is not None:
+        num_episodes = (
+            args.max_attempts if args.max_attempts is not None else 10 * args.num_successes
         )
-        ts = env.reset()
-        episode = [ts]
-        policy = policy_cls(inject_noise)
-        # setup plotting
-        if onscreen_render:
-            plt_imgs = plot_observation_images(ts.observation, cam_list)
-        for step in tqdm(range(episode_len)):
-            action = policy(ts)
-            ts = env.step(action)
-            episode.append(ts)
-            if onscreen_render:
-                plt_imgs = set_observation_images(ts.observation, plt_imgs, cam_list)
-        plt.close()
 
-        episode_return = np.sum([ts.reward for ts in episode[1:]])
-        episode_max_reward = np.max([ts.reward for ts in episode[1:]])
-        if episode_max_reward == env.task.max_reward:
-            print(f"{episode_idx=} Successful, {episode_return=}")
-        else:
-            print(f"{episode_idx=} Failed")
-
-        joint_traj = [ts.observation["qpos"] for ts in episode]
-
-        subtask_info = episode[0].observation["env_state"].copy()  # box pose at step 0
-
-        # clear unused variables
-        del env
-        del episode
-        del policy
-
-        # Re-seed to ensure same box position if using random sampling
-        np.random.seed(episode_idx)
-        
-        # setup the environment
-        print("Replaying joint commands")
-        env = make_sim_env(
-            task_class=sim_task_cls,
-            xml_file=scene_joint_xml,
-            task_name=args.task_name, # pass task name for logic inside make_sim_env if needed?
-            # make_sim_env(task_class, xml, task_name...)
-            # We updated make_sim_env logic to handle "sim_pick_place".
-            # But the args signature is: (task_class, xml_file, task_name, ...).
-            # Wait, `make_sim_env` definition:
-            # def make_sim_env(task_class, xml_file, task_name, onscreen_render, cam_list):
-            onscreen_render=onscreen_render, # Replay also supports rendering? Yes.
-            cam_list=cam_list,
-            random=True, # Added random=True
+    # episodes already recorded by an earlier run of the job are skipped
+    episode_indices = range(args.start_episode_idx, args.start_episode_idx + num_episodes)
+    manifest = read_manifest(hdf5_save_dir)
+    completed = [
+        manifest[idx]
+        for idx in episode_indices
+        if idx in manifest and is_complete(hdf5_save_dir, manifest[idx])
+    ]
+    if completed:
+        print(
+            f"Skipping {len(completed)} episodes already recorded in "
+            f"{manifest_path(hdf5_save_dir)}"
         )
-        BOX_POSE[0] = (
-            subtask_info  # make sure the sim_env has the same object configurations as ee_sim_env
-        )
-        ts = env.reset()
-        episode_replay = [ts]
-        # setup plotting
-        if onscreen_render:
-            plt_imgs = plot_observation_images(ts.observation, cam_list)
+    completed_indices = {entry["episode_index"] for entry in completed}
+    episode_indices = [idx for idx in episode_indices if idx not in completed_indices]
 
-        for t in tqdm(
-            range(len(joint_traj))
-        ):  # note: this will increase episode length by 1
-            action = joint_traj[t]
-            ts = env.step(action)
-            episode_replay.append(ts)
-            if onscreen_render:
-                plt_imgs = set_observation_images(ts.observation, plt_imgs, cam_list)
-        episode_return = np.sum([ts.reward for ts in episode_replay[1:]])
-        episode_max_reward = np.max([ts.reward for ts in episode_replay[1:]])
-        if episode_max_reward == env.task.max_reward:
-            success.append(1)
-            print(f"{episode_idx=} Successful, {episode_return=}")
-        else:
-            success.append(0)
-            print(f"{episode_idx=} Failed")
+    results = []
+    # normalization statistics of the saved episodes, updated and saved with the manifest
+    dataset_stats = DatasetStats.load(hdf5_save_dir, args.stats_image_stride)
 
-        if onscreen_render:
-            plt.close()
+    def save_episode(entry: dict, episode_stats: DatasetStats) -> None:
+        # the manifest entry comes last, so it only lists episodes counted in the statistics,
+        # an episode recorded again after a crash in between is not counted twice
+        if "discarded" not in entry:
+            dataset_stats.merge(episode_stats)
+            dataset_stats.save(hdf5_save_dir)
+        append_manifest(hdf5_save_dir, entry)
 
-        data_dict = {
-            "/observations/qpos": [],
-            "/observations/qvel": [],
-            "/observations/env_state": [],
-            "/action": [],
-        }
-        for cam_name in cam_list:
-            data_dict[f"/observations/images/{cam_name}"] = []
-
-        # because the replaying, there will be eps_len + 1 actions and eps_len + 2 timesteps
-        # truncate here to be consistent
-        joint_traj = joint_traj[:-1]
-        episode_replay = episode_replay[:-1]
-
-        # len(joint_traj) i.e. actions: max_timesteps
-        # len(episode_replay) i.e. time steps: max_timesteps + 1
-        max_timesteps = len(joint_traj)
-        
-        # Determine qpos dimension
-        if max_timesteps > 0:
-            qpos_dim = joint_traj[0].shape[0]
-            # env_state dimension
-            env_state_dim = episode_replay[0].observation["env_state"].shape[0]
-        else:
-            qpos_dim = 16 # fallback
-            env_state_dim = 7 # fallback
-
-        while len(joint_traj) > 1:  # Need at least 2 elements to get action[t] = qpos[t+1]
-            current_qpos = joint_traj.pop(0)
-            action = joint_traj[0]  # Action = next qpos (target position to reach)
-            ts = episode_replay.pop(0)
-            data_dict["/observations/qpos"].append(ts.observation["qpos"])
-            data_dict["/observations/qvel"].append(ts.observation["qvel"])
-            data_dict["/observations/env_state"].append(ts.observation["env_state"])
-            data_dict["/action"].append(action)
-            for cam_name in cam_list:
-                data_dict[f"/observations/images/{cam_name}"].append(
-                    ts.observation["images"][cam_name]
-                )
+    def enough_successes() -> bool:
+        if args.num_successes is None:
+            return False
+        num_successes = sum(entry["success"] for entry in completed + results)
+        return num_successes >= args.num_successes
 
-        # HDF5
-        t0 = time.time()
-        # Calculate max_timesteps from actual data collected
-        max_timesteps = len(data_dict["/action"])
-        dataset_path = os.path.join(hdf5_save_dir, f"episode_{episode_idx}")
-        with h5py.File(dataset_path + ".hdf5", "w", rdcc_nbytes=1024**2 * 2) as root:
-            root.attrs["sim"] = True
-            obs = root.create_group("observations")
-            image = obs.create_group("images")
-            for cam_name in cam_list:
-                _ = image.create_dataset(
-                    cam_name,
-                    (max_timesteps, 480, 640, 3),
-                    dtype="uint8",
-                    chunks=(1, 480, 640, 3),
+    t_start = time.time()
+    if args.workers > 1:
+        settings = {
+            "task_name": args.task_name,
+            "backend": args.backend,
+            "episode_len": episode_len,
+            "cam_list": cam_list,
+            "inject_noise": inject_noise,
+            "hdf5_save_dir": hdf5_save_dir,
+            "image_compression": args.image_compression,
+            "compression_level": args.compression_level,
+            "async_write": args.async_write,
+            "write_queue_size": args.write_queue_size,
+            "discard_failures": args.discard_failures,
+            "stats_image_stride": args.stats_image_stride,
+        }
+        # spawn rather than fork, so no worker inherits rendering contexts of the parent
+        context = multiprocessing.get_context("spawn")
+        pending_indices = iter(episode_indices)
+        in_flight = set()
+        with ProcessPoolExecutor(
+            args.workers, mp_context=context, initializer=_init_worker, initargs=(settings,)
+        ) as executor, tqdm(total=len(episode_indices), desc="Episodes") as episodes_bar:
+            while True:
+                # keep every worker busy until enough episodes succeeded
+                while len(in_flight) < args.workers and not enough_successes():
+                    episode_idx = next(pending_indices, None)
+                    if episode_idx is None:
+                        break
+                    in_flight.add(executor.submit(_record_in_worker, episode_idx))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry, episode_stats = future.result()
+                    save_episode(entry, episode_stats)
+                    results.append(entry)
+                    episodes_bar.update()
+    elif episode_indices:
+        policy_cls, ee_env, env = make_recording_envs(
+            args.task_name, cam_list, onscreen_render, args.backend
+        )
+        # with --async_write, episode N is written while episode N+1 is simulated
+        background = BackgroundWriter(args.write_queue_size) if args.async_write else None
+        lerobot_writer = None
+        if save_lerobot:
+            lerobot_writer = LeRobotDatasetWriter(
+                root=args.lerobot_dir or os.path.join(data_dir, "lerobot"),
+                repo_id=args.repo_id or f"local/{args.task_name}",
+                qpos_dim=len(env.task.get_position(env.physics)),
+                cam_list=cam_list,
+                vcodec=args.vcodec,
+                encoder_queue_size=args.encoder_queue_size,
+            )
+        try:
+            for i, episode_idx in enumerate(episode_indices):
+                if enough_successes():
+                    break
+                print(f"Episode {episode_idx} (Sequence {i+1}/{len(episode_indices)})")
+                episode_stats = DatasetStats(args.stats_image_stride)
+                results.append(
+                    record_episode(
+                        episode_idx,
+                        policy_cls,
+                        ee_env,
+                        env,
+                        episode_len=episode_len,
+                        cam_list=cam_list,
+                        inject_noise=inject_noise,
+                        onscreen_render=onscreen_render,
+                        hdf5_save_dir=hdf5_save_dir,
+                        image_compression=args.image_compression,
+                        compression_level=args.compression_level,
+                        background=background,
+                        on_saved=partial(save_episode, episode_stats=episode_stats),
+                        discard_failures=args.discard_failures,
+                        save_hdf5=save_hdf5,
+                        lerobot_writer=lerobot_writer,
+                        stats=episode_stats,
+                    )
                 )
-            _ = obs.create_dataset("qpos", (max_timesteps, qpos_dim))
-            _ = obs.create_dataset("qvel", (max_timesteps, qpos_dim))
-            _ = obs.create_dataset("env_state", (max_timesteps, env_state_dim))
-            action = root.create_dataset("action", (max_timesteps, qpos_dim))
-
-            for name, array in data_dict.items():
-                root[name][...] = array
-
-        print(f"Saving: {time.time() - t0:.1f} secs\n")
+        finally:
+            if background is not None:
+                background.close()
+            if lerobot_writer is not None:
+                lerobot_writer.close()
 
+    success = [entry["success"] for entry in completed + results]
+    elapsed = time.time() - t_start
     print(f"Saved to {hdf5_save_dir}")
+    if save_lerobot:
+        print(f"LeRobot dataset: {args.lerobot_dir or os.path.join(data_dir, 'lerobot')}")
     print(f"Success: {np.sum(success)} / {len(success)}")
+    print(f"Statistics of {dataset_stats.num_episodes} episodes in {stats_path(hdf5_save_dir)}")
+    if args.num_successes is not None and not enough_successes():
+        print(f"Stopped after {num_episodes} attempts, short of {args.num_successes} successes")
+    print(
+        f"Recorded {len(results)} episodes in {elapsed:.1f} secs "
+        f"({len(results) / elapsed * 60:.2f} episodes/min)"
+    )
 
 
 if __name__ == "__main__":
@@ -318,7 +669,100 @@ if __name__ == "__main__":
         "--start_episode_idx",
         type=int,
         default=0,
-        help="Starting index for episode numbering (useful for appending).",
+        help=(
+            "Starting index for episode numbering (useful for appending). Episodes already "
+            "recorded in the dataset manifest are skipped."
+        ),
+    )
+
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="dm_control",
+        choices=["dm_control", "native"],
+        help="Simulation backend.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes recording episodes in parallel.",
+    )
+    parser.add_argument(
+        "--image_compression",
+        type=str,
+        default="none",
+        choices=IMAGE_COMPRESSIONS,
+        help="Compression of the recorded images (blosc and lz4 need hdf5plugin, from the compression extra).",
+    )
+    parser.add_argument(
+        "--compression_level",
+        type=int,
+        help="Compression level of gzip and blosc, JPEG quality or PNG compression level.",
+    )
+    parser.add_argument(
+        "--discard_failures",
+        action="store_true",
+        help=(
+            "Only keep successful episodes: stop EE rollouts at missed milestones, skip the "
+            "replay of failed EE rollouts and remove the files of failed replays."
+        ),
+    )
+    parser.add_argument(
+        "--num_successes",
+        type=int,
+        help="Draw new seeds until this many episodes succeeded, instead of --num_episodes.",
+    )
+    parser.add_argument(
+        "--max_attempts",
+        type=int,
+        help="Most seeds drawn with --num_successes, defaults to 10 times --num_successes.",
+    )
+    parser.add_argument(
+        "--async_write",
+        action="store_true",
+        help="Write episodes on a background thread while the next one is simulated.",
+    )
+    parser.add_argument(
+        "--write_queue_size",
+        type=int,
+        default=32,
+        help="Frames queued for the background writer before the simulation waits.",
+    )
+    parser.add_argument(
+        "--stats_image_stride",
+        type=int,
+        default=10,
+        help="Frame interval of the images sampled for the dataset statistics, 0 to skip images.",
+    )
+    parser.add_argument(
+        "--output_format",
+        type=str,
+        default="hdf5",
+        choices=["hdf5", "lerobot", "both"],
+        help="Save episodes as HDF5 files, straight into a LeRobot dataset, or both.",
+    )
+    parser.add_argument(
+        "--lerobot_dir",
+        type=str,
+        help="Directory of the LeRobot dataset, defaults to <data_dir>/lerobot.",
+    )
+    parser.add_argument(
+        "--repo_id",
+        type=str,
+        help="Repository id of the LeRobot dataset, defaults to local/<task_name>.",
+    )
+    parser.add_argument(
+        "--vcodec",
+        type=str,
+        default="libsvtav1",
+        help="Video codec of the LeRobot dataset.",
+    )
+    parser.add_argument(
+        "--encoder_queue_size",
+        type=int,
+        default=60,
+        help="Frames buffered per camera for the LeRobot video encoder.",
     )
 
     args = parser.parse_args()
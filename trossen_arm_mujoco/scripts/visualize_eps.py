@@ -28,7 +28,6 @@
 
 import argparse
 import os
-import re
 
 import cv2
 import h5py
@@ -40,6 +39,8 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from trossen_arm_mujoco.constants import ROOT_DIR
+from trossen_arm_mujoco.image_storage import read_images
+from trossen_arm_mujoco.manifest import list_episode_files
 
 
 def load_hdf5(dataset_path: str) -> dict | None:
@@ -56,7 +57,7 @@ def load_hdf5(dataset_path: str) -> dict | None:
     with h5py.File(dataset_path, "r") as root:
         image_dict = {}
         for cam_name in root["/observations/images/"].keys():
-            image_dict[cam_name] = root[f"/observations/images/{cam_name}"][()]
+            image_dict[cam_name] = read_images(root[f"/observations/images/{cam_name}"])
 
     return image_dict
 
@@ -119,25 +120,18 @@ def process_directory(args: argparse.Namespace):
 
     os.makedirs(output_dir, exist_ok=True)
 
-    # Match episode files (episode_{number}.hdf5)
-    episode_pattern = re.compile(r"episode_(\d+)\.hdf5")
-
-    # Iterate over all files in the directory
-    for filename in os.listdir(hdf5_dir):
-        match = episode_pattern.match(filename)
-        if match:
-            episode_number = match.group(1)
-            input_path = os.path.join(hdf5_dir, filename)
-            print(f"Processing {input_path}")
-            output_path = os.path.join(output_dir, f"episode_{episode_number}.mp4")
-
-            print(f"Processing {input_path} → {output_path}")
-
-            # Load camera data
-            images = load_hdf5(input_path)
-            if images:
-                # Save to MP4 video
-                save_videos(images, dt=1 / fps, video_path=output_path)
+    # Iterate over the episodes listed by the dataset manifest
+    for input_path in list_episode_files(hdf5_dir):
+        filename = os.path.basename(input_path)
+        output_path = os.path.join(output_dir, filename.replace(".hdf5", ".mp4"))
+
+        print(f"Processing {input_path} → {output_path}")
+
+        # Load camera data
+        images = load_hdf5(input_path)
+        if images:
+            # Save to MP4 video
+            save_videos(images, dt=1 / fps, video_path=output_path)
 
 
 if __name__ == "__main__":
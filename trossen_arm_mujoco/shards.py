@@ -0,0 +1,321 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from collections.abc import Iterator
+import io
+import json
+import os
+import tarfile
+
+import h5py
+import numpy as np
+
+from trossen_arm_mujoco.episode_store import LOWDIM_FIELDS
+from trossen_arm_mujoco.image_storage import decode_image, encode_image, read_images
+
+try:
+    # Streams are PyTorch iterable datasets when PyTorch is installed
+    from torch.utils.data import IterableDataset
+except ImportError:
+    IterableDataset = object
+
+# Name of the index of a sharded dataset
+SHARD_INDEX_FILENAME = "index.json"
+
+SHARD_IMAGE_ENCODINGS = ("none", "jpeg", "png")
+
+
+def _frame_bytes(arrays: dict[str, np.ndarray]) -> bytes:
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+class _ShardWriter:
+    """Write frames to numbered tar shards, starting a new shard past a size."""
+
+    def __init__(self, output_dir: str, shard_size: int):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.shards: list[dict] = []
+        self._tar = None
+
+    def _open_shard(self) -> None:
+        name = f"shard-{len(self.shards):05d}"
+        self._tar = tarfile.open(os.path.join(self.output_dir, f"{name}.tar"), "w")
+        self.shards.append({"file": f"{name}.tar", "num_frames": 0, "episodes": [], "members": []})
+
+    def _close_shard(self) -> None:
+        shard = self.shards[-1]
+        self._tar.close()
+        self._tar = None
+        shard["size"] = os.path.getsize(os.path.join(self.output_dir, shard["file"]))
+        # per-shard index of the members, for random access into a shard
+        index_file = shard["file"].replace(".tar", ".json")
+        with open(os.path.join(self.output_dir, index_file), "w") as f:
+            json.dump(shard.pop("members"), f)
+        shard["index"] = index_file
+
+    def add(self, episode_index: int, frame_index: int, data: bytes) -> None:
+        if self._tar is not None and self._tar.fileobj.tell() >= self.shard_size:
+            self._close_shard()
+        if self._tar is None:
+            self._open_shard()
+        info = tarfile.TarInfo(f"e{episode_index:06d}_f{frame_index:06d}.npz")
+        info.size = len(data)
+        # the data follows the member header, offset_data is only set on tars being read
+        header = info.tobuf(self._tar.format, self._tar.encoding, self._tar.errors)
+        offset = self._tar.offset + len(header)
+        self._tar.addfile(info, io.BytesIO(data))
+        shard = self.shards[-1]
+        shard["num_frames"] += 1
+        if not shard["episodes"] or shard["episodes"][-1] != episode_index:
+            shard["episodes"].append(episode_index)
+        shard["members"].append(
+            {
+                "name": info.name,
+                "offset": offset,
+                "size": info.size,
+                "episode_index": episode_index,
+                "frame_index": frame_index,
+            }
+        )
+
+    def close(self) -> None:
+        if self._tar is not None:
+            self._close_shard()
+
+
+def export_shards(
+    paths: list[str],
+    output_dir: str,
+    shard_size_mb: float = 256,
+    image_encoding: str = "none",
+    quality: int | None = None,
+    chunk_size: int = 64,
+) -> dict:
+    """
+    Pack recorded HDF5 episodes into tar shards of about ``shard_size_mb`` each.
+
+    Every frame is one ``e<episode>_f<frame>.npz`` member holding ``qpos``, ``qvel``,
+    ``env_state``, ``action``, ``episode_index``, ``frame_index`` and ``images.<camera>``. Frames
+    are written in episode order, so a shard is read with one sequential pass. Each shard gets a
+    JSON index of its members with their offsets, and ``index.json`` lists the shards with their
+    frame counts and episodes.
+
+    :param paths: Paths of the HDF5 episodes, in export order.
+    :param output_dir: Directory of the shards.
+    :param shard_size_mb: Size after which a new shard is started, defaults to ``256``.
+    :param image_encoding: ``'none'`` for raw uint8 images, or ``'jpeg'`` or ``'png'`` to store
+        encoded bytes, defaults to ``'none'``.
+    :param quality: JPEG quality or PNG compression level, defaults to the codec default.
+    :param chunk_size: Number of frames read from HDF5 at a time, defaults to ``64``.
+    :return: The dataset index.
+    """
+    if image_encoding not in SHARD_IMAGE_ENCODINGS:
+        raise ValueError(
+            f"Unknown image encoding: {image_encoding}. "
+            f"Use one of {', '.join(SHARD_IMAGE_ENCODINGS)}."
+        )
+    os.makedirs(output_dir, exist_ok=True)
+    writer = _ShardWriter(output_dir, int(shard_size_mb * 1024 * 1024))
+    for path in paths:
+        name = os.path.basename(path)
+        episode_index = int(name.removeprefix("episode_").removesuffix(".hdf5"))
+        with h5py.File(path, "r") as f:
+            lowdim = {name: f[key][()] for name, key in LOWDIM_FIELDS.items()}
+            cameras = f["/observations/images"]
+            length = len(lowdim["action"])
+            for start in range(0, length, chunk_size):
+                stop = min(start + chunk_size, length)
+                images = {
+                    cam_name: read_images(dataset, slice(start, stop))
+                    for cam_name, dataset in cameras.items()
+                }
+                for frame_index in range(start, stop):
+                    arrays = {name: values[frame_index] for name, values in lowdim.items()}
+                    arrays["episode_index"] = np.int64(episode_index)
+                    arrays["frame_index"] = np.int64(frame_index)
+                    for cam_name, frames in images.items():
+                        image = frames[frame_index - start]
+                        if image_encoding != "none":
+                            image = encode_image(image, image_encoding, quality)
+                        arrays[f"images.{cam_name}"] = image
+                    writer.add(episode_index, frame_index, _frame_bytes(arrays))
+    writer.close()
+
+    index = {
+        "num_frames": sum(shard["num_frames"] for shard in writer.shards),
+        "image_encoding": image_encoding,
+        "shards": writer.shards,
+    }
+    with open(os.path.join(output_dir, SHARD_INDEX_FILENAME), "w") as f:
+        json.dump(index, f, indent=1)
+    return index
+
+
+def _decode_frame(data: bytes, image_encoding: str) -> dict[str, np.ndarray]:
+    with np.load(io.BytesIO(data)) as npz:
+        frame = {name: npz[name] for name in npz.files}
+    if image_encoding != "none":
+        for name, value in frame.items():
+            if name.startswith("images."):
+                frame[name] = decode_image(value)
+    return frame
+
+
+class ShardStream(IterableDataset):
+    """
+    Stream the frames of a sharded dataset, split across ranks and dataloader workers.
+
+    Each epoch, the shards are permuted with a seed derived from ``seed`` and the epoch and
+    their frames are split into equal contiguous runs, one per rank, then within a rank one per
+    dataloader worker, so every process reads a disjoint part of the shards sequentially. As
+    with a ``DistributedSampler``, every rank gets the same number of frames, which keeps the
+    collective ops of DDP in step: the frames of the first shards are repeated to pad the last
+    ranks, or with ``drop_last`` the frames left over are dropped. Frames pass through a shuffle
+    buffer of ``shuffle_buffer`` frames, seeded per epoch, rank and worker. Call
+    :meth:`set_epoch` before each epoch to reshuffle deterministically.
+
+    :param root: Directory of the shards, written by :func:`export_shards`.
+    :param rank: Rank of this process, defaults to the ``RANK`` environment variable or ``0``.
+    :param world_size: Number of ranks, defaults to the ``WORLD_SIZE`` environment variable or
+        ``1``.
+    :param shuffle_buffer: Number of frames buffered for shuffling, ``0`` to keep the shard
+        order of frames, defaults to ``1000``.
+    :param seed: Base seed of the shuffles, defaults to ``0``.
+    :param drop_last: Whether to drop the frames left over by an even split across ranks
+        instead of padding, defaults to ``False``.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        rank: int | None = None,
+        world_size: int | None = None,
+        shuffle_buffer: int = 1000,
+        seed: int = 0,
+        drop_last: bool = False,
+    ):
+        self.root = root
+        with open(os.path.join(root, SHARD_INDEX_FILENAME)) as f:
+            self.index = json.load(f)
+        self.rank = int(os.environ.get("RANK", 0)) if rank is None else rank
+        self.world_size = int(os.environ.get("WORLD_SIZE", 1)) if world_size is None else world_size
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.drop_last = drop_last
+        self.epoch = 0
+
+    def __len__(self) -> int:
+        """Number of frames of this rank per epoch, the same on every rank."""
+        num_frames = self.index["num_frames"]
+        if self.drop_last:
+            return num_frames // self.world_size
+        return -(-num_frames // self.world_size)
+
+    def set_epoch(self, epoch: int) -> None:
+        """Set the epoch that seeds the next iteration."""
+        self.epoch = epoch
+
+    def shards_for(
+        self, worker_id: int = 0, num_workers: int = 1
+    ) -> list[tuple[dict, int, int]]:
+        """
+        Return the shard frames read by a dataloader worker of this rank in the current epoch.
+
+        Worker ``i`` of every rank reads the same number of frames.
+
+        :param worker_id: Index of the dataloader worker, defaults to ``0``.
+        :param num_workers: Number of dataloader workers, defaults to ``1``.
+        :return: ``(shard, start, stop)`` runs of frames, the shard entries of the index and the
+            range of their members, in reading order.
+        """
+        shards = self.index["shards"]
+        order = np.random.default_rng([self.seed, self.epoch]).permutation(len(shards))
+        num_frames = self.index["num_frames"]
+        rank_frames = len(self)
+        length = rank_frames // num_workers + (worker_id < rank_frames % num_workers)
+        if num_frames == 0 or length == 0:
+            return []
+        # position of the worker in the frames of the permuted shards, wrapping around to pad
+        start = self.rank * rank_frames
+        start += worker_id * (rank_frames // num_workers) + min(worker_id, rank_frames % num_workers)
+        position = start % num_frames
+        runs = []
+        i = 0
+        while position >= shards[order[i]]["num_frames"]:
+            position -= shards[order[i]]["num_frames"]
+            i += 1
+        while length > 0:
+            shard = shards[order[i]]
+            stop = min(shard["num_frames"], position + length)
+            if stop > position:
+                runs.append((shard, position, stop))
+                length -= stop - position
+            position = 0
+            i = (i + 1) % len(order)
+        return runs
+
+    def _worker(self) -> tuple[int, int]:
+        try:
+            from torch.utils.data import get_worker_info
+        except ImportError:
+            return 0, 1
+        info = get_worker_info()
+        return (0, 1) if info is None else (info.id, info.num_workers)
+
+    def _frames(self, runs: list[tuple[dict, int, int]]) -> Iterator[dict[str, np.ndarray]]:
+        image_encoding = self.index["image_encoding"]
+        for shard, start, stop in runs:
+            with open(os.path.join(self.root, shard["index"])) as f:
+                members = json.load(f)
+            # members are read front to back at their offsets in the shard index
+            with open(os.path.join(self.root, shard["file"]), "rb") as f:
+                for member in members[start:stop]:
+                    f.seek(member["offset"])
+                    yield _decode_frame(f.read(member["size"]), image_encoding)
+
+    def __iter__(self) -> Iterator[dict[str, np.ndarray]]:
+        worker_id, num_workers = self._worker()
+        frames = self._frames(self.shards_for(worker_id, num_workers))
+        if self.shuffle_buffer <= 0:
+            yield from frames
+            return
+        rng = np.random.default_rng([self.seed, self.epoch, self.rank, worker_id])
+        buffer = []
+        for frame in frames:
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(frame)
+                continue
+            # emit a random buffered frame and keep the new one in its place
+            i = rng.integers(len(buffer))
+            buffer[i], frame = frame, buffer[i]
+            yield frame
+        rng.shuffle(buffer)
+        yield from buffer
@@ -34,21 +34,23 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from trossen_arm_mujoco.constants import BOX_POSE, START_ARM_POSE
+from trossen_arm_mujoco.contacts import get_contact_query
 from trossen_arm_mujoco.utils import (
+    EpisodeConfigMixin,
     get_observation_base,
     make_sim_env,
     plot_observation_images,
-    sample_box_pose,
 )
 
 
-class TrossenAIStationaryTask(base.Task):
+class TrossenAIStationaryTask(EpisodeConfigMixin, base.Task):
     """
     A base task for bimanual manipulation with Trossen AI robotic arms in the Trossen AI Stationary Kit form factor.
 
     :param random: Random seed for environment variability, defaults to ``None``.
     :param onscreen_render: Whether to enable real-time rendering, defaults to ``False``.
     :param cam_list: List of cameras to capture observations, defaults to ``[]``.
+    :param state_only: Whether to omit camera images from observations, defaults to ``False``.
     """
 
     def __init__(
@@ -56,11 +58,13 @@ class TrossenAIStationaryTask(base.Task):
         random: int | None = None,
         onscreen_render: bool = False,
         cam_list: list[str] = [],
+        state_only: bool = False,
     ):
         super().__init__(random=random)
         self.cam_list = cam_list
         if self.cam_list == []:
             self.cam_list = ["cam_high", "cam_low", "cam_left_wrist", "cam_right_wrist"]
+        self.state_only = state_only
 
     def before_step(self, action: np.ndarray, physics: Physics) -> None:
         """
@@ -139,7 +143,9 @@ class TrossenAIStationaryTask(base.Task):
         :param physics: The MuJoCo physics simulation instance.
         :return: An ordered dictionary containing joint positions, velocities, and environment state.
         """
-        obs = get_observation_base(physics, self.cam_list)
+        obs = get_observation_base(
+            physics, self.cam_list, on_screen_render=not self.state_only
+        )
         obs["qpos"] = self.get_position(physics)
         obs["qvel"] = self.get_velocity(physics)
         obs["env_state"] = self.get_env_state(physics)
@@ -163,6 +169,7 @@ class TransferCubeTask(TrossenAIStationaryTask):
     :param random: Random seed for environment variability, defaults to ``None``.
     :param onscreen_render: Whether to enable real-time rendering, defaults to ``False``.
     :param cam_list: List of cameras to capture observations, defaults to ``[]``.
+    :param state_only: Whether to omit camera images from observations, defaults to ``False``.
     """
 
     def __init__(
@@ -170,11 +177,13 @@ class TransferCubeTask(TrossenAIStationaryTask):
         random: int | None = None,
         onscreen_render: bool = False,
         cam_list: list[str] = [],
+        state_only: bool = False,
     ):
         super().__init__(
             random=random,
             onscreen_render=onscreen_render,
             cam_list=cam_list,
+            state_only=state_only,
         )
         self.max_reward = 4
 
@@ -184,12 +193,13 @@ class TransferCubeTask(TrossenAIStationaryTask):
 
         :param physics: The MuJoCo physics simulation instance.
         """
-        # TODO Notice: this function does not randomize the env configuration. Instead, set
-        # BOX_POSE from outside reset qpos, control and box position
+        # Notice: this function does not randomize the env configuration. Instead, set the box
+        # pose from outside with configure_episode (or the legacy BOX_POSE global)
+        box_pose = self._episode_box_pose if self._episode_box_pose is not None else BOX_POSE[0]
         with physics.reset_context():
-            physics.named.data.qpos[:16] = START_ARM_POSE
-            assert BOX_POSE[0] is not None
-            physics.named.data.qpos[-7:] = BOX_POSE[0]
+            physics.data.qpos[:16] = START_ARM_POSE
+            assert box_pose is not None
+            physics.data.qpos[-7:] = box_pose
 
         super().initialize_episode(physics)
 
@@ -211,24 +221,16 @@ class TransferCubeTask(TrossenAIStationaryTask):
         :param physics: The MuJoCo physics simulation instance.
         :return: The computed reward which is whether left gripper is holding the box
         """
-        all_contact_pairs = []
-        for i_contact in range(physics.data.ncon):
-            id_geom_1 = physics.data.contact[i_contact].geom1
-            id_geom_2 = physics.data.contact[i_contact].geom2
-            name_geom_1 = physics.model.id2name(id_geom_1, "geom")
-            name_geom_2 = physics.model.id2name(id_geom_2, "geom")
-            contact_pair = (name_geom_1, name_geom_2)
-            all_contact_pairs.append(contact_pair)
-
-        touch_left_gripper = (
-            "red_box",
-            "left/gripper_follower_left",
-        ) in all_contact_pairs
-        touch_right_gripper = (
-            "red_box",
-            "right/gripper_follower_left",
-        ) in all_contact_pairs
-        touch_table = ("red_box", "table") in all_contact_pairs
+        # contacts are matched in the (geom1, geom2) order reported by MuJoCo
+        contact_query = get_contact_query(physics)
+        contacts = contact_query.contacts(physics.data)
+        touch_left_gripper = contact_query.touching(
+            contacts, "red_box", "left/gripper_follower_left", ordered=True
+        )
+        touch_right_gripper = contact_query.touching(
+            contacts, "red_box", "right/gripper_follower_left", ordered=True
+        )
+        touch_table = contact_query.touching(contacts, "red_box", "table", ordered=True)
 
         reward = 0
         if touch_right_gripper:
@@ -256,6 +258,7 @@ class OneArmPickPlaceTask(TrossenAIStationaryTask):
         random: int | None = None,
         onscreen_render: bool = False,
         cam_list: list[str] = [],
+        state_only: bool = False,
     ):
         if not cam_list:
             cam_list = ["cam_high", "cam_low", "cam_right_wrist"]
@@ -263,6 +266,7 @@ class OneArmPickPlaceTask(TrossenAIStationaryTask):
             random=random,
             onscreen_render=onscreen_render,
             cam_list=cam_list,
+            state_only=state_only,
         )
         self.max_reward = 4
 
@@ -276,11 +280,11 @@ class OneArmPickPlaceTask(TrossenAIStationaryTask):
         with physics.reset_context():
             # Set right arm pose (8 dims)
             right_arm_pose = START_ARM_POSE[8:16]
-            physics.named.data.qpos[:8] = right_arm_pose
+            physics.data.qpos[:8] = right_arm_pose
             
-            # Use sample_box_pose to support randomization (synced via seed)
-            cube_pose = sample_box_pose()
-            physics.named.data.qpos[8:15] = cube_pose
+            # Use the configured box pose, or sample one to support randomization (synced via seed)
+            cube_pose = self.initial_box_pose()
+            physics.data.qpos[8:15] = cube_pose
 
         super(TrossenAIStationaryTask, self).initialize_episode(physics)
 
@@ -299,18 +303,17 @@ class OneArmPickPlaceTask(TrossenAIStationaryTask):
     def get_reward(self, physics: Physics) -> int:
         # Same reward logic as EE task
         # Box pose
-        box_start_idx = physics.model.name2id("red_box_joint", "joint")
+        contact_query = get_contact_query(physics)
+        box_start_idx = contact_query.joint_qpos_adr("red_box_joint")
         box_pos = physics.data.qpos[box_start_idx : box_start_idx + 3]
 
-        all_contact_pairs = []
-        for i_contact in range(physics.data.ncon):
-            id_geom_1 = physics.data.contact[i_contact].geom1
-            id_geom_2 = physics.data.contact[i_contact].geom2
-            name_geom_1 = physics.model.id2name(id_geom_1, "geom")
-            name_geom_2 = physics.model.id2name(id_geom_2, "geom")
-            all_contact_pairs.append({name_geom_1, name_geom_2})
-
-        touch_right_gripper = any({"red_box", "right/gripper_follower_left"} <= pair or {"red_box", "right/gripper_follower_right"} <= pair for pair in all_contact_pairs)
+        # Check contact
+        contacts = contact_query.contacts(physics.data)
+        touch_right_gripper = contact_query.touching(
+            contacts,
+            "red_box",
+            ["right/gripper_follower_left", "right/gripper_follower_right"],
+        )
 
         in_bucket_xy = np.linalg.norm(box_pos[:2] - np.array([-0.2, 0])) < 0.05
         
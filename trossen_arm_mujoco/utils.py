@@ -27,6 +27,7 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 import collections
+from collections.abc import Iterator, Mapping
 import os
 
 from dm_control import mujoco
@@ -38,12 +39,16 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from trossen_arm_mujoco.constants import ASSETS_DIR, DT
+from trossen_arm_mujoco.model_cache import load_model
+from trossen_arm_mujoco.native_env import NativeEnvironment, NativePhysics
 
 
-def sample_box_pose() -> np.ndarray:
+def sample_box_pose(random: np.random.RandomState | None = None) -> np.ndarray:
     """
     Generate a random pose for a cube within predefined position ranges.
 
+    :param random: Random state to sample from, defaults to ``None`` (the global NumPy random
+        state).
     :return: A 7D array containing the sampled position ``[x, y, z, w, x, y, z]`` representing the
         cube's position and orientation as a quaternion.
     """
@@ -52,12 +57,123 @@ def sample_box_pose() -> np.ndarray:
     z_range = [0.0125, 0.0125]
 
     ranges = np.vstack([x_range, y_range, z_range])
-    cube_position = np.random.uniform(ranges[:, 0], ranges[:, 1])
+    random = np.random if random is None else random
+    cube_position = random.uniform(ranges[:, 0], ranges[:, 1])
 
     cube_quat = np.array([1, 0, 0, 0])
     return np.concatenate([cube_position, cube_quat])
 
 
+class EpisodeConfigMixin:
+    """
+    Initial conditions of the episodes of a task, shared by the joint and end-effector tasks.
+
+    Mixed into a task ahead of :class:`dm_control.suite.base.Task`.
+    """
+
+    _episode_random: np.random.RandomState | None = None
+    _episode_box_pose: np.ndarray | None = None
+
+    def configure_episode(
+        self,
+        random: int | np.random.RandomState | None = None,
+        box_pose: np.ndarray | None = None,
+    ) -> None:
+        """
+        Set the initial conditions of the following episodes explicitly instead of through globals.
+
+        The configuration applies to every reset until it is changed, which lets one environment be
+        reset in place for each new episode.
+
+        :param random: Seed or random state to sample the box pose from, defaults to ``None`` (the
+            global NumPy random state).
+        :param box_pose: Box pose ``[x, y, z, w, x, y, z]`` to start from instead of sampling one,
+            defaults to ``None``.
+        """
+        if isinstance(random, int):
+            random = np.random.RandomState(random)
+        self._episode_random = random
+        self._episode_box_pose = None if box_pose is None else np.array(box_pose, copy=True)
+
+    def initial_box_pose(self) -> np.ndarray:
+        """
+        Get the box pose for a new episode, either the configured one or a freshly sampled one.
+
+        :return: The box pose ``[x, y, z, w, x, y, z]``.
+        """
+        if self._episode_box_pose is not None:
+            return self._episode_box_pose
+        return sample_box_pose(self._episode_random)
+
+
+class LazyImages(Mapping):
+    """
+    Camera images of a single simulation step, rendered on first access.
+
+    Each camera in ``cam_list`` is rendered only when it is first read, and the frame is cached
+    for the lifetime of this mapping. Since a frame can only be rendered from the current
+    simulation state, reading an unrendered camera after the physics has advanced raises an error
+    instead of silently returning a frame from a later step.
+
+    :param physics: The simulation physics instance.
+    :param cam_list: List of camera names available in this observation.
+    :param height: Image height in pixels, defaults to ``480``.
+    :param width: Image width in pixels, defaults to ``640``.
+    """
+
+    def __init__(
+        self,
+        physics: Physics,
+        cam_list: list[str],
+        height: int = 480,
+        width: int = 640,
+    ):
+        self._physics = physics
+        self._cam_list = list(cam_list)
+        self._height = height
+        self._width = width
+        self._time = physics.data.time
+        self._frames: dict[str, np.ndarray] = {}
+
+    @property
+    def rendered(self) -> tuple[str, ...]:
+        """Names of the cameras that have been rendered so far, in render order."""
+        return tuple(self._frames)
+
+    def render_all(self) -> dict[str, np.ndarray]:
+        """
+        Render every camera that has not been rendered yet.
+
+        :return: A plain dictionary mapping every camera name to its image.
+        """
+        return {cam: self[cam] for cam in self._cam_list}
+
+    def __getitem__(self, cam: str) -> np.ndarray:
+        frame = self._frames.get(cam)
+        if frame is None:
+            if cam not in self._cam_list:
+                raise KeyError(cam)
+            if self._physics.data.time != self._time:
+                raise RuntimeError(
+                    f"Camera {cam} was first requested after the simulation advanced past the "
+                    "step this observation belongs to."
+                )
+            frame = self._physics.render(
+                height=self._height, width=self._width, camera_id=cam
+            )
+            self._frames[cam] = frame
+        return frame
+
+    def __contains__(self, cam: object) -> bool:
+        return cam in self._cam_list
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._cam_list)
+
+    def __len__(self) -> int:
+        return len(self._cam_list)
+
+
 def get_observation_base(
     physics: Physics,
     cam_list: list[str],
@@ -66,6 +182,9 @@ def get_observation_base(
     """
     Capture image observations from multiple cameras in the simulation.
 
+    Images are exposed as a :class:`LazyImages` mapping, so a camera is only rendered if the
+    observation consumer reads it.
+
     :param physics: The simulation physics instance.
     :param cam_list: List of camera names to capture images from.
     :param on_screen_render: Whether to capture images from cameras, defaults to ``True``.
@@ -73,9 +192,7 @@ def get_observation_base(
     """
     obs: collections.OrderedDict = collections.OrderedDict()
     if on_screen_render:
-        obs["images"] = dict()
-        for cam in cam_list:
-            obs["images"][cam] = physics.render(height=480, width=640, camera_id=cam)
+        obs["images"] = LazyImages(physics, cam_list)
     return obs
 
 
@@ -86,37 +203,59 @@ def make_sim_env(
     onscreen_render: bool = False,
     cam_list: list[str] = [],
     random: bool = False,
+    backend: str = "dm_control",
+    state_only: bool = False,
 ):
     """
     Create a simulated environment for bimanual robotic manipulation.
 
+    Compiled models are cached by :func:`~trossen_arm_mujoco.model_cache.load_model`, so only
+    the first environment per scene in a process (and per asset version on disk) pays for
+    parsing the XML and its meshes. Every environment still gets its own copy of the model.
+
     :param task_class: The task class for defining simulation behavior.
     :param xml_file: Path to the robot XML file, defaults to ``'trossen_ai_scene.xml'``.
     :param task_name: Name of the task, defaults to ``'sim_transfer_cube'``.
     :param onscreen_render: Whether to render the simulation on-screen, defaults to ``False``.
     :param cam_list: List of camera names to be used, defaults to ``[]``.
+    :param backend: Simulation backend, either ``'dm_control'`` or ``'native'`` for the
+        :class:`~trossen_arm_mujoco.native_env.NativeEnvironment` built directly on the ``mujoco``
+        bindings, defaults to ``'dm_control'``.
+    :param state_only: Whether to build observations without camera images, for rollouts that
+        only need the robot and object state, defaults to ``False``.
     :return: The simulated robot environment.
     """
     if "sim_transfer_cube" in task_name:
         assets_path = os.path.join(ASSETS_DIR, xml_file)
-        physics = mujoco.Physics.from_xml_path(assets_path)
         task = task_class(
             random=random,
             onscreen_render=onscreen_render,
             cam_list=cam_list,
+            state_only=state_only,
         )
     elif "sim_pick_place" in task_name:
         # Use the provided xml_file (sim_env uses joint xml, ee_env uses scene xml)
         assets_path = os.path.join(ASSETS_DIR, xml_file)
-        physics = mujoco.Physics.from_xml_path(assets_path)
         task = task_class(
             random=random,
             onscreen_render=onscreen_render,
             cam_list=cam_list,
+            state_only=state_only,
         )
     else:
         raise NotImplementedError(f"Task {task_name} is not implemented.")
 
+    if backend == "native":
+        return NativeEnvironment(
+            NativePhysics(load_model(assets_path)),
+            task,
+            time_limit=20,
+            control_timestep=DT,
+        )
+    elif backend != "dm_control":
+        raise ValueError(f"Unknown simulation backend: {backend}. Use 'dm_control' or 'native'.")
+
+    physics = mujoco.Physics.from_model(mujoco.wrapper.MjModel(load_model(assets_path)))
     return control.Environment(
         physics,
         task,
@@ -0,0 +1,263 @@
+# Copyright 2025 Trossen Robotics
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Wire formats of the observations and actions sent to the inference service.
+
+A request body is a set of named arrays, its ``Content-Type`` names the format, so a server
+decodes whatever a client sends with :func:`decode_arrays` and answers in a format listed in the
+``Accept`` header:
+
+    json     ``application/json``, arrays as nested lists, the original format
+    raw      ``application/x-trossen-tensors``, a small JSON header followed by the little-endian
+             bytes of every array
+    npz      ``application/x-npz``, an uncompressed NumPy archive of ``.npy`` arrays
+    msgpack  ``application/msgpack``, a msgpack map of arrays with their bytes as binary
+
+Images can be sent PNG (lossless) or JPEG encoded in any format, they are decoded back to the
+shape and layout (HWC or CHW) they were sent with.
+"""
+
+import base64
+import io
+import json
+import struct
+
+import numpy as np
+
+from trossen_arm_mujoco.image_storage import decode_image, encode_image
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "raw": "application/x-trossen-tensors",
+    "npz": "application/x-npz",
+    "msgpack": "application/msgpack",
+}
+WIRE_FORMATS = tuple(CONTENT_TYPES)
+IMAGE_ENCODINGS = ("none", "png", "jpeg")
+
+# Start of a raw body, followed by the length of its header
+RAW_MAGIC = b"TRT1"
+# Member of an npz body holding the encoding of its images
+NPZ_META_KEY = "__meta__"
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError(
+            "The msgpack wire format needs msgpack. Install with: pip install msgpack"
+        )
+    return msgpack
+
+
+def wire_format_of(content_type: str | None) -> str | None:
+    """
+    Return the wire format of a ``Content-Type`` header.
+
+    :param content_type: The header value, parameters such as ``charset`` are ignored. A missing
+        header is JSON.
+    :return: One of :data:`WIRE_FORMATS`, or ``None`` for an unsupported content type.
+    """
+    if not content_type:
+        return "json"
+    media_type = content_type.split(";")[0].strip().lower()
+    for wire_format, known in CONTENT_TYPES.items():
+        if media_type == known:
+            return wire_format
+    return None
+
+
+def accepted_wire_format(accept: str | None, default: str = "json") -> str:
+    """
+    Return the first supported wire format of an ``Accept`` header.
+
+    :param accept: The header value, ``None`` or ``*/*`` accept anything.
+    :param default: Format used when no listed type is supported, defaults to ``'json'``.
+    :return: One of :data:`WIRE_FORMATS`.
+    """
+    for media_type in (accept or "").split(","):
+        wire_format = wire_format_of(media_type) if media_type.strip() else None
+        if wire_format is not None:
+            return wire_format
+    return default
+
+
+def _pack_array(array, image_encoding: str = "none", quality: int | None = None) -> dict:
+    """Return the metadata and bytes of an array, encoding it as an image if asked."""
+    array = np.asarray(array)
+    if image_encoding == "none":
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        return {"dtype": array.dtype.str, "shape": list(array.shape), "data": array.tobytes()}
+
+    if array.dtype != np.uint8 or array.ndim != 3 or 3 not in (array.shape[0], array.shape[-1]):
+        raise ValueError(
+            f"Only uint8 RGB images can be {image_encoding} encoded, "
+            f"got {array.dtype} {array.shape}."
+        )
+    # the observations of the gym env are CHW, images are encoded HWC
+    layout = "hwc" if array.shape[-1] == 3 else "chw"
+    image = array if layout == "hwc" else array.transpose(1, 2, 0)
+    data = encode_image(np.ascontiguousarray(image), image_encoding, quality).tobytes()
+    return {
+        "dtype": "|u1",
+        "shape": list(array.shape),
+        "encoding": image_encoding,
+        "layout": layout,
+        "data": data,
+    }
+
+
+def _unpack_array(meta: dict, data) -> np.ndarray:
+    """Rebuild an array packed by :func:`_pack_array`."""
+    encoding = meta.get("encoding", "none")
+    if encoding == "none":
+        return np.frombuffer(data, dtype=np.dtype(meta["dtype"])).reshape(meta["shape"])
+    image = decode_image(np.frombuffer(data, dtype=np.uint8))
+    if meta["layout"] == "chw":
+        image = np.ascontiguousarray(image.transpose(2, 0, 1))
+    return image
+
+
+def encode_arrays(
+    arrays: dict,
+    wire_format: str = "raw",
+    image_encoding: str = "none",
+    quality: int | None = None,
+    image_keys: tuple = ("image",),
+) -> tuple[bytes, str]:
+    """
+    Encode named arrays as a request or response body.
+
+    :param arrays: The arrays by name.
+    :param wire_format: One of :data:`WIRE_FORMATS`, defaults to ``'raw'``.
+    :param image_encoding: One of :data:`IMAGE_ENCODINGS`, applied to the arrays named in
+        ``image_keys``, defaults to ``'none'``.
+    :param quality: JPEG quality or PNG compression level, defaults to the codec default.
+    :param image_keys: Names of the arrays that are images, defaults to ``('image',)``.
+    :return: The body and its ``Content-Type``.
+    """
+    if wire_format not in CONTENT_TYPES:
+        raise ValueError(f"Unknown wire format: {wire_format}. Use one of {WIRE_FORMATS}")
+    if image_encoding not in IMAGE_ENCODINGS:
+        raise ValueError(f"Unknown image encoding: {image_encoding}. Use one of {IMAGE_ENCODINGS}")
+
+    if wire_format == "json" and image_encoding == "none":
+        # the original format, readable by servers that know nothing else
+        body = json.dumps({name: np.asarray(array).tolist() for name, array in arrays.items()})
+        return body.encode("utf-8"), CONTENT_TYPES["json"]
+
+    packed = {
+        name: _pack_array(array, image_encoding if name in image_keys else "none", quality)
+        for name, array in arrays.items()
+    }
+    if wire_format == "json":
+        for meta in packed.values():
+            meta["data"] = base64.b64encode(meta["data"]).decode("ascii")
+        body = json.dumps(packed).encode("utf-8")
+    elif wire_format == "raw":
+        header = {}
+        for name, meta in packed.items():
+            header[name] = {key: value for key, value in meta.items() if key != "data"}
+            header[name]["nbytes"] = len(meta["data"])
+        header = json.dumps(header).encode("utf-8")
+        body = b"".join(
+            [RAW_MAGIC, struct.pack("<I", len(header)), header]
+            + [meta["data"] for meta in packed.values()]
+        )
+    elif wire_format == "npz":
+        # plain arrays are stored as they are, encoded images as their bytes
+        members, encoded = {}, {}
+        for name, meta in packed.items():
+            if "encoding" in meta:
+                members[name] = np.frombuffer(meta["data"], np.uint8)
+                encoded[name] = {key: value for key, value in meta.items() if key != "data"}
+            else:
+                members[name] = np.asarray(arrays[name])
+        members[NPZ_META_KEY] = np.frombuffer(json.dumps(encoded).encode("utf-8"), np.uint8)
+        buffer = io.BytesIO()
+        np.savez(buffer, **members)
+        body = buffer.getvalue()
+    else:
+        body = _import_msgpack().packb(packed, use_bin_type=True)
+    return body, CONTENT_TYPES[wire_format]
+
+
+def decode_arrays(body: bytes, content_type: str | None) -> dict:
+    """
+    Decode a body encoded by :func:`encode_arrays`, or sent as plain JSON.
+
+    :param body: The request or response body.
+    :param content_type: Its ``Content-Type`` header.
+    :return: The arrays by name, encoded images decoded. Arrays of binary formats may be
+        read-only views of ``body``.
+    :raises ValueError: If the content type is not supported or the body is malformed.
+    """
+    wire_format = wire_format_of(content_type)
+    if wire_format is None:
+        raise ValueError(
+            f"Unsupported content type: {content_type}. Use one of {list(CONTENT_TYPES.values())}"
+        )
+
+    if wire_format == "json":
+        arrays = {}
+        for name, value in json.loads(body).items():
+            if isinstance(value, dict):
+                arrays[name] = _unpack_array(value, base64.b64decode(value["data"]))
+            else:
+                arrays[name] = np.asarray(value)
+        return arrays
+
+    if wire_format == "raw":
+        if body[: len(RAW_MAGIC)] != RAW_MAGIC:
+            raise ValueError("Malformed raw tensor body.")
+        offset = len(RAW_MAGIC) + 4
+        (header_length,) = struct.unpack_from("<I", body, len(RAW_MAGIC))
+        header = json.loads(body[offset : offset + header_length])
+        view = memoryview(body)
+        offset += header_length
+        arrays = {}
+        for name, meta in header.items():
+            arrays[name] = _unpack_array(meta, view[offset : offset + meta["nbytes"]])
+            offset += meta["nbytes"]
+        return arrays
+
+    if wire_format == "npz":
+        with np.load(io.BytesIO(body), allow_pickle=False) as members:
+            encoded = json.loads(members[NPZ_META_KEY].tobytes()) if NPZ_META_KEY in members else {}
+            arrays = {}
+            for name in members.files:
+                if name in encoded:
+                    arrays[name] = _unpack_array(encoded[name], members[name])
+                elif name != NPZ_META_KEY:
+                    arrays[name] = members[name]
+            return arrays
+
+    packed = _import_msgpack().unpackb(body, raw=False)
+    return {name: _unpack_array(meta, meta["data"]) for name, meta in packed.items()}